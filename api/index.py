@@ -1,39 +1,79 @@
-from flask import Flask, request, jsonify
+import time
+_BOOT_STARTED = time.perf_counter()
+
+from flask import Flask, Request, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import PyPDF2
 import io
-import google.generativeai as genai
+import importlib
 import re
 from datetime import datetime
 import json
 import mimetypes
 import random
 import os
-import time
 import logging
 from logging.handlers import RotatingFileHandler
 import traceback
+import sys
+import threading
+import signal
+import hmac
+import hashlib
+import sqlite3
+import tempfile
+import mmap
+import shutil
+import queue
+import multiprocessing
+import bisect
+import atexit
+from types import MappingProxyType
 from functools import wraps
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from collections import defaultdict, OrderedDict, Counter
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 mimetypes.add_type('text/css', '.css')
 mimetypes.add_type('application/javascript', '.js')
 
+# Cold-start report: seconds spent in each phase of loading this module, and in each
+# deferred import when it happens. Logged once the module is loaded and shown on /health
+STARTUP_REPORT = {"phases": {}, "lazy_imports": {}, "total_seconds": None}
+_boot_last_mark = _BOOT_STARTED
+
+
+def boot_mark(phase):
+    """Add the time since the previous mark to ``phase`` in STARTUP_REPORT."""
+    global _boot_last_mark
+    now = time.perf_counter()
+    phases = STARTUP_REPORT["phases"]
+    phases[phase] = round(phases.get(phase, 0.0) + now - _boot_last_mark, 4)
+    _boot_last_mark = now
+
+
+boot_mark("imports")
+
 # =========================
 # SECURITY & CONFIG
 # =========================
 
 # Load API key from environment variables (SECURE)
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+# Base URL of a local Gemini stand-in (gemini_standin.py) to use instead of Google's API
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT', '')
 
-if GEMINI_API_KEY:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-    except Exception as e:
-        print(f"Error configuring Gemini API: {e}")
-else:
+if not GEMINI_API_KEY:
     print("WARNING: GEMINI_API_KEY not set. Set with: export GEMINI_API_KEY='your-key-here'")
 
+# Import google.generativeai and PyPDF2 (and build the Gemini clients) on a background
+# thread once the app is loaded, instead of on the first request that needs them
+PREWARM_IMPORTS = os.getenv('PREWARM_IMPORTS', 'False').lower() == 'true'
+
 # Setup logging with better format
 logging.basicConfig(
     level=logging.INFO,
@@ -44,31 +84,354 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class LazyModule:
+    """Stand-in for a heavy module that imports it on first attribute access.
+
+    ``on_load(module)`` runs once after the import (e.g. to configure a client).
+    Assigning an attribute sets it on the real module. The import time is
+    recorded in STARTUP_REPORT["lazy_imports"].
+    """
+
+    def __init__(self, name, on_load=None):
+        self.__dict__.update(_name=name, _on_load=on_load, _module=None, _lock=threading.Lock())
+        if hasattr(os, "register_at_fork"):
+            # A fork taken while another thread was importing must not inherit a held lock
+            os.register_at_fork(after_in_child=lambda: self.__dict__.update(_lock=threading.Lock()))
+
+    def load(self, trigger="first use"):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    seconds = time.perf_counter() - started
+                    STARTUP_REPORT["lazy_imports"][self._name] = {
+                        "seconds": round(seconds, 4),
+                        "after_boot_seconds": round(started - _BOOT_STARTED, 3),
+                        "trigger": trigger
+                    }
+                    logger.info(f"✓ Imported {self._name} in {seconds * 1000:.0f}ms ({trigger})")
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def available(self):
+        try:
+            self.load()
+            return True
+        except ImportError:
+            return False
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.load(), attr, value)
+
+
+def cooperative_io():
+    """True under gevent (gunicorn -k gevent): blocking socket I/O yields to other requests."""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("socket")
+
+
+def os_threading(name):
+    """``threading.<name>`` as it was before gevent patched it, for state that must be per OS thread."""
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None and monkey.is_module_patched("threading"):
+        return monkey.get_original("threading", name)
+    return getattr(threading, name)
+
+
+def _configure_genai(module):
+    if not GEMINI_API_KEY:
+        return
+    try:
+        if GEMINI_API_ENDPOINT:
+            module.configure(api_key=GEMINI_API_KEY, transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+        elif cooperative_io():
+            # gRPC calls would block the whole gevent worker; REST goes through patched sockets
+            module.configure(api_key=GEMINI_API_KEY, transport="rest")
+        else:
+            module.configure(api_key=GEMINI_API_KEY)
+    except Exception as e:
+        print(f"Error configuring Gemini API: {e}")
+
+
+# google.generativeai (gRPC, protobuf) costs most of a cold start, so it and the other
+# heavy modules are imported on first use (or by the prewarm thread, see PREWARM_IMPORTS)
+genai = LazyModule("google.generativeai", on_load=_configure_genai)
+PyPDF2 = LazyModule("PyPDF2")
+np = LazyModule("numpy")  # only needed for batch scoring (analyze_text_batch)
+
 # Rate limiting configuration
 RATE_LIMIT_REQUESTS = 100
 RATE_LIMIT_WINDOW = 3600
-request_history = defaultdict(list)
+# "memory" keeps counters per process; "sqlite" shares them across workers on the host
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+RATE_LIMIT_DB_PATH = os.getenv('RATE_LIMIT_DB_PATH', os.path.join(tempfile.gettempdir(), 'careersafe_ratelimit.sqlite3'))
+# Idle clients beyond this many are evicted least-recently-seen first (memory backend)
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
 
 # Input validation constants
 MAX_TEXT_LENGTH = 10000
 MAX_COMPANY_NAME_LENGTH = 500
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
+# /resume-check PDF ingestion: uploads above RESUME_MMAP_THRESHOLD bytes are read from a
+# memory-mapped temp file; extraction stops at the page cap, the time budget (seconds)
+# or once RESUME_MAX_CHARS of text have been collected
+RESUME_MMAP_THRESHOLD = int(os.getenv('RESUME_MMAP_THRESHOLD', 1024 * 1024))
+RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', 50))
+RESUME_EXTRACT_BUDGET = float(os.getenv('RESUME_EXTRACT_BUDGET', 10))
+RESUME_MAX_CHARS = int(os.getenv('RESUME_MAX_CHARS', 200000))
+
+# PDF parsing runs in PDF_WORKERS child processes, forked on the first upload (0 parses in
+# the request thread). A document gets PDF_EXTRACT_TIMEOUT seconds in total before its
+# children are killed and replaced; each child may grow by PDF_WORKER_MEMORY_MB; documents
+# are split across children in ranges of PDF_SPLIT_PAGES pages
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', 2))
+PDF_EXTRACT_TIMEOUT = float(os.getenv('PDF_EXTRACT_TIMEOUT', 15))
+PDF_WORKER_MEMORY_MB = int(os.getenv('PDF_WORKER_MEMORY_MB', 512))
+PDF_SPLIT_PAGES = int(os.getenv('PDF_SPLIT_PAGES', 10))
+# Verdicts (and extracted text) of recent uploads, keyed on the SHA-256 of the PDF bytes
+RESUME_CACHE_ENTRIES = int(os.getenv('RESUME_CACHE_ENTRIES', 128))
+RESUME_CACHE_TTL = int(os.getenv('RESUME_CACHE_TTL', 3600))
+
+# Scoring rules and admin access
+RULES_FILE = os.getenv('RULES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json'))
+# Each worker stats RULES_FILE at most every RULES_CHECK_INTERVAL seconds and reloads it when
+# it changed, so edits (and /admin/reload-rules or SIGHUP, which touch it) reach every worker
+RULES_CHECK_INTERVAL = float(os.getenv('RULES_CHECK_INTERVAL', 2))
+COMPANY_REGISTRY_FILE = os.getenv('COMPANY_REGISTRY_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'companies.json'))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# Result caches (in-process LRU in front of a SQLite file shared by all workers on the host).
+# Set CACHE_DB_PATH to an empty string to keep caches in memory only.
+CACHE_DB_PATH = os.getenv('CACHE_DB_PATH', os.path.join(tempfile.gettempdir(), 'careersafe_cache.sqlite3'))
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', 7 * 24 * 3600))
+AI_CACHE_MEMORY_ENTRIES = int(os.getenv('AI_CACHE_MEMORY_ENTRIES', 1024))
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 50000))
+# Identical Gemini lookups already in flight (in this worker, or in another worker through
+# CACHE_DB_PATH) are waited on rather than repeated; a leader holds its claim this long at most
+SINGLE_FLIGHT_LEASE = float(os.getenv('SINGLE_FLIGHT_LEASE', 30))
+
+# /bulk-analyze: Gemini calls in flight per worker, and the whole-request AI deadline in seconds
+# (keep it under gunicorn's --timeout)
+BULK_AI_CONCURRENCY = int(os.getenv('BULK_AI_CONCURRENCY', 8))
+BULK_AI_DEADLINE = float(os.getenv('BULK_AI_DEADLINE', 60))
+# Batch cap for streaming mode (results are written as they finish, so memory does not grow with it)
+MAX_BULK_TEXTS = 50
+MAX_BULK_STREAM_TEXTS = int(os.getenv('MAX_BULK_STREAM_TEXTS', 500))
+
+# /full-analysis: per-section deadlines in seconds, measured from the start of the request
+FULL_ANALYSIS_SECTION_TIMEOUT = float(os.getenv('FULL_ANALYSIS_SECTION_TIMEOUT', 10))
+FULL_ANALYSIS_TIMEOUTS = {
+    "job_analysis": float(os.getenv('FULL_ANALYSIS_JOB_TIMEOUT', 30)),
+    "company_verification": float(os.getenv('FULL_ANALYSIS_COMPANY_TIMEOUT', 20)),
+}
+# Max calls in flight per Gemini-backed section; once a section's calls have all overrun
+# their deadline, further requests get its fallback at once instead of queueing
+FULL_ANALYSIS_CONCURRENCY = int(os.getenv('FULL_ANALYSIS_CONCURRENCY', 8))
+# Company profiles: fresh window, extra stale-while-revalidate window, and TTL for failed lookups
+COMPANY_CACHE_TTL = int(os.getenv('COMPANY_CACHE_TTL', 24 * 3600))
+COMPANY_CACHE_STALE_TTL = int(os.getenv('COMPANY_CACHE_STALE_TTL', 7 * 24 * 3600))
+COMPANY_CACHE_NEGATIVE_TTL = int(os.getenv('COMPANY_CACHE_NEGATIVE_TTL', 600))
+
+# Gemini calls: retries on transient errors (429/5xx/timeouts) with capped, jittered
+# exponential backoff, and a per-model circuit breaker that skips Gemini entirely
+# for GEMINI_BREAKER_RESET seconds after GEMINI_BREAKER_FAILURES consecutive failed calls
+# (a call fails once its retries are spent on transient errors; a 4xx does not count)
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 2))
+GEMINI_BACKOFF_BASE = float(os.getenv('GEMINI_BACKOFF_BASE', 0.5))
+GEMINI_BACKOFF_MAX = float(os.getenv('GEMINI_BACKOFF_MAX', 4))
+GEMINI_BREAKER_FAILURES = int(os.getenv('GEMINI_BREAKER_FAILURES', 5))
+GEMINI_BREAKER_RESET = float(os.getenv('GEMINI_BREAKER_RESET', 30))
+
+# /metrics: each worker writes its counters to METRICS_DIR every METRICS_FLUSH_INTERVAL
+# seconds and a scrape sums the files of every worker under the same master.
+# Set METRICS_DIR to an empty string to report only the worker that answers the scrape.
+# Scrapes must send METRICS_TOKEN (or ADMIN_TOKEN) as a bearer token; /metrics is off while both are empty.
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'careersafe_metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Request tracing: with TRACE_LOG_PATH set, this fraction of requests records stage timings
+# (rule scoring, Gemini setup/calls/backoff, PDF extraction, serialization...) as one JSON
+# record per request in that file. Admin requests (ADMIN_TOKEN) are always traced and get
+# the timings back in a Server-Timing header; other clients never see it
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0))
+TRACE_LOG_PATH = os.getenv('TRACE_LOG_PATH', '')
+
+# Sampling profiler: this fraction of requests (or any admin request sent with the
+# X-CareerSafe-Profile header) has its handler thread's stack sampled every
+# PROFILE_INTERVAL seconds into per-route collapsed-stack files in PROFILE_DIR
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'careersafe_profiles'))
+
+# Background jobs (POST /jobs/<type>, GET /jobs/<id>): queue file shared by every worker on
+# the host, job threads per worker (0 = accept jobs but leave running them to other workers),
+# how long results stay readable, and how long a claim lasts unless its worker renews it
+# (every JOB_LEASE / 3 seconds while the job runs); a job whose worker stopped renewing is
+# retaken, at most JOB_MAX_ATTEMPTS times in all. Request bodies are spooled to files in
+# JOB_SPOOL_DIR (default: <queue file name>_uploads next to the queue file), not stored in SQLite
+JOB_QUEUE_DB_PATH = os.getenv('JOB_QUEUE_DB_PATH', os.path.join(tempfile.gettempdir(), 'careersafe_jobs.sqlite3'))
+JOB_SPOOL_DIR = os.getenv('JOB_SPOOL_DIR', '')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 3600))
+JOB_LEASE = float(os.getenv('JOB_LEASE', 300))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
 app = Flask(__name__, static_folder='.', static_url_path='')
 
-# Rate limiting decorator
+# Sliding-window counter: each key keeps the request count of the current and the
+# previous fixed window, and the previous one is weighted by how much of it still
+# overlaps the sliding window. Constant work and memory per key.
+def _slide_window(state, window, now):
+    """Advance ``(window_index, current, previous)`` to ``now`` and return it with the estimated count."""
+    index = int(now // window)
+    if state is None:
+        state = (index, 0, 0)
+    start, current, previous = state
+    if index == start + 1:
+        state = (index, 0, current)
+    elif index != start:
+        state = (index, 0, 0)
+    overlap = 1.0 - (now - index * window) / window
+    return state, state[2] * overlap + state[1]
+
+
+class MemoryRateLimitBackend:
+    """Per-process counters in an LRU, so idle clients cannot grow memory without bound."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._state = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now):
+        with self._lock:
+            state, estimated = _slide_window(self._state.get(key), window, now)
+            allowed = estimated < limit
+            if allowed:
+                state = (state[0], state[1] + 1, state[2])
+            self._state[key] = state
+            self._state.move_to_end(key)
+            while len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        return allowed
+
+
+class SQLiteRateLimitBackend:
+    """Counters in a SQLite file so every worker on the host enforces one shared limit.
+
+    Each hit is one IMMEDIATE transaction; rows idle for two windows are
+    purged every ``PURGE_EVERY`` hits.
+    """
+
+    PURGE_EVERY = 256
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " key TEXT PRIMARY KEY, window_index INTEGER NOT NULL, current INTEGER NOT NULL,"
+            " previous INTEGER NOT NULL, window REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, limit, window, now):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_index, current, previous FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            state, estimated = _slide_window(tuple(row) if row else None, window, now)
+            allowed = estimated < limit
+            if allowed:
+                state = (state[0], state[1] + 1, state[2])
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window_index, current, previous, window, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, state[0], state[1], state[2], window, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._hits += 1
+        if self._hits % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM rate_limits WHERE updated_at + 2 * window < ?", (now,))
+        return allowed
+
+
+class RateLimiter:
+    """Front for a rate-limit backend. A failing shared backend lets traffic through rather than erroring."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def allow(self, key, limit, window):
+        try:
+            return self.backend.hit(key, limit, window, time.time())
+        except Exception as e:
+            logger.warning(f"Rate limit backend error, allowing request: {e}")
+            return True
+
+
+def _make_rate_limiter():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        try:
+            return RateLimiter(SQLiteRateLimitBackend(RATE_LIMIT_DB_PATH))
+        except Exception as e:
+            logger.error(f"Shared rate limit backend unavailable ({RATE_LIMIT_DB_PATH}), using in-process limits: {e}")
+    return RateLimiter(MemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS))
+
+
+RATE_LIMITER = _make_rate_limiter()
+
+
+def rate_limited(name, limit, window):
+    """Count a request from this client against ``name``; the 429 response when over the limit, else None."""
+    client_ip = request.remote_addr
+    if not RATE_LIMITER.allow(f"{name}:{client_ip}", limit, window):
+        logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+        METRICS.inc("careersafe_rate_limit_rejections_total", route=request.path)
+        return jsonify({"error": "Rate limit exceeded", "message": f"Max {limit} requests per {window}s"}), 429
+    return None
+
+
+# Rate limiting decorator (limits are per route and client IP)
 def rate_limit(limit=10, window=60):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            client_ip = request.remote_addr
-            current_time = time.time()
-            request_history[client_ip] = [req_time for req_time in request_history[client_ip] if current_time - req_time < window]
-            if len(request_history[client_ip]) >= limit:
-                logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-                return jsonify({"error": "Rate limit exceeded", "message": f"Max {limit} requests per {window}s"}), 429
-            request_history[client_ip].append(current_time)
+            if request.environ.get("careersafe.job"):
+                # Background jobs were charged to this route's limit when they were submitted
+                return f(*args, **kwargs)
+            rejected = rate_limited(f.__name__, limit, window)
+            if rejected is not None:
+                return rejected
             return f(*args, **kwargs)
+        # Read by POST /jobs/<type> to charge a submission to the route that will run it
+        decorated_function.rate_limit = (f.__name__, limit, window)
         return decorated_function
     return decorator
 
@@ -103,10 +466,1492 @@ DEFAULT_TEST_DATA = {
     }
 }
 
+# =========================
+# METRICS
+# =========================
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    """Prometheus-style counters, gauges and histograms, aggregated across gunicorn workers.
+
+    Every thread records into its own dict, so ``inc`` and ``observe`` take no
+    lock; the lock is only taken when a thread records for the first time and
+    when a snapshot is read. Histogram entries are per-bucket counts followed
+    by the sum of observations.
+
+    With a ``directory``, snapshots are written there as ``<master pid>-<pid>.json``
+    and ``render`` sums the snapshots of every worker of this master. Counters
+    and histograms of exited workers are kept so totals never go backwards;
+    gauges only count live workers.
+    """
+
+    def __init__(self, directory=None, flush_interval=5.0):
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        self._definitions = {}
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked child starts empty; what it inherited belongs to the parent's snapshot.
+        # Shards are per OS thread even under gevent, where a greenlet per request would
+        # otherwise leave a shard per request behind (recording never yields, so greenlets
+        # sharing a shard cannot interleave).
+        self._local = os_threading("local")()
+        self._current_thread = os_threading("current_thread")
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+        self._flusher_pid = None
+
+    def define(self, name, kind, help_text, buckets=None):
+        self._definitions[name] = (kind, help_text, tuple(buckets or LATENCY_BUCKETS) if kind == "histogram" else None)
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((self._current_thread(), shard))
+        return shard
+
+    def inc(self, name, value=1, **labels):
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        shard[key] = shard.get(key, 0) + value
+
+    def dec(self, name, value=1, **labels):
+        self.inc(name, -value, **labels)
+
+    def observe(self, name, value, **labels):
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        entry = shard.get(key)
+        buckets = self._definitions[name][2]
+        if entry is None:
+            entry = shard[key] = [0] * (len(buckets) + 2)
+        entry[bisect.bisect_left(buckets, value)] += 1
+        entry[-1] += value
+
+    @staticmethod
+    def _merge(into, key, value):
+        current = into.get(key)
+        if current is None:
+            into[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            for i, v in enumerate(value):
+                current[i] += v
+        else:
+            into[key] = current + value
+
+    def snapshot(self):
+        """This process's totals as ``{(name, labels): value}``; folds in shards of exited threads."""
+        totals = {}
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                    source = totals
+                else:
+                    source = self._retired
+                for key, value in shard.copy().items():
+                    self._merge(source, key, value)
+            self._shards = live
+            for key, value in self._retired.items():
+                self._merge(totals, key, value)
+        return totals
+
+    def _path(self, pid=None):
+        return os.path.join(self.directory, f"{os.getppid()}-{pid or os.getpid()}.json")
+
+    def flush(self):
+        """Write this worker's snapshot for the other workers' scrapes to pick up."""
+        if not self.directory:
+            return
+        entries = [[name, list(map(list, labels)), value] for (name, labels), value in self.snapshot().items()]
+        path = self._path()
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(entries, f)
+        os.replace(temporary, path)
+
+    def start_flusher(self):
+        """Start the periodic flush thread once per process (again after a fork)."""
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+        # A worker recycled by gunicorn (max_requests, reload) keeps its last few seconds of counts
+        atexit.register(self._flush_quietly)
+
+    def _flush_quietly(self):
+        if self._flusher_pid != os.getpid():
+            return
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Metrics flush failed: {e}")
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._flush_quietly()
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    def collect(self):
+        """Totals of every worker of this master (or just this process without a directory)."""
+        if not self.directory:
+            return self.snapshot()
+        try:
+            self.flush()
+        except OSError as e:
+            logger.warning(f"Metrics flush failed, reporting this worker only: {e}")
+            return self.snapshot()
+        master = os.getppid()
+        totals = {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                parent, pid = (int(part) for part in filename[:-len(".json")].split("-"))
+            except ValueError:
+                continue
+            path = os.path.join(self.directory, filename)
+            if parent != master:
+                # Left behind by an earlier deployment once its master is gone
+                if not self._pid_alive(parent):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                continue
+            alive = pid == os.getpid() or self._pid_alive(pid)
+            try:
+                with open(path) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in entries:
+                if name not in self._definitions:
+                    continue
+                if self._definitions[name][0] == "gauge" and not alive:
+                    continue
+                self._merge(totals, (name, tuple(map(tuple, labels))), value)
+        return totals
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)."""
+        by_name = defaultdict(list)
+        for (name, labels), value in self.collect().items():
+            by_name[name].append((labels, value))
+        lines = []
+        for name, (kind, help_text, buckets) in self._definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(by_name.get(name, [])):
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ("+Inf",), value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics(METRICS_DIR, METRICS_FLUSH_INTERVAL)
+METRICS.define("careersafe_http_requests_total", "counter", "HTTP requests by route, method and status.")
+METRICS.define("careersafe_http_request_duration_seconds", "histogram", "HTTP request latency by route and method.")
+METRICS.define("careersafe_http_requests_in_flight", "gauge", "HTTP requests currently being handled.")
+METRICS.define("careersafe_gemini_call_duration_seconds", "histogram", "Gemini calls (including retries) by call site and outcome.")
+METRICS.define("careersafe_gemini_retries_total", "counter", "Gemini retries after transient errors by call site.")
+METRICS.define("careersafe_pdf_extraction_duration_seconds", "histogram", "Resume PDF text extraction by mode (pool/inline) and outcome.")
+METRICS.define("careersafe_rate_limit_rejections_total", "counter", "Requests rejected by the rate limiter by route.")
+METRICS.define("careersafe_company_verification_source_total", "counter", "Company verifications by data source (AI, cached ledger, pattern, probabilistic fallback).")
+METRICS.define("careersafe_job_analysis_total", "counter", "Job analyses by path (ai, rules_fallback when Gemini gave nothing, rules when AI is off, short_text).")
+METRICS.define("careersafe_jobs_total", "counter", "Background jobs finished by type and status (done/failed, or dropped when a later claim took over).")
+METRICS.define("careersafe_job_queue_wait_seconds", "histogram", "Time background jobs spent queued before a worker claimed them.")
+
+
+@app.before_request
+def _metrics_request_started():
+    METRICS.start_flusher()
+    request.environ["careersafe.started"] = time.perf_counter()
+    METRICS.inc("careersafe_http_requests_in_flight")
+
+
+@app.after_request
+def _metrics_request_finished(response):
+    started = request.environ.get("careersafe.started")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        METRICS.observe("careersafe_http_request_duration_seconds", time.perf_counter() - started, route=route, method=request.method)
+        METRICS.inc("careersafe_http_requests_total", route=route, method=request.method, status=str(response.status_code))
+    return response
+
+
+@app.teardown_request
+def _metrics_request_closed(error=None):
+    if request.environ.pop("careersafe.started", None) is not None:
+        METRICS.dec("careersafe_http_requests_in_flight")
+
+
+# =========================
+# REQUEST TRACING
+# =========================
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.spans.append((self.name, self.started, time.perf_counter()))
+        return False
+
+
+class Trace:
+    """Stage timings of one request, recorded by ``span()`` on the request's thread."""
+
+    def __init__(self, expose=False):
+        self.id = os.urandom(8).hex()
+        self.started = time.perf_counter()
+        self.spans = []
+        self.expose = expose
+
+    def server_timing(self, total):
+        """Server-Timing header value: one entry per stage name, repeated stages summed."""
+        durations = OrderedDict()
+        for name, started, finished in self.spans:
+            count, seconds = durations.get(name, (0, 0.0))
+            durations[name] = (count + 1, seconds + finished - started)
+        entries = [f"total;dur={total * 1000:.1f}"]
+        for name, (count, seconds) in durations.items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            entries.append(entry + f';desc="{count}x"' if count > 1 else entry)
+        return ", ".join(entries)
+
+    def record(self, total, **fields):
+        return dict(fields, trace_id=self.id, duration_ms=round(total * 1000, 3), spans=[
+            {"name": name, "start_ms": round((started - self.started) * 1000, 3), "duration_ms": round((finished - started) * 1000, 3)}
+            for name, started, finished in self.spans
+        ])
+
+
+_trace_local = threading.local()
+
+
+def span(name):
+    """Time a block as stage ``name`` of the current request; a shared no-op when it is not traced.
+
+    Only the request's own thread is traced; work handed to executor threads is not.
+    """
+    trace = getattr(_trace_local, "trace", None)
+    return _NULL_SPAN if trace is None else _Span(trace, name)
+
+
+def _make_trace_logger():
+    trace_logger = logging.getLogger(f"{__name__}.trace")
+    trace_logger.propagate = False
+    if TRACE_LOG_PATH and not trace_logger.handlers:
+        handler = RotatingFileHandler(TRACE_LOG_PATH, maxBytes=10 * 1024 * 1024, backupCount=3)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger.addHandler(handler)
+        trace_logger.setLevel(logging.INFO)
+    return trace_logger
+
+
+TRACE_LOGGER = _make_trace_logger()
+
+
+class TracedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with response serialization timed as the "serialize" stage."""
+
+    def dumps(self, obj, **kwargs):
+        with span("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+app.json_provider_class = TracedJSONProvider
+app.json = TracedJSONProvider(app)
+
+
+@app.before_request
+def _trace_request_started():
+    # Stage names reveal cache hits (another user's message or company), so only admins see them
+    if is_admin_request():
+        _trace_local.trace = Trace(expose=True)
+    elif TRACE_LOG_PATH and (TRACE_SAMPLE_RATE >= 1 or (TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE)):
+        _trace_local.trace = Trace()
+
+
+@app.after_request
+def _trace_request_finished(response):
+    trace = getattr(_trace_local, "trace", None)
+    if trace is not None:
+        total = time.perf_counter() - trace.started
+        if trace.expose:
+            response.headers["Server-Timing"] = trace.server_timing(total)
+        if TRACE_LOG_PATH:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            TRACE_LOGGER.info(json.dumps(trace.record(
+                total, route=route, method=request.method, status=response.status_code, at=datetime.now().isoformat()
+            )))
+    return response
+
+
+@app.teardown_request
+def _trace_request_closed(error=None):
+    _trace_local.trace = None
+
+
+# =========================
+# SAMPLING PROFILER
+# =========================
+PROFILE_HEADER = "X-CareerSafe-Profile"
+
+
+def profile_route_slug(route):
+    """File-name stem for a route: "/analyze" -> "analyze", "/" -> "root"."""
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+class SamplingProfiler:
+    """Samples the stacks of selected request threads from one background thread.
+
+    Stacks are folded root-first into "file:function;file:function" lines
+    (the collapsed format flamegraph.pl, speedscope and inferno read) and
+    summed per route. After every profiled request the route's totals for
+    this process are rewritten to ``<route>.<pid>.collapsed`` in ``directory``.
+    The sampler sleeps while no request is being profiled.
+
+    The sampler is a real OS thread even under gevent. There every request
+    shares the worker's OS thread, so a profiled request's samples also
+    include whatever other greenlets ran while it was in flight.
+    """
+
+    def __init__(self, directory, interval=0.005):
+        self.directory = directory
+        self.interval = interval
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = os_threading("Lock")()
+        self._active = {}
+        self._routes = defaultdict(Counter)
+        self._wake = os_threading("Event")()
+        self._sampler_pid = None
+
+    def start(self, thread_id=None):
+        thread_id = thread_id or threading.get_ident()
+        with self._lock:
+            # Keyed by request thread (greenlet under gevent), sampling the OS thread it runs on
+            self._active[thread_id] = (os_threading("get_ident")(), Counter())
+            if self._sampler_pid != os.getpid():
+                self._sampler_pid = os.getpid()
+                os_threading("Thread")(target=self._run, name="profiler", daemon=True).start()
+        self._wake.set()
+
+    def stop(self, route, thread_id=None):
+        """Stop sampling a thread, add its samples to ``route`` and write the route's file. Returns the sample count."""
+        thread_id = thread_id or threading.get_ident()
+        with self._lock:
+            _, samples = self._active.pop(thread_id, (None, None))
+            if not samples:
+                return 0
+            totals = self._routes[route]
+            totals.update(samples)
+            lines = [f"{stack} {count}" for stack, count in totals.most_common()]
+        try:
+            self._write(route, lines)
+        except OSError as e:
+            logger.warning(f"Profile write failed for {route}: {e}")
+        return sum(samples.values())
+
+    def _write(self, route, lines):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{profile_route_slug(route)}.{os.getpid()}.collapsed")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temporary, path)
+
+    @staticmethod
+    def collapse(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _run(self):
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for os_thread_id, samples in self._active.values():
+                    frame = frames.get(os_thread_id)
+                    if frame is not None:
+                        samples[self.collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+    def read(self, route):
+        """Collapsed stacks for ``route`` summed over every process's file."""
+        totals = Counter()
+        prefix = profile_route_slug(route) + "."
+        try:
+            filenames = os.listdir(self.directory)
+        except FileNotFoundError:
+            return totals
+        for filename in filenames:
+            if not (filename.startswith(prefix) and filename.endswith(".collapsed")):
+                continue
+            if not filename[len(prefix):-len(".collapsed")].isdigit():
+                continue
+            with open(os.path.join(self.directory, filename)) as f:
+                for line in f:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if stack and count.isdigit():
+                        totals[stack] += int(count)
+        return totals
+
+
+PROFILER = SamplingProfiler(PROFILE_DIR, PROFILE_INTERVAL)
+
+
+@app.before_request
+def _profile_request_started():
+    sampled = PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+    if sampled or (PROFILE_HEADER in request.headers and is_admin_request()):
+        request.environ["careersafe.profiled"] = True
+        PROFILER.start()
+
+
+@app.after_request
+def _profile_request_finished(response):
+    if request.environ.pop("careersafe.profiled", False):
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        response.headers[PROFILE_HEADER] = f"{PROFILER.stop(route)} samples"
+    return response
+
+
+@app.teardown_request
+def _profile_request_closed(error=None):
+    # The response never got to after_request (an unhandled error); keep what was sampled
+    if request.environ.pop("careersafe.profiled", False):
+        PROFILER.stop(request.url_rule.rule if request.url_rule is not None else "unmatched")
+
+
+# =========================
+# RESULT CACHES
+# =========================
+_MISSING = object()
+
+
+def cache_key(*parts):
+    """Stable content address for a tuple of strings."""
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry expiry time."""
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Persistent cache tier. One table holds every namespace; values are stored as JSON.
+
+    Expired rows and rows beyond ``max_entries`` (least recently read first)
+    are evicted every ``EVICT_EVERY`` writes.
+    """
+
+    EVICT_EVERY = 64
+
+    def __init__(self, path, namespace, ttl=3600, max_entries=10000):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _conn(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key):
+        """Return ``(value, expires_at)`` or None when missing or expired."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        conn.execute(
+            "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, key)
+        )
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), expires_at, now)
+        )
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def evict(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time()))
+        conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key IN ("
+            " SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries)
+        )
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional SQLite tier.
+
+    Values must be JSON-serializable and are shared between callers once
+    cached, so treat them as read-only. Persistent-tier errors are logged
+    and degrade to a cache miss; they never fail the request.
+    """
+
+    def __init__(self, namespace, ttl=3600, memory_size=1024, persistent_size=10000, path=None):
+        path = CACHE_DB_PATH if path is None else path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.memory = LRUCache(memory_size, ttl)
+        self.persistent = None
+        if path:
+            try:
+                self.persistent = SQLiteCache(path, namespace, ttl, persistent_size)
+            except Exception as e:
+                logger.warning(f"Persistent cache '{namespace}' disabled ({path}): {e}")
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.persistent is not None:
+            try:
+                entry = self.persistent.get_entry(key)
+            except Exception as e:
+                logger.warning(f"Cache '{self.namespace}' read failed: {e}")
+                entry = None
+            if entry is not None:
+                value, expires_at = entry
+                self.memory.set(key, value, ttl=expires_at - time.time())
+                return value
+        return default
+
+    def set(self, key, value, ttl=None):
+        self.memory.set(key, value, ttl)
+        if self.persistent is not None:
+            try:
+                self.persistent.set(key, value, ttl)
+            except Exception as e:
+                logger.warning(f"Cache '{self.namespace}' write failed: {e}")
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.persistent is not None:
+            try:
+                self.persistent.delete(key)
+            except Exception as e:
+                logger.warning(f"Cache '{self.namespace}' delete failed: {e}")
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one.
+
+    Within a worker, callers that arrive while a call for their key is running
+    wait for it and share its result (or exception). Across workers, the leader
+    holds a lease row in the shared SQLite file; other workers poll ``lookup``
+    (normally the result cache the leader writes to) until the value appears
+    or the lease is gone, and only then make the call themselves.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, namespace, path=None, lease_ttl=30.0):
+        path = CACHE_DB_PATH if path is None else path
+        self.namespace = namespace
+        self.lease_ttl = lease_ttl
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.path = None
+        if path:
+            try:
+                self.path = path
+                self._conn().execute(
+                    "CREATE TABLE IF NOT EXISTS inflight ("
+                    " namespace TEXT NOT NULL, key TEXT NOT NULL, owner TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+                )
+            except Exception as e:
+                self.path = None
+                logger.warning(f"Cross-worker coalescing '{namespace}' disabled ({path}): {e}")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def do(self, key, fn, lookup=None):
+        """Return ``fn()``, sharing one call among concurrent callers with the same key.
+
+        ``lookup()`` returns the leader's published result or ``_MISSING``.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            with span("coalesce_wait"):
+                flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = self._across_workers(key, fn, lookup)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _across_workers(self, key, fn, lookup):
+        if self.path is None:
+            return fn()
+        deadline = time.time() + self.lease_ttl
+        while True:
+            try:
+                owner = self._acquire(key)
+            except Exception as e:
+                logger.warning(f"Coalescing '{self.namespace}' lease failed, calling directly: {e}")
+                return fn()
+            if owner is not None:
+                try:
+                    # Another worker may have published while we were polling
+                    value = lookup() if lookup else _MISSING
+                    return fn() if value is _MISSING else value
+                finally:
+                    self._release(key, owner)
+            if time.time() >= deadline:
+                return fn()
+            with span("coalesce_wait"):
+                time.sleep(self.POLL_INTERVAL)
+            if lookup:
+                value = lookup()
+                if value is not _MISSING:
+                    return value
+
+    def _acquire(self, key):
+        """Claim the lease for ``key``; returns the owner token, or None while someone else holds it."""
+        now = time.time()
+        owner = f"{os.getpid()}:{os.urandom(6).hex()}"
+        claimed = self._conn().execute(
+            "INSERT INTO inflight (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at"
+            " WHERE inflight.expires_at <= ?",
+            (self.namespace, key, owner, now + self.lease_ttl, now)
+        ).rowcount
+        return owner if claimed else None
+
+    def _release(self, key, owner):
+        try:
+            self._conn().execute(
+                "DELETE FROM inflight WHERE namespace = ? AND key = ? AND owner = ?",
+                (self.namespace, key, owner)
+            )
+        except Exception as e:
+            logger.warning(f"Coalescing '{self.namespace}' release failed: {e}")
+
+
+# =========================
+# GEMINI MODEL POOL
+# =========================
+class GeminiUnavailable(Exception):
+    """Raised instead of calling Gemini while the model's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open after ``failure_threshold`` failures,
+    then half-open after ``reset_timeout`` seconds, letting one probe call decide
+    whether to close again or re-open.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def is_open(self):
+        return self.state == "open"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.time()
+                self._probing = False
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == "open":
+                retry_in = round(max(0.0, self.reset_timeout - (time.time() - self.opened_at)), 1)
+            return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips, "retry_in": retry_in}
+
+
+TRANSIENT_HTTP_STATUSES = frozenset([429, 500, 503, 504])
+# Where an error's message carries its HTTP status: up front ("503 The service is
+# currently unavailable.", as google.api_core formats it) or labelled ("HTTP 503", "status code: 429")
+HTTP_STATUS_RE = re.compile(r'^\s*(\d{3})\b|\b(?:http|status(?: code)?|error code)\s*[:=]?\s*(\d{3})\b', re.IGNORECASE)
+
+
+def gemini_error_status(error):
+    """The HTTP status of a failed Gemini call, or None when it has none."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return int(code)
+    match = HTTP_STATUS_RE.search(str(error))
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def is_transient_gemini_error(error):
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying; bad requests are not."""
+    if isinstance(error, OSError):
+        return True
+    if type(error).__name__ in ("ResourceExhausted", "ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "TooManyRequests"):
+        return True
+    return gemini_error_status(error) in TRANSIENT_HTTP_STATUSES
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    base = GEMINI_BACKOFF_BASE if base is None else base
+    cap = GEMINI_BACKOFF_MAX if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class GenerativeModelPool:
+    """Process-wide GenerativeModel clients, one per (model, system instruction, generation config).
+
+    Models are built once and reused by every request, so the system
+    instruction and transport are set up once per worker. Hooks registered
+    with ``add_hook`` are called as ``hook(phase, model_name, seconds, error)``
+    where phase is "setup" (building a client) or "generate" (one
+    generate_content call), so setup cost can be measured apart from
+    generation latency.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._hooks = []
+        self._breakers = {}
+
+    @staticmethod
+    def _key(model_name, system_instruction, generation_config):
+        config = tuple(sorted((generation_config or {}).items()))
+        return (model_name, system_instruction, config)
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def _emit(self, phase, model_name, seconds, error=None):
+        for hook in self._hooks:
+            try:
+                hook(phase, model_name, seconds, error)
+            except Exception as e:
+                logger.warning(f"Gemini pool hook failed: {e}")
+
+    def get(self, model_name, system_instruction=None, generation_config=None):
+        key = self._key(model_name, system_instruction, generation_config)
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    started = time.perf_counter()
+                    with span("gemini_setup"):
+                        model = genai.GenerativeModel(
+                            model_name=model_name,
+                            system_instruction=system_instruction,
+                            generation_config=dict(generation_config) if generation_config else None
+                        )
+                    self._emit("setup", model_name, time.perf_counter() - started)
+                    self._models[key] = model
+        return model
+
+    def generate_content(self, model_name, prompt, system_instruction=None, generation_config=None):
+        model = self.get(model_name, system_instruction, generation_config)
+        started = time.perf_counter()
+        error = None
+        try:
+            with span("gemini"):
+                return model.generate_content(prompt)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._emit("generate", model_name, time.perf_counter() - started, error)
+
+    def breaker(self, model_name):
+        breaker = self._breakers.get(model_name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    model_name, CircuitBreaker(GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET)
+                )
+        return breaker
+
+    def breaker_states(self):
+        return {name: breaker.snapshot() for name, breaker in list(self._breakers.items())}
+
+    def call(self, model_name, prompt, system_instruction=None, generation_config=None, retries=None, site=None):
+        """generate_content behind the model's circuit breaker, retrying transient errors with backoff.
+
+        Raises GeminiUnavailable without calling Gemini while the breaker is
+        open, so callers drop straight to their fallback path. A call counts
+        once toward the breaker, and only when it still fails with a transient
+        error after its retries. ``site`` names the calling feature in /metrics
+        (defaults to the model name).
+        """
+        site = site or model_name
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self._call(model_name, prompt, system_instruction, generation_config, retries, site)
+            outcome = "ok"
+            return response
+        except GeminiUnavailable:
+            outcome = "circuit_open"
+            raise
+        finally:
+            METRICS.observe("careersafe_gemini_call_duration_seconds", time.perf_counter() - started, site=site, outcome=outcome)
+
+    def _call(self, model_name, prompt, system_instruction, generation_config, retries, site):
+        breaker = self.breaker(model_name)
+        retries = GEMINI_MAX_RETRIES if retries is None else retries
+        if not breaker.allow():
+            raise GeminiUnavailable(f"Gemini circuit open for {model_name}")
+        for attempt in range(retries + 1):
+            try:
+                response = self.generate_content(model_name, prompt, system_instruction, generation_config)
+            except Exception as e:
+                if not is_transient_gemini_error(e):
+                    # Gemini answered; it rejected this request (bad argument, permission, ...)
+                    breaker.record_success()
+                    raise
+                # Stop retrying once other calls have opened the breaker
+                if attempt < retries and not breaker.is_open():
+                    delay = backoff_delay(attempt)
+                    logger.warning(f"Gemini {model_name} transient error ({e}), retry {attempt + 1}/{retries} in {delay:.2f}s")
+                    METRICS.inc("careersafe_gemini_retries_total", site=site)
+                    with span("gemini_backoff"):
+                        time.sleep(delay)
+                    continue
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return response
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self):
+        return len(self._models)
+
+
+GEMINI_MODELS = GenerativeModelPool()
+
+# Shared by every /bulk-analyze request so the worker never has more than
+# BULK_AI_CONCURRENCY Gemini calls in flight from bulk work
+BULK_AI_EXECUTOR = ThreadPoolExecutor(max_workers=BULK_AI_CONCURRENCY, thread_name_prefix="bulk-ai")
+
+# Runs the Gemini-backed sections of /full-analysis side by side. A slot is held until the
+# call returns, even past its deadline, so one section's hung calls cannot take the
+# threads another section needs; rules-only sections run in the request thread
+SECTION_SLOTS = {
+    name: threading.BoundedSemaphore(FULL_ANALYSIS_CONCURRENCY)
+    for name in ("job_analysis", "company_verification")
+}
+SECTION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=FULL_ANALYSIS_CONCURRENCY * len(SECTION_SLOTS), thread_name_prefix="section"
+)
+
+
+# =========================
+# SCAM RULE SET (rules.json)
+# =========================
+class KeywordMatcher:
+    """Finds every keyword of a fixed vocabulary in a text with one compiled scan plan.
+
+    The vocabulary is deduplicated once, and a keyword is only searched for when
+    every shorter keyword it contains was found ("guaranteed income" is skipped
+    as soon as "guarantee" is absent). Matching keeps the plain substring
+    semantics of ``keyword in text``.
+    """
+
+    def __init__(self, keywords):
+        vocabulary = sorted(set(keywords), key=lambda k: (len(k), k))
+        plan = []
+        for i, keyword in enumerate(vocabulary):
+            contained = tuple(k for k in vocabulary[:i] if k in keyword)
+            # Only the longest contained keywords matter; their own
+            # prerequisites were already checked when they were searched
+            contained = tuple(k for k in contained if not any(k != o and k in o for o in contained))
+            plan.append((keyword, contained))
+        self.keywords = frozenset(vocabulary)
+        self._plan = tuple(plan)
+
+    def find(self, text):
+        """Return ``{keyword: offset of first occurrence}`` for every keyword in ``text``."""
+        hits = {}
+        find = text.find
+        for keyword, contained in self._plan:
+            if contained and not all(k in hits for k in contained):
+                continue
+            offset = find(keyword)
+            if offset >= 0:
+                hits[keyword] = offset
+        return hits
+
+
+def _compile_condition(spec):
+    """Compile a rules.json condition into (any, all, none, pattern, min_matches, negate)."""
+    pattern = re.compile(spec["pattern"]) if spec.get("pattern") else None
+    return (
+        tuple(spec.get("any", ())),
+        tuple(spec.get("all", ())),
+        tuple(spec.get("none", ())),
+        pattern,
+        int(spec.get("min_matches", 1)),
+        bool(spec.get("negate", False))
+    )
+
+
+def condition_holds(condition, text):
+    """Evaluate a compiled condition; every clause present in it must hold."""
+    any_of, all_of, none_of, pattern, min_matches, negate = condition
+    holds = True
+    if any_of and not any(k in text for k in any_of):
+        holds = False
+    elif all_of and not all(k in text for k in all_of):
+        holds = False
+    elif none_of and any(k in text for k in none_of):
+        holds = False
+    elif pattern is not None:
+        if min_matches > 1:
+            holds = len(pattern.findall(text)) >= min_matches
+        else:
+            holds = pattern.search(text) is not None
+    return holds != negate
+
+
+# A pattern that is nothing but plain words between \b anchors matches exactly the
+# word tokens equal to one of them, so it can be answered from word counts
+_WORD_ALTERNATION_RE = re.compile(r"\\b\(\?:(\w+(?:\|\w+)*)\)\\b")
+
+
+class ResumeEngine:
+    """All resume indicators compiled together and evaluated from one scan of the text.
+
+    Every keyword clause of every rule is answered by a single KeywordMatcher
+    pass, all word-alternation patterns by one combined regex scan that counts
+    each indicator word, and the remaining regexes are only run for rules
+    whose keyword clauses hold.
+    Each rule keeps the semantics of ``condition_holds``.
+    """
+
+    def __init__(self, suspicious, positive):
+        self.suspicious = tuple((spec["name"], self._compile(spec), spec["score"]) for spec in suspicious)
+        self.positive = tuple((spec["name"], self._compile(spec), spec["message"]) for spec in positive)
+        vocabulary = set()
+        words = set()
+        for _, rule, _ in self.suspicious + self.positive:
+            vocabulary.update(rule[0] + rule[1] + rule[2])
+            words.update(rule[3] or ())
+        self.matcher = KeywordMatcher(vocabulary)
+        self._words_re = None
+        if words:
+            alternatives = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+            self._words_re = re.compile(r"\b(?:" + alternatives + r")\b")
+
+    @staticmethod
+    def _compile(spec):
+        any_of, all_of, none_of, pattern, min_matches, negate = _compile_condition(spec)
+        words = None
+        alternation = _WORD_ALTERNATION_RE.fullmatch(spec.get("pattern") or "")
+        if alternation:
+            words = tuple(alternation.group(1).split("|"))
+            pattern = None
+        return any_of, all_of, none_of, words, pattern, min_matches, negate
+
+    @staticmethod
+    def _holds(rule, found, counts, text):
+        any_of, all_of, none_of, words, pattern, min_matches, negate = rule
+        holds = True
+        if any_of and not any(k in found for k in any_of):
+            holds = False
+        elif all_of and not all(k in found for k in all_of):
+            holds = False
+        elif none_of and any(k in found for k in none_of):
+            holds = False
+        elif words is not None:
+            holds = sum(counts[w] for w in words) >= min_matches
+        elif pattern is not None:
+            if min_matches > 1:
+                holds = len(pattern.findall(text)) >= min_matches
+            else:
+                holds = pattern.search(text) is not None
+        return holds != negate
+
+    def evaluate(self, text):
+        """Return ``(suspicious, positive)``: the (name, score) and (name, message) pairs that hold."""
+        found = self.matcher.find(text)
+        counts = Counter(self._words_re.findall(text)) if self._words_re is not None else None
+        suspicious = [(name, score) for name, rule, score in self.suspicious if self._holds(rule, found, counts, text)]
+        positive = [(name, message) for name, rule, message in self.positive if self._holds(rule, found, counts, text)]
+        return suspicious, positive
+
+
+class RuleSet:
+    """Immutable, compiled view of the scoring rules file.
+
+    Built once per load and never mutated, so a request that reads ``RULES``
+    once sees one consistent version even if a reload swaps it mid-request.
+    """
+
+    def __init__(self, raw, source=None):
+        job = raw["job_analysis"]
+        resume = raw["resume"]
+
+        self.version = str(raw.get("version", "unversioned"))
+        self.source = source
+        self.loaded_at = datetime.now().isoformat()
+
+        self.high_risk_keywords = MappingProxyType(dict(job["high_risk_keywords"]))
+        self.medium_risk_keywords = MappingProxyType(dict(job["medium_risk_keywords"]))
+        self.legitimate_keywords = MappingProxyType(dict(job["legitimate_keywords"]))
+        self.exclamation_re = re.compile(job["excessive_exclamation"]["pattern"])
+        self.exclamation_score = job["excessive_exclamation"]["score"]
+        self.capitals_re = re.compile(job["excessive_capitalization"]["pattern"])
+        self.capitals_score = job["excessive_capitalization"]["score"]
+        self.link_keywords = tuple(job["suspicious_link"]["keywords"])
+        self.link_score = job["suspicious_link"]["score"]
+        self.verification_keywords = tuple(job["account_verification"]["keywords"])
+        self.verification_score = job["account_verification"]["score"]
+        self.professional_terms = tuple(job["professional_language"]["terms"])
+        self.professional_min_terms = job["professional_language"]["min_terms"]
+        self.professional_score = job["professional_language"]["score"]
+        self.contact_score = job["contact_information"]["score"]
+        self.medium_risk_threshold = job["risk_levels"]["medium"]
+        self.high_risk_threshold = job["risk_levels"]["high"]
+        # Checked in order, first match wins
+        self.scam_types = tuple(
+            (t["name"], t["description"], tuple(t["keywords"])) for t in job["scam_types"]
+        )
+        self.category_scores = MappingProxyType({
+            name: MappingProxyType(dict(spec, keywords=tuple(spec["keywords"])))
+            for name, spec in job["category_scores"].items()
+        })
+        self.ai_adjustments = tuple(
+            (_compile_condition(spec), spec["score"]) for spec in job.get("ai_adjustments", ())
+        )
+
+        vocabulary = set(self.high_risk_keywords) | set(self.medium_risk_keywords) | set(self.legitimate_keywords)
+        vocabulary.update(self.link_keywords, self.verification_keywords, self.professional_terms)
+        for _, _, keywords in self.scam_types:
+            vocabulary.update(keywords)
+        for spec in self.category_scores.values():
+            vocabulary.update(spec["keywords"])
+        self.matcher = KeywordMatcher(vocabulary)
+
+        self.resume_base_risk = resume["base_risk"]
+        self.resume_medium_threshold = resume["risk_levels"]["medium"]
+        self.resume_high_threshold = resume["risk_levels"]["high"]
+        self.resume_engine = ResumeEngine(resume["suspicious_patterns"], resume["positive_indicators"])
+
+        self.fictional_keywords = tuple(raw["career_guidance"]["fictional_keywords"])
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("RuleSet is immutable; reload the rules file instead")
+        object.__setattr__(self, name, value)
+
+
+def load_rules(path=None):
+    """Read and compile the rules file. Raises on a missing or malformed file."""
+    path = path or RULES_FILE
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return RuleSet(raw, source=path)
+
+
+def rules_file_signature(path):
+    """Changes whenever the file is edited, replaced or touched."""
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def reload_rules(path=None, broadcast=False):
+    """Compile a fresh RuleSet and swap it in; the old one stays live if loading fails.
+
+    With ``broadcast`` the file is touched afterwards, so the other workers
+    reload it on their next check_rules_file().
+    """
+    global RULES, _rules_signature
+    path = path or RULES_FILE
+    # Taken before reading, so a write that lands during the load triggers another reload
+    signature = rules_file_signature(path)
+    rules = load_rules(path)
+    # A single name rebinding: in-flight requests keep the RuleSet they already hold
+    RULES = rules
+    if broadcast:
+        try:
+            os.utime(path)
+            signature = rules_file_signature(path)
+        except OSError as e:
+            logger.warning(f"Could not touch {path}, other workers keep their rules until it changes: {e}")
+    _rules_signature = signature
+    logger.info(f"Scam rules reloaded: version {rules.version} from {rules.source}")
+    return rules
+
+
 # =========================
 # JOB / MESSAGE RISK ANALYSIS (AI)
 # =========================
-def analyze_text(text_raw: str):
+EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+PHONE_RE = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+JOB_ANALYSIS_MODEL = 'gemini-2.0-flash-lite'
+JOB_ANALYSIS_GENERATION_CONFIG = {"temperature": 0.4, "top_p": 0.95, "top_k": 40, "max_output_tokens": 1024}
+# Bump whenever the system instruction or prompt changes so cached explanations are not reused
+JOB_ANALYSIS_PROMPT_VERSION = "2"
+
+# Professional system instruction for the job scam analyst
+JOB_ANALYSIS_SYSTEM_INSTRUCTION = """You are an elite Job Scam Detection Specialist with 20+ years of experience in cybersecurity, fraud prevention, and employment law. Your expertise includes:
+
+- Identifying sophisticated phishing schemes and social engineering tactics
+- Analyzing linguistic patterns used by scammers
+- Recognizing legitimate vs. fraudulent job postings across all industries
+- Understanding employment regulations and red flags in hiring processes
+- Detecting financial fraud schemes disguised as job opportunities
+
+YOUR MISSION: Protect job seekers from employment scams, financial fraud, identity theft, and exploitative work arrangements.
+
+ANALYSIS FRAMEWORK - Think through each step:
+
+1. INITIAL ASSESSMENT
+   - What is the source and context of this message?
+   - Does it follow standard professional recruitment practices?
+   - Are there obvious red flags or suspicious elements?
+
+2. DEEP LINGUISTIC ANALYSIS
+   - Examine word choice, tone, and urgency tactics
+   - Identify psychological manipulation techniques
+   - Check for grammatical errors or inconsistencies
+   - Analyze promises (realistic vs. too-good-to-be-true)
+
+3. FINANCIAL RED FLAGS
+   - Any requests for money, fees, or financial information?
+   - Mentions of wire transfers, cryptocurrency, or unusual payment methods?
+   - Promises of guaranteed income or unrealistic compensation?
+
+4. IDENTITY THEFT INDICATORS
+   - Requests for SSN, bank details, or sensitive personal data?
+   - Timing of such requests (before interview vs. after offer)?
+   - Legitimate business need for the information requested?
+
+5. VERIFICATION CHECKS
+   - Is the company name verifiable and legitimate?
+   - Are contact details professional and traceable?
+   - Does the job posting appear on official company websites?
+
+6. OVERALL RISK ASSESSMENT
+   - Weigh all factors comprehensively
+   - Consider context and industry norms
+   - Provide a clear, actionable verdict
+
+CRITICAL THINKING REQUIREMENTS:
+- Question every claim made in the message
+- Consider what a scammer would do to appear legitimate
+- Think about the victim's perspective and vulnerabilities
+- Be thorough but concise in your analysis
+
+OUTPUT FORMAT:
+Provide a professional, structured analysis in 3-4 paragraphs:
+
+Paragraph 1: Overall Assessment (Is this legitimate, suspicious, or clearly a scam?)
+Paragraph 2: Key Evidence (What specific elements support your conclusion?)
+Paragraph 3: Risk Factors (What could go wrong if the user engages?)
+Paragraph 4: Recommendation (Clear action steps - proceed, investigate further, or avoid)
+
+Be direct, evidence-based, and protective of the user. Your analysis could save someone from financial ruin or identity theft."""
+
+
+def inline_literal(text, indent):
+    """``text`` as it read when written inline as a triple-quoted literal ``indent`` spaces deep.
+
+    Every line after the first, blank ones included, carries that indentation.
+    The Gemini prompts were inline literals before they became constants;
+    rebuilding their indentation keeps the text Gemini receives unchanged.
+    """
+    first, *rest = text.split("\n")
+    return "\n".join([first] + [" " * indent + line for line in rest])
+
+
+# Detailed analysis prompt
+JOB_ANALYSIS_PROMPT = inline_literal("""ANALYZE THIS JOB OFFER/MESSAGE FOR SCAM INDICATORS:
+
+MESSAGE TEXT:
+\"\"\"{message}\"\"\"
+
+Think step-by-step through the analysis framework. Consider:
+- What makes this legitimate or suspicious?
+- What evidence supports your conclusion?
+- What are the specific risks to the user?
+- What should the user do next?
+
+Provide your professional risk assessment now:""", indent=20)
+
+# Explanations keyed on message content, so a viral scam text costs one Gemini call
+JOB_EXPLANATION_CACHE = TieredCache(
+    "job_explanation",
+    ttl=AI_CACHE_TTL,
+    memory_size=AI_CACHE_MEMORY_ENTRIES,
+    persistent_size=AI_CACHE_MAX_ENTRIES
+)
+JOB_EXPLANATION_FLIGHTS = SingleFlight("job_explanation", lease_ttl=SINGLE_FLIGHT_LEASE)
+
+
+def job_explanation_cache_key(text):
+    """Content address for an explanation: the prompted text, normalized, plus model and prompt version."""
+    normalized = " ".join(text[:1000].lower().split())
+    return cache_key(JOB_ANALYSIS_MODEL, JOB_ANALYSIS_PROMPT_VERSION, normalized)
+
+
+# Compiled once at startup and replaced wholesale by reload_rules()
+boot_mark("module_body")
+_rules_signature = rules_file_signature(RULES_FILE)
+RULES = load_rules()
+boot_mark("rules")
+_rules_checked_at = time.monotonic()
+_rules_reload_requested = False
+_rules_check_lock = threading.Lock()
+
+
+@app.before_request
+def check_rules_file():
+    """Reload the rules when their file changed (at most one stat per RULES_CHECK_INTERVAL) or SIGHUP asked to."""
+    global _rules_checked_at, _rules_reload_requested, _rules_signature
+    now = time.monotonic()
+    if not _rules_reload_requested and now - _rules_checked_at < RULES_CHECK_INTERVAL:
+        return
+    if not _rules_check_lock.acquire(blocking=False):
+        return  # another request in this worker is already checking
+    try:
+        _rules_checked_at = now
+        requested, _rules_reload_requested = _rules_reload_requested, False
+        path = RULES.source
+        try:
+            if requested:
+                reload_rules(path, broadcast=True)
+                return
+            signature = rules_file_signature(path)
+            if signature != _rules_signature:
+                try:
+                    reload_rules(path)
+                except Exception:
+                    # Do not retry a broken file every interval; the next edit changes the signature
+                    _rules_signature = signature
+                    raise
+        except Exception as e:
+            logger.error(f"Rules reload failed, keeping version {RULES.version}: {e}")
+    finally:
+        _rules_check_lock.release()
+
+
+def _handle_reload_signal(signum, frame):
+    # No I/O in the handler: the next request in this worker reloads and touches the file
+    global _rules_reload_requested
+    _rules_reload_requested = True
+
+
+# `kill -HUP <worker pid>` reloads the rules in every worker without restarting them
+if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+    try:
+        signal.signal(signal.SIGHUP, _handle_reload_signal)
+    except ValueError:
+        pass
+
+
+def analyze_text_rules(text_raw: str, rules=None):
+    """Rule-based half of analyze_text: every field except the Gemini explanation."""
     text = (text_raw or "").lower()
     if not text or len(text.strip()) < 10:
         return {
@@ -121,88 +1966,58 @@ def analyze_text(text_raw: str):
     reasons = []
     safety_tips = []
 
-    high_risk_keywords = {
-        "urgent": 15, "urgently": 15, "immediately": 12, "asap": 10,
-        "guaranteed": 20, "guarantee": 18, "guaranteed income": 25,
-        "easy money": 25, "quick money": 20,
-        "work from home": 8, "no experience needed": 15, "no experience required": 15,
-        "registration fee": 40, "processing fee": 35, "application fee": 35,
-        "send money": 50, "wire transfer": 40, "western union": 35, "moneygram": 35,
-        "bitcoin": 30, "cryptocurrency": 25, "crypto": 25,
-        "bank details": 45, "bank account": 40, "account number": 40,
-        "ssn": 50, "social security": 50, "social security number": 50,
-        "credit card": 35, "paypal": 20, "venmo": 20, "zelle": 20,
-        "congratulations": 5, "you have been selected": 10, "you won": 15,
-        "prize": 20, "lottery": 25, "inheritance": 30,
-        "nigerian prince": 50, "royal family": 40, "unclaimed funds": 35
-    }
-
-    medium_risk_keywords = {
-        "high salary": 10, "unlimited income": 15, "passive income": 12,
-        "get rich": 20, "become rich": 18, "millionaire": 15,
-        "part time": 5, "flexible hours": 3,
-        "no interview": 8, "instant approval": 10, "pre-approved": 8,
-        "limited time": 8, "act now": 10, "call now": 8, "text now": 8,
-        "reply immediately": 12
-    }
+    # Read once so a concurrent reload cannot mix two rule versions in one result
+    rules = rules or RULES
 
-    legitimate_keywords = {
-        "careers.google.com": -20, "linkedin.com": -15, "indeed.com": -15,
-        "glassdoor.com": -15, "monster.com": -10,
-        "official website": -15, "apply through": -10, "company website": -10,
-        "hr department": -10, "human resources": -10,
-        "interview process": -10, "background check": -5, "references required": -5,
-        "benefits package": -8, "health insurance": -8, "401k": -5, "pto": -5,
-        "paid time off": -5
-    }
+    # One sweep over the text; every keyword rule below reads from this hit set
+    hits = rules.matcher.find(text)
 
-    for keyword, score in high_risk_keywords.items():
-        if keyword in text:
+    for keyword, score in rules.high_risk_keywords.items():
+        if keyword in hits:
             risk_score += score
             reasons.append(f"Contains high-risk keyword: '{keyword}'")
 
-    for keyword, score in medium_risk_keywords.items():
-        if keyword in text:
+    for keyword, score in rules.medium_risk_keywords.items():
+        if keyword in hits:
             risk_score += score
             reasons.append(f"Contains medium-risk indicator: '{keyword}'")
 
-    for keyword, score in legitimate_keywords.items():
-        if keyword in text:
+    for keyword, score in rules.legitimate_keywords.items():
+        if keyword in hits:
             risk_score += score
             reasons.append(f"Contains legitimate indicator: '{keyword}'")
 
-    if re.search(r'[!]{2,}', text):
-        risk_score += 10
+    has_exclamations = bool(rules.exclamation_re.search(text))
+    has_capitals = bool(rules.capitals_re.search(text))
+
+    if has_exclamations:
+        risk_score += rules.exclamation_score
         reasons.append("Excessive exclamation marks (common in scams)")
 
-    if re.search(r'[A-Z]{5,}', text):
-        risk_score += 8
+    if has_capitals:
+        risk_score += rules.capitals_score
         reasons.append("Excessive capitalization (common in scam messages)")
 
-    if "click here" in text or "click this link" in text:
-        risk_score += 15
+    if any(k in hits for k in rules.link_keywords):
+        risk_score += rules.link_score
         reasons.append("Contains suspicious link request")
 
-    if "verify your account" in text or "confirm your identity" in text:
-        risk_score += 20
+    if any(k in hits for k in rules.verification_keywords):
+        risk_score += rules.verification_score
         reasons.append("Requests account verification (common phishing tactic)")
 
-    professional_terms = ["position", "role", "responsibilities", "qualifications",
-                         "requirements", "experience", "skills", "education"]
-    professional_count = sum(1 for term in professional_terms if term in text)
-    if professional_count >= 3:
-        risk_score -= 15
+    professional_count = sum(1 for term in rules.professional_terms if term in hits)
+    if professional_count >= rules.professional_min_terms:
+        risk_score += rules.professional_score
         reasons.append("Contains professional job posting language")
 
-    email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    if re.search(email_pattern, text) or re.search(phone_pattern, text):
-        risk_score -= 5
+    if EMAIL_RE.search(text) or PHONE_RE.search(text):
+        risk_score += rules.contact_score
         reasons.append("Contains contact information (legitimate postings usually include this)")
 
     risk_score = max(0, min(100, risk_score))
 
-    if risk_score < 30:
+    if risk_score < rules.medium_risk_threshold:
         risk_level = "Low"
         safety_tips = [
             "✓ This appears to be a legitimate job posting",
@@ -212,7 +2027,7 @@ def analyze_text(text_raw: str):
         ]
         if risk_score == 0:
             reasons.append("No scam indicators detected - appears legitimate")
-    elif risk_score < 70:
+    elif risk_score < rules.high_risk_threshold:
         risk_level = "Medium"
         safety_tips = [
             "⚠️ Be cautious and verify all details",
@@ -233,7 +2048,7 @@ def analyze_text(text_raw: str):
         ]
 
     if not reasons:
-        if risk_score < 30:
+        if risk_score < rules.medium_risk_threshold:
             reasons = ["No obvious scam indicators detected", "Contains standard job posting language"]
         else:
             reasons = ["Multiple risk factors detected"]
@@ -242,19 +2057,12 @@ def analyze_text(text_raw: str):
     # Identify Potential Scam Type
     scam_type = "Unknown / Generic Risk"
     scam_type_desc = "Examples include vague job descriptions or unrealistic promises."
-    
-    if any(k in text for k in ["registration fee", "processing fee", "send money", "wire transfer", "bitcoin", "check"]):
-        scam_type = "Advance Fee Fraud"
-        scam_type_desc = "The scammer asks for money upfront (for equipment, software, or fees) before you start working. Legitimate employers NEVER ask for money."
-    elif any(k in text for k in ["ssn", "bank details", "credit card", "verify your account", "login"]):
-        scam_type = "Phishing / Identity Theft"
-        scam_type_desc = "The goal is to steal your personal information (SSN, Bank Info) to commit identity fraud."
-    elif any(k in text for k in ["package", "shipping", "warehouse", "receiving"]):
-        scam_type = "Reshipping Scam"
-        scam_type_desc = "You are asked to receive and reship packages. You are essentially moving stolen goods."
-    elif any(k in text for k in ["click here", "urgent", "immediately", "act now"]):
-        scam_type = "Urgency / Click-bait"
-        scam_type_desc = "Scammers use urgency to make you act without thinking. Be very careful with links."
+
+    for name, desc, keywords in rules.scam_types:
+        if any(k in hits for k in keywords):
+            scam_type = name
+            scam_type_desc = desc
+            break
 
     # Generate Action Plan
     action_plan = []
@@ -280,143 +2088,24 @@ def analyze_text(text_raw: str):
             "🤝 Interview: Ensure you have a video or in-person interview."
         ]
 
-    verification_checklist = {
-        "red_flags": [r for r in reasons if any(k in r.lower() for k in ["high-risk", "suspicious", "excessive", "requests account", "send money", "bank details", "ssn", "verify your account", "click here"])],
-        "green_flags": [r for r in reasons if any(k in r.lower() for k in ["professional job posting language", "contact information", "legitimate indicator", "no scam indicators"])],
-        "tips": safety_tips
-    }
-
-    ai_explanation = ""
-    if GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE":
-        try:
-            # Configure Gemini with professional system instruction
-            system_instruction = """You are an elite Job Scam Detection Specialist with 20+ years of experience in cybersecurity, fraud prevention, and employment law. Your expertise includes:
-
-- Identifying sophisticated phishing schemes and social engineering tactics
-- Analyzing linguistic patterns used by scammers
-- Recognizing legitimate vs. fraudulent job postings across all industries
-- Understanding employment regulations and red flags in hiring processes
-- Detecting financial fraud schemes disguised as job opportunities
-
-YOUR MISSION: Protect job seekers from employment scams, financial fraud, identity theft, and exploitative work arrangements.
-
-ANALYSIS FRAMEWORK - Think through each step:
-
-1. INITIAL ASSESSMENT
-   - What is the source and context of this message?
-   - Does it follow standard professional recruitment practices?
-   - Are there obvious red flags or suspicious elements?
-
-2. DEEP LINGUISTIC ANALYSIS
-   - Examine word choice, tone, and urgency tactics
-   - Identify psychological manipulation techniques
-   - Check for grammatical errors or inconsistencies
-   - Analyze promises (realistic vs. too-good-to-be-true)
-
-3. FINANCIAL RED FLAGS
-   - Any requests for money, fees, or financial information?
-   - Mentions of wire transfers, cryptocurrency, or unusual payment methods?
-   - Promises of guaranteed income or unrealistic compensation?
-
-4. IDENTITY THEFT INDICATORS
-   - Requests for SSN, bank details, or sensitive personal data?
-   - Timing of such requests (before interview vs. after offer)?
-   - Legitimate business need for the information requested?
-
-5. VERIFICATION CHECKS
-   - Is the company name verifiable and legitimate?
-   - Are contact details professional and traceable?
-   - Does the job posting appear on official company websites?
-
-6. OVERALL RISK ASSESSMENT
-   - Weigh all factors comprehensively
-   - Consider context and industry norms
-   - Provide a clear, actionable verdict
-
-CRITICAL THINKING REQUIREMENTS:
-- Question every claim made in the message
-- Consider what a scammer would do to appear legitimate
-- Think about the victim's perspective and vulnerabilities
-- Be thorough but concise in your analysis
-
-OUTPUT FORMAT:
-Provide a professional, structured analysis in 3-4 paragraphs:
-
-Paragraph 1: Overall Assessment (Is this legitimate, suspicious, or clearly a scam?)
-Paragraph 2: Key Evidence (What specific elements support your conclusion?)
-Paragraph 3: Risk Factors (What could go wrong if the user engages?)
-Paragraph 4: Recommendation (Clear action steps - proceed, investigate further, or avoid)
-
-Be direct, evidence-based, and protective of the user. Your analysis could save someone from financial ruin or identity theft."""
-
-            # Retry logic for 429 errors
-            import time
-            for attempt in range(2):
-                try:
-                    model = genai.GenerativeModel(
-                        model_name='gemini-2.0-flash-lite',
-                        system_instruction=system_instruction
-                    )
-                    
-                    # Detailed analysis prompt
-                    analysis_prompt = f"""ANALYZE THIS JOB OFFER/MESSAGE FOR SCAM INDICATORS:
-                    
-                    MESSAGE TEXT:
-                    \"\"\"{text[:1000]}\"\"\"
-                    
-                    Think step-by-step through the analysis framework. Consider:
-                    - What makes this legitimate or suspicious?
-                    - What evidence supports your conclusion?
-                    - What are the specific risks to the user?
-                    - What should the user do next?
-                    
-                    Provide your professional risk assessment now:"""
-        
-                    response = model.generate_content(
-                        analysis_prompt,
-                        generation_config=genai.types.GenerationConfig(
-                            temperature=0.4,
-                            top_p=0.95,
-                            top_k=40,
-                            max_output_tokens=1024,
-                        )
-                    )
-                    ai_explanation = response.text
-                    break # Success!
-                except Exception as e:
-                    if "429" in str(e) and attempt == 0:
-                        logger.warning("429 Rate Limit hit in Job Analyze, retrying in 2s...")
-                        time.sleep(2)
-                        continue
-                    raise e
-            
-            # Enhanced risk adjustment based on AI analysis
-            if "scam" in ai_explanation.lower() or "fraud" in ai_explanation.lower():
-                risk_score = min(100, risk_score + 20)
-            if "highly suspicious" in ai_explanation.lower() or "definitely a scam" in ai_explanation.lower():
-                risk_score = min(100, risk_score + 15)
-            if "legitimate" in ai_explanation.lower() and "appears to be" in ai_explanation.lower():
-                risk_score = max(0, risk_score - 10)
-                
-                
-            logger.info(f"✓ Job Risk AI Analysis successful")
-        except Exception as e:
-            logger.error(f"✗ Job Risk Gemini AI Analysis Error: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            pass
-
+    verification_checklist = {
+        "red_flags": [r for r in reasons if any(k in r.lower() for k in ["high-risk", "suspicious", "excessive", "requests account", "send money", "bank details", "ssn", "verify your account", "click here"])],
+        "green_flags": [r for r in reasons if any(k in r.lower() for k in ["professional job posting language", "contact information", "legitimate indicator", "no scam indicators"])],
+        "tips": safety_tips
+    }
+
     # Categorical Risk Breakdown
+    categories = rules.category_scores
     linguistic_risk = 0
-    if re.search(r'[!]{2,}', text): linguistic_risk += 30
-    if re.search(r'[A-Z]{5,}', text): linguistic_risk += 20
-    if any(k in text for k in ["urgent", "immediately", "asap"]): linguistic_risk += 40
+    if has_exclamations: linguistic_risk += categories["linguistic"]["exclamation_score"]
+    if has_capitals: linguistic_risk += categories["linguistic"]["capitalization_score"]
+    if any(k in hits for k in categories["linguistic"]["keywords"]): linguistic_risk += categories["linguistic"]["score"]
 
     financial_risk = 0
-    if any(k in text for k in ["fee", "money", "transfer", "bitcoin", "pay", "bank"]): financial_risk += 80
+    if any(k in hits for k in categories["financial"]["keywords"]): financial_risk += categories["financial"]["score"]
 
     identity_risk = 0
-    if any(k in text for k in ["ssn", "social security", "identity", "verify"]): identity_risk += 90
+    if any(k in hits for k in categories["identity"]["keywords"]): identity_risk += categories["identity"]["score"]
 
     return {
         "risk_percentage": risk_score,
@@ -424,7 +2113,7 @@ Be direct, evidence-based, and protective of the user. Your analysis could save
         "reasons": reasons,
         "safety_tips": safety_tips,
         "verification_checklist": verification_checklist,
-        "ai_explanation": ai_explanation,
+        "ai_explanation": "",
         "scam_type": scam_type if risk_level != "Low" else "None",
         "scam_type_desc": scam_type_desc if risk_level != "Low" else "This appears to be a legitimate opportunity.",
         "action_plan": action_plan,
@@ -436,6 +2125,300 @@ Be direct, evidence-based, and protective of the user. Your analysis could save
         "timestamp": datetime.now().isoformat()
     }
 
+class JobBatchScorer:
+    """Rule-based job scoring for a whole batch of messages at once.
+
+    Each message gets the same KeywordMatcher sweep and regex checks as
+    analyze_text_rules; the hits form a sparse message x keyword matrix
+    (coordinate arrays), and every score is then a NumPy product of that matrix
+    with per-keyword weight/indicator columns, thresholded with masks. The
+    results equal the corresponding fields of analyze_text_rules.
+    """
+
+    def __init__(self, rules):
+        if not np.available:
+            raise RuntimeError("numpy is required for batch scoring")
+        self.rules = rules
+        vocabulary = sorted(rules.matcher.keywords)
+        self.columns = {keyword: i for i, keyword in enumerate(vocabulary)}
+        categories = rules.category_scores
+
+        weights = np.zeros(len(vocabulary), dtype=np.int64)
+        for table in (rules.high_risk_keywords, rules.medium_risk_keywords, rules.legitimate_keywords):
+            for keyword, score in table.items():
+                weights[self.columns[keyword]] += score
+
+        # One column per "how many of these keywords were hit" feature
+        groups = [
+            rules.link_keywords,
+            rules.verification_keywords,
+            rules.professional_terms,
+            categories["linguistic"]["keywords"],
+            categories["financial"]["keywords"],
+            categories["identity"]["keywords"],
+        ] + [keywords for _, _, keywords in rules.scam_types]
+        self.matrix = np.zeros((len(vocabulary), len(groups) + 1), dtype=np.int64)
+        self.matrix[:, 0] = weights
+        for g, keywords in enumerate(groups, start=1):
+            for keyword in set(keywords):
+                self.matrix[self.columns[keyword], g] = 1
+
+    def hit_matrix(self, texts):
+        """Lowercased texts -> (rows, cols) of keyword hits plus per-message regex flags and short-text mask."""
+        rules = self.rules
+        find = rules.matcher.find
+        columns = self.columns
+        rows, cols = [], []
+        n = len(texts)
+        exclamations = np.zeros(n, dtype=bool)
+        capitals = np.zeros(n, dtype=bool)
+        contact = np.zeros(n, dtype=bool)
+        short = np.zeros(n, dtype=bool)
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) < 10:
+                short[i] = True
+                continue
+            hit_cols = [columns[keyword] for keyword in find(text)]
+            rows.extend([i] * len(hit_cols))
+            cols.extend(hit_cols)
+            exclamations[i] = rules.exclamation_re.search(text) is not None
+            capitals[i] = rules.capitals_re.search(text) is not None
+            contact[i] = EMAIL_RE.search(text) is not None or PHONE_RE.search(text) is not None
+        return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), exclamations, capitals, contact, short
+
+    def score(self, texts_raw):
+        """Score a batch; returns a dict of arrays aligned with ``texts_raw``."""
+        rules = self.rules
+        categories = rules.category_scores
+        texts = [(t or "").lower() for t in texts_raw]
+        n = len(texts)
+        rows, cols, exclamations, capitals, contact, short = self.hit_matrix(texts)
+
+        # Sparse (n x vocabulary) hit matrix times the (vocabulary x features) matrix
+        features = np.zeros((n, self.matrix.shape[1]), dtype=np.int64)
+        np.add.at(features, rows, self.matrix[cols])
+        keyword_score = features[:, 0]
+        link, verification, professional, linguistic_kw, financial_kw, identity_kw = (features[:, g] for g in range(1, 7))
+        scam_hits = features[:, 7:] > 0
+
+        risk = (keyword_score
+                + exclamations * rules.exclamation_score
+                + capitals * rules.capitals_score
+                + (link > 0) * rules.link_score
+                + (verification > 0) * rules.verification_score
+                + (professional >= rules.professional_min_terms) * rules.professional_score
+                + contact * rules.contact_score)
+        risk = np.clip(risk, 0, 100)
+        risk[short] = 50
+        level = np.where(risk < rules.medium_risk_threshold, 0, np.where(risk < rules.high_risk_threshold, 1, 2))
+        level[short] = 1
+
+        linguistic = (exclamations * categories["linguistic"]["exclamation_score"]
+                      + capitals * categories["linguistic"]["capitalization_score"]
+                      + (linguistic_kw > 0) * categories["linguistic"]["score"])
+        financial = (financial_kw > 0) * categories["financial"]["score"]
+        identity = (identity_kw > 0) * categories["identity"]["score"]
+
+        # First matching scam type in rules order, -1 for none
+        scam_type = np.where(scam_hits.any(axis=1), scam_hits.argmax(axis=1), -1) if scam_hits.shape[1] else np.full(n, -1)
+
+        return {
+            "risk_percentage": risk,
+            "risk_level": level,
+            "linguistic": np.minimum(100, linguistic),
+            "financial": np.minimum(100, financial),
+            "identity": np.minimum(100, identity),
+            "scam_type": scam_type,
+            "short": short,
+        }
+
+    def records(self, texts_raw):
+        """Per-message dicts with the scored fields of analyze_text_rules (short texts: risk and level only)."""
+        scores = self.score(texts_raw)
+        names = ("Low", "Medium", "High")
+        scam_types = self.rules.scam_types
+        columns = [scores[k].tolist() for k in ("risk_percentage", "risk_level", "linguistic", "financial", "identity", "scam_type", "short")]
+        results = []
+        for risk, level, linguistic, financial, identity, scam, short in zip(*columns):
+            if short:
+                results.append({"risk_percentage": risk, "risk_level": names[level]})
+                continue
+            if level == 0:
+                scam_type = "None"
+            else:
+                scam_type = scam_types[scam][0] if scam >= 0 else "Unknown / Generic Risk"
+            results.append({
+                "risk_percentage": risk,
+                "risk_level": names[level],
+                "scam_type": scam_type,
+                "category_scores": {"linguistic": linguistic, "financial": financial, "identity": identity},
+            })
+        return results
+
+
+_batch_scorer = None
+
+
+def analyze_text_batch(texts, rules=None):
+    """Rule-based risk, level, scam type and category scores for many messages (requires numpy).
+
+    For offline and bulk scoring: no Gemini calls, and only the scored fields
+    of analyze_text are returned, computed for the whole batch with NumPy.
+    """
+    global _batch_scorer
+    rules = rules or RULES
+    scorer = _batch_scorer
+    if scorer is None or scorer.rules is not rules:
+        scorer = _batch_scorer = JobBatchScorer(rules)
+    return scorer.records(texts)
+
+
+def job_ai_explanation(text):
+    """Gemini's scam assessment for a message, served from the explanation cache when possible.
+
+    Returns "" when Gemini is unavailable or fails; never raises.
+    """
+    text = (text or "").lower()
+    explanation_key = job_explanation_cache_key(text)
+    with span("ai_cache"):
+        ai_explanation = JOB_EXPLANATION_CACHE.get(explanation_key) or ""
+    if ai_explanation:
+        logger.info("✓ Job Risk AI Analysis served from cache")
+        return ai_explanation
+    return JOB_EXPLANATION_FLIGHTS.do(
+        explanation_key,
+        lambda: _fetch_job_explanation(text, explanation_key),
+        lookup=lambda: JOB_EXPLANATION_CACHE.get(explanation_key) or _MISSING
+    )
+
+
+def _fetch_job_explanation(text, explanation_key):
+    ai_explanation = ""
+    try:
+        analysis_prompt = JOB_ANALYSIS_PROMPT.format(message=text[:1000])
+        response = GEMINI_MODELS.call(
+            JOB_ANALYSIS_MODEL,
+            analysis_prompt,
+            system_instruction=JOB_ANALYSIS_SYSTEM_INSTRUCTION,
+            generation_config=JOB_ANALYSIS_GENERATION_CONFIG,
+            site="analyze_text"
+        )
+        ai_explanation = response.text
+
+        if ai_explanation:
+            JOB_EXPLANATION_CACHE.set(explanation_key, ai_explanation)
+        logger.info(f"✓ Job Risk AI Analysis successful")
+    except GeminiUnavailable as e:
+        logger.warning(f"✗ Job Risk AI Analysis skipped: {e}")
+    except Exception as e:
+        logger.error(f"✗ Job Risk Gemini AI Analysis Error: {e}")
+        logger.error(traceback.format_exc())
+    return ai_explanation
+
+
+def apply_ai_explanation(result, ai_explanation, rules=None):
+    """Attach an explanation to a rule-based result and apply the AI risk adjustments in place."""
+    rules = rules or RULES
+    risk_score = result["risk_percentage"]
+    # Enhanced risk adjustment based on AI analysis
+    explanation_lower = ai_explanation.lower()
+    for condition, score in rules.ai_adjustments:
+        if condition_holds(condition, explanation_lower):
+            risk_score = max(0, min(100, risk_score + score))
+    result["risk_percentage"] = risk_score
+    result["ai_explanation"] = ai_explanation
+    return result
+
+
+def analyze_text(text_raw: str):
+    rules = RULES
+    with span("rules"):
+        result = analyze_text_rules(text_raw, rules)
+    # Too-short texts get the fixed placeholder verdict and no AI call
+    if "verification_checklist" not in result:
+        path = "short_text"
+    elif GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE":
+        ai_explanation = job_ai_explanation(text_raw)
+        apply_ai_explanation(result, ai_explanation, rules)
+        path = "ai" if ai_explanation else "rules_fallback"
+    else:
+        path = "rules"
+    METRICS.inc("careersafe_job_analysis_total", path=path)
+    return result
+
+
+def iter_bulk_analysis(texts, deadline=None):
+    """Analyze a batch, yielding each result (tagged with its ``index``) as soon as it is ready.
+
+    Identical texts are scored once. Rule scoring runs for every text up
+    front and Gemini calls fan out on BULK_AI_EXECUTOR as they are queued;
+    results without an AI step are yielded immediately, the rest in
+    completion order until ``deadline`` seconds have passed. Items whose AI
+    call misses the deadline keep their rule-only result and carry
+    ``"ai_deadline_exceeded": True``; the late call still finishes in the
+    background and lands in the explanation cache.
+    """
+    started = time.monotonic()
+    deadline = BULK_AI_DEADLINE if deadline is None else deadline
+    rules = RULES
+    use_ai = bool(GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE")
+
+    # Dedupe on the text that is actually analyzed
+    positions = OrderedDict()
+    for idx, text in enumerate(texts):
+        if not isinstance(text, str):
+            logger.warning(f"Error analyzing text {idx}: not a string")
+            yield {"index": idx, "error": "Analysis failed", "risk_percentage": 0}
+            continue
+        positions.setdefault(text[:MAX_TEXT_LENGTH], []).append(idx)
+
+    futures = {}
+    for text, indices in positions.items():
+        try:
+            result = analyze_text_rules(text, rules)
+        except Exception as e:
+            logger.warning(f"Error analyzing texts {indices}: {e}")
+            for idx in indices:
+                yield {"index": idx, "error": "Analysis failed", "risk_percentage": 0}
+            continue
+        if use_ai and "verification_checklist" in result:
+            futures[BULK_AI_EXECUTOR.submit(job_ai_explanation, text)] = (result, indices)
+        else:
+            for idx in indices:
+                yield dict(result, index=idx)
+
+    finished = set()
+    try:
+        for future in as_completed(futures, timeout=max(0.0, deadline - (time.monotonic() - started))):
+            finished.add(future)
+            result, indices = futures[future]
+            apply_ai_explanation(result, future.result(), rules)
+            for idx in indices:
+                yield dict(result, index=idx)
+    except FuturesTimeoutError:
+        late = 0
+        for future, (result, indices) in futures.items():
+            if future in finished:
+                continue
+            if future.done() and not future.cancelled():
+                apply_ai_explanation(result, future.result(), rules)
+            else:
+                future.cancel()
+                result["ai_deadline_exceeded"] = True
+                late += 1
+            for idx in indices:
+                yield dict(result, index=idx)
+        logger.warning(f"Bulk analysis: {late} AI calls missed the {deadline}s deadline")
+
+
+def bulk_analyze_texts(texts, deadline=None):
+    """Analyze a batch and return the results in input order (see iter_bulk_analysis)."""
+    results = [None] * len(texts)
+    for result in iter_bulk_analysis(texts, deadline):
+        results[result["index"]] = result
+    return results
+
+
 @app.route("/analyze", methods=["POST"]) 
 @rate_limit(limit=20, window=60)
 def analyze():
@@ -457,6 +2440,44 @@ def analyze():
 # =========================
 # AI CAREER GUIDANCE
 # =========================
+CAREER_GUIDANCE_MODEL = 'gemini-2.0-flash-lite'
+CAREER_GUIDANCE_GENERATION_CONFIG = {"temperature": 0.7, "response_mime_type": "application/json"}
+CAREER_GUIDANCE_SYSTEM_INSTRUCTION = inline_literal("""You are an expert Career Counselor and Learning Path Architect.
+Your goal is to provide highly detailed, actionable career roadmaps for any given skill or job role.
+
+PROJECT MISSION: Provide the "Cleanest" and most "Professional" roadmap possible.
+
+For the given skill/role, provide:
+1. Market Outlook: A professional assessment of the current job market demand.
+2. Careers: 3 specific job titles related to this skill, with salary ranges and growth potential.
+3. Detailed Roadmap: A 3-phase roadmap (Foundation, Specialization, Mastery).
+   - Each phase should have exactly 3 concrete steps.
+   - Each step MUST have:
+     - title: The name of the skill/concept to learn.
+     - notes: Detailed explanation of what to focus on and why it's important (2 sentences).
+     - video_query: A specific, high-quality search query for YouTube that would yield the best tutorial for this exact step.
+4. Salary Benchmarks: Entry, Mid, and Senior level estimates.
+5. Difficulty Rating: 1-10 (as an integer).
+6. Improvement Tips: 4 quick tips to accelerate learning.
+
+STRICT JSON FORMAT REQUIRMENT:
+Return ONLY a valid JSON object. No other text.
+{
+  "market_outlook": "string",
+  "careers": [{"title": "string", "salary": "string", "growth": "string", "skills": ["string"]}],
+  "detailed_roadmap": [
+    {
+      "phase": "string",
+      "steps": [{"title": "string", "notes": "string", "video_query": "string"}]
+    }
+  ],
+  "salary_benchmarks": {"entry": "string", "mid": "string", "senior": "string"},
+  "difficulty_rating": 7,
+  "improvement_tips": ["string"]
+}
+""", indent=16)
+
+
 @app.route("/career-guidance", methods=["POST"])
 @rate_limit(limit=15, window=60)
 def career_guidance():
@@ -470,18 +2491,7 @@ def career_guidance():
         logger.info(f"Career guidance for skill: {skill}")
         
         # List of fictional characters, superheroes, and unrealistic career goals
-        fictional_keywords = [
-            "iron man", "ironman", "superman", "batman", "spiderman", "spider-man",
-            "hulk", "thor", "captain america", "black widow", "wonder woman",
-            "flash", "aquaman", "green lantern", "deadpool", "wolverine",
-            "doraemon", "naruto", "goku", "luffy", "pikachu", "pokemon",
-            "mickey mouse", "donald duck", "spongebob", "tom and jerry",
-            "wizard", "sorcerer", "vampire", "werewolf", "dragon", "unicorn",
-            "fairy", "elf", "dwarf", "hobbit", "superhero", "super hero",
-            "mario", "sonic", "link", "zelda", "master chief", "kratos",
-            "god", "jesus", "santa", "easter bunny", "tooth fairy",
-            "king", "queen", "prince", "princess"
-        ]
+        fictional_keywords = RULES.fictional_keywords
         
         is_unrealistic = any(keyword in skill for keyword in fictional_keywords)
         
@@ -571,57 +2581,18 @@ def career_guidance():
 
         if GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE":
             try:
-                system_instruction = """You are an expert Career Counselor and Learning Path Architect.
-                Your goal is to provide highly detailed, actionable career roadmaps for any given skill or job role.
-                
-                PROJECT MISSION: Provide the "Cleanest" and most "Professional" roadmap possible.
-                
-                For the given skill/role, provide:
-                1. Market Outlook: A professional assessment of the current job market demand.
-                2. Careers: 3 specific job titles related to this skill, with salary ranges and growth potential.
-                3. Detailed Roadmap: A 3-phase roadmap (Foundation, Specialization, Mastery).
-                   - Each phase should have exactly 3 concrete steps.
-                   - Each step MUST have:
-                     - title: The name of the skill/concept to learn.
-                     - notes: Detailed explanation of what to focus on and why it's important (2 sentences).
-                     - video_query: A specific, high-quality search query for YouTube that would yield the best tutorial for this exact step.
-                4. Salary Benchmarks: Entry, Mid, and Senior level estimates.
-                5. Difficulty Rating: 1-10 (as an integer).
-                6. Improvement Tips: 4 quick tips to accelerate learning.
-                
-                STRICT JSON FORMAT REQUIRMENT:
-                Return ONLY a valid JSON object. No other text.
-                {
-                  "market_outlook": "string",
-                  "careers": [{"title": "string", "salary": "string", "growth": "string", "skills": ["string"]}],
-                  "detailed_roadmap": [
-                    {
-                      "phase": "string",
-                      "steps": [{"title": "string", "notes": "string", "video_query": "string"}]
-                    }
-                  ],
-                  "salary_benchmarks": {"entry": "string", "mid": "string", "senior": "string"},
-                  "difficulty_rating": 7,
-                  "improvement_tips": ["string"]
-                }
-                """
-
-                model = genai.GenerativeModel(
-                    model_name='gemini-2.0-flash-lite',
-                    system_instruction=system_instruction
-                )
-                
                 prompt = f"Generate a comprehensive career roadmap for someone wanting to learn: {skill}"
-                
-                response = model.generate_content(
+
+                response = GEMINI_MODELS.call(
+                    CAREER_GUIDANCE_MODEL,
                     prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.7,
-                        response_mime_type="application/json",
-                    )
+                    system_instruction=CAREER_GUIDANCE_SYSTEM_INSTRUCTION,
+                    generation_config=CAREER_GUIDANCE_GENERATION_CONFIG,
+                    site="career_guidance"
                 )
                 
-                data = json.loads(response.text)
+                with span("parse"):
+                    data = json.loads(response.text)
                 
                 return jsonify({
                     "status": "success",
@@ -696,6 +2667,491 @@ def career_guidance():
 # =========================
 # RESUME PDF AUTHENTICITY CHECK
 # =========================
+class DigestingSpooledFile(tempfile.SpooledTemporaryFile):
+    """Werkzeug's upload spool, hashing the bytes as the multipart parser writes them."""
+
+    def __init__(self):
+        super().__init__(max_size=500 * 1024, mode="rb+")
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        return super().write(data)
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return DigestingSpooledFile()
+
+
+app.request_class = UploadRequest
+
+
+def upload_digest(file_storage):
+    """Hex SHA-256 of an upload; free when the upload was spooled by UploadRequest."""
+    digest = getattr(file_storage.stream, "sha256", None)
+    if digest is None:
+        digest = hashlib.sha256()
+        file_storage.stream.seek(0)
+        for block in iter(lambda: file_storage.stream.read(1024 * 1024), b""):
+            digest.update(block)
+        file_storage.stream.seek(0)
+    return digest.hexdigest()
+
+
+# Repeat uploads of the same PDF skip extraction; verdicts are re-scored from the
+# stored text when the rules have been reloaded since
+RESUME_RESULT_CACHE = LRUCache(RESUME_CACHE_ENTRIES, RESUME_CACHE_TTL)
+
+
+def open_upload(file_storage, size):
+    """Seekable view of an uploaded file without copying it into memory.
+
+    Werkzeug spools uploads into a SpooledTemporaryFile; large ones are moved
+    to disk (``fileno`` forces the rollover) and memory-mapped. Returns
+    ``(stream, mapping)``; close the mapping when done.
+    """
+    stream = file_storage.stream
+    stream.seek(0)
+    if size >= RESUME_MMAP_THRESHOLD:
+        try:
+            mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            return mapping, mapping
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            pass
+    return stream, None
+
+
+def extract_pdf_pages(stream, start=0, stop=None, budget=None, max_chars=None):
+    """Text of pages ``[start, stop)`` as a list of per-page chunks, within the ingestion limits.
+
+    Returns ``(chunks, stats)``; ``stats["stopped"]`` is "time_budget" or
+    "text_limit" when a limit ended extraction before ``stop``.
+    """
+    budget = RESUME_EXTRACT_BUDGET if budget is None else budget
+    max_chars = RESUME_MAX_CHARS if max_chars is None else max_chars
+    started = time.perf_counter()
+    reader = PyPDF2.PdfReader(stream)
+    total_pages = len(reader.pages)
+    stop = total_pages if stop is None else min(stop, total_pages)
+    chunks = []
+    chars = 0
+    pages_read = 0
+    stopped = None
+    for number in range(start, stop):
+        if time.perf_counter() - started > budget:
+            stopped = "time_budget"
+            break
+        extracted = reader.pages[number].extract_text()
+        pages_read += 1
+        if extracted:
+            chunks.append(extracted)
+            chars += len(extracted)
+            if chars >= max_chars:
+                stopped = "text_limit" if number + 1 < stop else None
+                break
+    return chunks, {"pages": total_pages, "pages_read": pages_read, "stopped": stopped}
+
+
+def extract_pdf_text(stream, max_pages=None, budget=None, max_chars=None):
+    """Lowercased text of a PDF parsed in this process. Returns ``(text, stats)``."""
+    max_pages = RESUME_MAX_PAGES if max_pages is None else max_pages
+    started = time.perf_counter()
+    chunks, stats = extract_pdf_pages(stream, 0, max_pages, budget, max_chars)
+    if not stats["stopped"] and stats["pages"] > max_pages:
+        stats["stopped"] = "page_limit"
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return "".join(chunks).lower(), stats
+
+
+class PDFExtractionError(Exception):
+    """A PDF could not be parsed in time or within the worker memory limit."""
+
+
+def _pdf_worker_main(conn, memory_limit_mb):
+    """Child process loop: parse page ranges of files named by the parent until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    # Forked from a gunicorn worker, the child would inherit its SIGTERM handler (which
+    # only flags a graceful stop) and outlive the worker's exit
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        # Before the memory cap, and before the first upload arrives
+        PyPDF2.load("pdf worker start")
+    except ImportError:
+        pass
+    if resource is not None and memory_limit_mb:
+        try:
+            # The child starts as a copy of the parent, so the cap is on growth beyond that
+            with open("/proc/self/statm") as statm:
+                current = int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+            limit = current + memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (OSError, ValueError):
+            pass
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        op, path, args = job
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                if op == "count":
+                    reply = ("ok", len(PyPDF2.PdfReader(mapping).pages))
+                else:
+                    reply = ("ok", extract_pdf_pages(mapping, *args))
+        except MemoryError:
+            reply = ("error", "memory limit exceeded")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            return
+
+
+def _wait_reply(conn, timeout):
+    """``conn.poll(timeout)`` that lets other requests run while the child works.
+
+    Under gevent a plain poll or recv on the pipe blocks the whole worker, so
+    the wait goes through the hub; the reply is read once it has started to
+    arrive, and the child writes it in one go.
+    """
+    if cooperative_io():
+        gevent_socket = importlib.import_module("gevent.socket")
+        try:
+            gevent_socket.wait_read(conn.fileno(), timeout=timeout)
+        except gevent_socket.timeout:
+            return False
+        return True
+    return conn.poll(timeout)
+
+
+class PDFExtractionPool:
+    """Pre-forked processes that parse PDFs, so a hostile document cannot pin a web worker.
+
+    Each job waits at most ``timeout`` seconds; a child that misses it, dies or
+    runs out of memory is killed and replaced before the error is raised.
+    """
+
+    def __init__(self, size, memory_limit_mb=512):
+        self.size = size
+        self.memory_limit_mb = memory_limit_mb
+        self.replaced = 0
+        self._ctx = multiprocessing.get_context("fork")
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        # Under gevent the pipe is a patched, non-blocking socketpair; both ends use blocking
+        # reads, and the parent waits for replies through _wait_reply
+        os.set_blocking(parent_conn.fileno(), True)
+        os.set_blocking(child_conn.fileno(), True)
+        process = self._ctx.Process(
+            target=_pdf_worker_main, args=(child_conn, self.memory_limit_mb),
+            name="pdf-extract", daemon=True
+        )
+        try:
+            process.start()
+        except BaseException:
+            parent_conn.close()
+            child_conn.close()
+            raise
+        child_conn.close()
+        return process, parent_conn
+
+    def _replace(self, worker):
+        """A fresh child for ``worker``'s slot; the dead worker itself if none can be forked.
+
+        The slot is kept either way, so a failed fork (EAGAIN, out of memory)
+        does not shrink the pool; the next job on that slot tries again.
+        """
+        process, conn = worker
+        conn.close()
+        if process.is_alive():
+            process.kill()
+        process.join(1)
+        try:
+            worker = self._spawn()
+        except Exception as e:
+            logger.error(f"PDF worker could not be restarted: {e}")
+            return worker
+        self.replaced += 1
+        return worker
+
+    def run(self, job, timeout):
+        """Send one job to an idle child and return its result."""
+        if timeout <= 0:
+            raise PDFExtractionError("PDF extraction deadline passed")
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            raise PDFExtractionError("no PDF worker available in time")
+        try:
+            if not worker[0].is_alive():
+                worker = self._replace(worker)
+                if not worker[0].is_alive():
+                    raise PDFExtractionError("no PDF worker could be started")
+            worker[1].send(job)
+            if not _wait_reply(worker[1], max(0.0, deadline - time.monotonic())):
+                worker = self._replace(worker)
+                raise PDFExtractionError(f"PDF extraction timed out after {timeout:.1f}s")
+            status, payload = worker[1].recv()
+        except (EOFError, OSError) as e:
+            worker = self._replace(worker)
+            raise PDFExtractionError(f"PDF worker died: {e}")
+        finally:
+            self._idle.put(worker)
+        if status != "ok":
+            raise PDFExtractionError(payload)
+        return payload
+
+    def extract_text(self, path, max_pages=None, timeout=None, budget=None, max_chars=None):
+        """Lowercased text of the PDF at ``path``, page ranges parsed in parallel children.
+
+        Returns ``(text, stats)`` like ``extract_pdf_text``. Ranges after the first
+        one that fails are dropped; if the first range fails the error is raised.
+        """
+        max_pages = RESUME_MAX_PAGES if max_pages is None else max_pages
+        timeout = PDF_EXTRACT_TIMEOUT if timeout is None else timeout
+        max_chars = RESUME_MAX_CHARS if max_chars is None else max_chars
+        started = time.monotonic()
+        deadline = started + timeout
+        total_pages = self.run(("count", path, ()), timeout)
+        stop = min(total_pages, max_pages)
+        ranges = [(first, min(first + PDF_SPLIT_PAGES, stop)) for first in range(0, stop, PDF_SPLIT_PAGES)]
+        futures = [
+            PDF_DISPATCH_EXECUTOR.submit(self._run_until, ("extract", path, (first, last, budget, max_chars)), deadline)
+            for first, last in ranges
+        ]
+        chunks = []
+        chars = 0
+        pages_read = 0
+        stopped = "page_limit" if total_pages > max_pages else None
+        try:
+            for number, future in enumerate(futures):
+                try:
+                    range_chunks, range_stats = future.result()
+                except PDFExtractionError as e:
+                    if number == 0:
+                        raise
+                    logger.warning(f"PDF pages {ranges[number][0]}+ dropped: {e}")
+                    stopped = "time_budget"
+                    break
+                chunks.extend(range_chunks)
+                chars += sum(len(chunk) for chunk in range_chunks)
+                pages_read += range_stats["pages_read"]
+                if range_stats["stopped"]:
+                    stopped = range_stats["stopped"]
+                    break
+                if chars >= max_chars:
+                    if number + 1 < len(futures):
+                        stopped = "text_limit"
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+        stats = {"pages": total_pages, "pages_read": pages_read, "stopped": stopped,
+                 "seconds": round(time.monotonic() - started, 3)}
+        return "".join(chunks).lower(), stats
+
+    def _run_until(self, job, deadline):
+        # Ranges may queue behind other uploads; the document's deadline still applies
+        return self.run(job, deadline - time.monotonic())
+
+    def close(self):
+        while True:
+            try:
+                process, conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.send(None)
+            except (EOFError, OSError):
+                pass
+            conn.close()
+            process.join(1)
+
+
+def _start_pdf_pool():
+    if PDF_WORKERS <= 0:
+        return None
+    started = time.perf_counter()
+    try:
+        pool = PDFExtractionPool(PDF_WORKERS, PDF_WORKER_MEMORY_MB)
+    except Exception as e:
+        logger.error(f"PDF worker processes unavailable, parsing in-process: {e}")
+        return None
+    logger.info(f"✓ Started {PDF_WORKERS} PDF worker processes in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return pool
+
+
+_pdf_pool = None
+_pdf_pool_started = False
+_pdf_pool_lock = threading.Lock()
+
+
+def pdf_pool():
+    """The PDF worker pool, forked on the first upload that needs it; None parses in the request thread.
+
+    Nothing is forked at import, so processes that never parse a PDF (scripts,
+    benchmarks, serverless cold starts) never start children.
+    """
+    global _pdf_pool, _pdf_pool_started
+    if not _pdf_pool_started:
+        with _pdf_pool_lock:
+            if not _pdf_pool_started:
+                _pdf_pool = _start_pdf_pool()
+                _pdf_pool_started = True
+    return _pdf_pool
+
+
+# Fans page ranges of one document out to the pool's children
+PDF_DISPATCH_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, PDF_WORKERS), thread_name_prefix="pdf-dispatch")
+
+
+def spool_upload(file_storage):
+    """Copy an upload to a named temp file (in 1 MB blocks) that child processes can open."""
+    stream = file_storage.stream
+    stream.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="careersafe-", suffix=".pdf", delete=False) as spooled:
+        shutil.copyfileobj(stream, spooled, 1024 * 1024)
+        return spooled.name
+
+
+def resume_pdf_text(file_storage, size):
+    """Extract an uploaded resume: in the PDF worker pool when running, else in this thread."""
+    pool = pdf_pool()
+    mode = "inline" if pool is None else "pool"
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with span("pdf_extract"):
+            text, stats = _resume_pdf_text(pool, file_storage, size)
+        outcome = stats["stopped"] or "ok"
+        return text, stats
+    finally:
+        METRICS.observe("careersafe_pdf_extraction_duration_seconds", time.perf_counter() - started, mode=mode, outcome=outcome)
+
+
+def _resume_pdf_text(pool, file_storage, size):
+    if pool is not None:
+        path = spool_upload(file_storage)
+        try:
+            return pool.extract_text(path)
+        finally:
+            os.unlink(path)
+    pdf_file, mapping = open_upload(file_storage, size)
+    try:
+        return extract_pdf_text(pdf_file)
+    finally:
+        if mapping is not None:
+            mapping.close()
+
+
+def analyze_resume(text, rules=None):
+    """Verdict for lowercased resume text, shared by /resume-check and /full-analysis (no timestamp)."""
+    rules = rules or RULES
+    risk = rules.resume_base_risk
+    reasons = []
+    warnings = []
+    positives = []
+
+    suspicious, positive = rules.resume_engine.evaluate(text)
+    for pattern, score in suspicious:
+        risk += score
+        reasons.append(f"Potential issue: {pattern.replace('_', ' ').title()}")
+    for indicator, message in positive:
+        positives.append(message)
+
+    # Normalize risk
+    risk = min(100, risk)
+    
+    if risk < rules.resume_medium_threshold:
+        risk_level = "Low"
+        message = "Resume appears authentic with minor concerns"
+    elif risk < rules.resume_high_threshold:
+        risk_level = "Medium"
+        message = "Resume has some areas that need verification"
+    else:
+        risk_level = "High"
+        message = "Resume has significant authenticity concerns"
+
+    suggestions = []
+    improvement_plan = []
+    
+    if risk < rules.resume_medium_threshold:
+        suggestions = [
+            "Tailor your resume for each job application (keywords + relevance)",
+            "Ensure LinkedIn profile matches resume and is up to date",
+            "Apply to roles that match your experience and network with recruiters"
+        ]
+    elif risk < rules.resume_high_threshold:
+        suggestions = [
+            "Add specific achievements and quantify impact (e.g., improved X by Y%)",
+            "Include date ranges for employment and education",
+            "List relevant projects and provide links to code/portfolio",
+            "Add verifiable certifications or details for claimed certifications"
+        ]
+        improvement_plan = [
+            "Step 1: Add dates and contact information",
+            "Step 2: Replace vague words with measurable achievements",
+            "Step 3: Add 1-2 portfolio projects with descriptions and links",
+            "Step 4: Proofread and get peer feedback"
+        ]
+    else:
+        suggestions = [
+            "Review and remove unverifiable claims",
+            "Provide supporting evidence for certifications and roles",
+            "Add clear contact information and project links",
+            "Consider rebuilding resume with a template focused on clarity and verification"
+        ]
+        improvement_plan = [
+            "Step 1: Verify all dates and roles; remove inflated claims",
+            "Step 2: Add project links, GitHub, portfolio or published work",
+            "Step 3: Obtain verifiable certifications or references",
+            "Step 4: Reformat resume for clarity and include measurable outcomes"
+        ]
+
+    return {
+        "risk_percentage": risk,
+        "risk_level": risk_level,
+        "reasons": reasons if reasons else ["No major issues detected"],
+        "warnings": warnings,
+        "positives": positives,
+        "message": message,
+        "suggestions": suggestions,
+        "improvement_plan": improvement_plan,
+        "word_count": len(text.split())
+    }
+
+
+def resume_response(digest, text, result=None):
+    """Answer /resume-check from extracted text, scoring it unless ``result`` is given, and cache both."""
+    if not text or len(text.strip()) < 10:
+        RESUME_RESULT_CACHE.set(digest, {"text": text, "rules_version": RULES.version, "result": None})
+        return jsonify({
+            "error": "PDF appears to be empty or unreadable",
+            "risk_percentage": 50,
+            "risk_level": "Medium",
+            "reasons": ["Unable to extract text from PDF"],
+            "message": "Please ensure the PDF contains readable text"
+        }), 400
+    if result is None:
+        rules = RULES
+        with span("score"):
+            result = analyze_resume(text, rules)
+        RESUME_RESULT_CACHE.set(digest, {"text": text, "rules_version": rules.version, "result": result})
+    return jsonify(dict(result, timestamp=datetime.now().isoformat()))
+
+
 @app.route("/resume-check", methods=["POST"])
 @rate_limit(limit=10, window=60)
 def resume_check():
@@ -714,118 +3170,30 @@ def resume_check():
             return jsonify({"error": "File size exceeds limit"}), 400
         logger.info(f"Processing resume: {file.filename} ({file_size} bytes)")
         
-        # Read PDF using PyPDF2 (Vercel friendly)
-        pdf_file = io.BytesIO(file.read())
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted.lower()
-        
-        if not text or len(text.strip()) < 10:
-            return jsonify({
-                "error": "PDF appears to be empty or unreadable",
-                "risk_percentage": 50,
-                "risk_level": "Medium",
-                "reasons": ["Unable to extract text from PDF"],
-                "message": "Please ensure the PDF contains readable text"
-            }), 400
-
-        risk = 10
-        reasons = []
-        warnings = []
-        positives = []
-
-        # Check for suspicious patterns
-        suspicious_patterns = {
-            "excessive keywords": (len(re.findall(r'\b(?:expert|master|guru|ninja)\b', text)) > 5, 15),
-            "unverifiable experience": ("10+ years" in text or "15+ years" in text, 10),
-            "missing dates": (not re.search(r'\d{4}', text), 5),
-            "certification without proof": ("certified" in text and "certificate" not in text and "certification" not in text, 20),
-            "skill mismatch": (("python" in text and "javascript" in text and "java" in text and "c++" in text), 10),
-            "vague descriptions": (len(re.findall(r'\b(?:various|many|several|multiple)\b', text)) > 3, 8)
-        }
-
-        for pattern, (condition, score) in suspicious_patterns.items():
-            if condition:
-                risk += score
-                reasons.append(f"Potential issue: {pattern.replace('_', ' ').title()}")
-
-        # Check for positive indicators
-        positive_indicators = {
-            "education listed": ("education" in text or "university" in text or "degree" in text, "Has education section"),
-            "work history": (re.search(r'\d{4}.*\d{4}', text), "Has date ranges for experience"),
-            "specific skills": (len(re.findall(r'\b(?:python|javascript|react|node|sql|aws)\b', text)) > 3, "Lists specific technical skills"),
-            "contact info": (re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text), "Has contact information"),
-            "projects": ("project" in text or "portfolio" in text, "Mentions projects or portfolio")
-        }
-
-        for indicator, (condition, message) in positive_indicators.items():
-            if condition:
-                positives.append(message)
-
-        # Normalize risk
-        risk = min(100, risk)
-        
-        if risk < 30:
-            risk_level = "Low"
-            message = "Resume appears authentic with minor concerns"
-        elif risk < 60:
-            risk_level = "Medium"
-            message = "Resume has some areas that need verification"
-        else:
-            risk_level = "High"
-            message = "Resume has significant authenticity concerns"
-
-        suggestions = []
-        improvement_plan = []
-        
-        if risk < 30:
-            suggestions = [
-                "Tailor your resume for each job application (keywords + relevance)",
-                "Ensure LinkedIn profile matches resume and is up to date",
-                "Apply to roles that match your experience and network with recruiters"
-            ]
-        elif risk < 60:
-            suggestions = [
-                "Add specific achievements and quantify impact (e.g., improved X by Y%)",
-                "Include date ranges for employment and education",
-                "List relevant projects and provide links to code/portfolio",
-                "Add verifiable certifications or details for claimed certifications"
-            ]
-            improvement_plan = [
-                "Step 1: Add dates and contact information",
-                "Step 2: Replace vague words with measurable achievements",
-                "Step 3: Add 1-2 portfolio projects with descriptions and links",
-                "Step 4: Proofread and get peer feedback"
-            ]
-        else:
-            suggestions = [
-                "Review and remove unverifiable claims",
-                "Provide supporting evidence for certifications and roles",
-                "Add clear contact information and project links",
-                "Consider rebuilding resume with a template focused on clarity and verification"
-            ]
-            improvement_plan = [
-                "Step 1: Verify all dates and roles; remove inflated claims",
-                "Step 2: Add project links, GitHub, portfolio or published work",
-                "Step 3: Obtain verifiable certifications or references",
-                "Step 4: Reformat resume for clarity and include measurable outcomes"
-            ]
+        with span("digest"):
+            digest = upload_digest(file)
+        cached = RESUME_RESULT_CACHE.get(digest)
+        if cached is not None:
+            logger.info(f"✓ Resume served from cache ({digest[:12]})")
+            text = cached["text"]
+            result = cached["result"] if cached["rules_version"] == RULES.version else None
+            return resume_response(digest, text, result)
 
-        return jsonify({
-            "risk_percentage": risk,
-            "risk_level": risk_level,
-            "reasons": reasons if reasons else ["No major issues detected"],
-            "warnings": warnings,
-            "positives": positives,
-            "message": message,
-            "suggestions": suggestions,
-            "improvement_plan": improvement_plan,
-            "timestamp": datetime.now().isoformat(),
-            "word_count": len(text.split())
-        })
+        # Read PDF using PyPDF2 (Vercel friendly), isolated in the PDF worker pool
+        try:
+            text, stats = resume_pdf_text(file, file_size)
+        except PDFExtractionError as e:
+            logger.warning(f"Resume extraction failed for {file.filename}: {e}")
+            return jsonify({
+                "error": "PDF could not be processed",
+                "risk_percentage": 50,
+                "risk_level": "Medium",
+                "reasons": ["PDF took too long or too much memory to read"],
+                "message": "Please upload a smaller, text-based PDF"
+            }), 400
+        if stats["stopped"]:
+            logger.info(f"Resume extraction stopped early ({stats['stopped']}): {stats['pages_read']}/{stats['pages']} pages")
+        return resume_response(digest, text)
     except Exception as e:
         return jsonify({
             "error": f"Error reading PDF: {str(e)}",
@@ -859,7 +3227,239 @@ def verify_company():
 
 
 
-def verify_company_data(company_name: str):
+COMPANY_VERIFICATION_MODEL = 'gemini-2.0-flash-lite'
+# Use a system instruction for strict JSON output
+COMPANY_VERIFICATION_SYSTEM_INSTRUCTION = "You are a professional corporate fraud investigator. Always respond with STRICT JSON. No markdown, no chatter, no backticks."
+# Enhanced prompt for comprehensive company analysis
+COMPANY_VERIFICATION_PROMPT = inline_literal("""Analyze company: {company_name}. Return JSON:
+{{
+  "full_name": "Official Legal Name",
+  "industry": "Industry Type",
+  "headquarters": "Full Street Address, City, State, Country",
+  "location_verified": true/false,
+  "website": "URL",
+  "linkedin": "URL",
+  "glassdoor": "URL",
+  "rating": 0.0-5.0,
+  "employees": "Count",
+  "history": "Long description",
+  "past_issues": ["Issue1", "Issue2"],
+  "competitors": ["Comp1", "Comp2"],
+  "growth_stats": [int, int, int, int, int, int],
+  "is_scam": true/false
+}}
+
+Verify the location: is the headquarters real (true) or just a PO Box/virtual office (false)?
+If company is unknown but seems like a generic business, do NOT mark as scam unless it shows fraud patterns.
+""", indent=12)
+
+# Verified profiles keyed on the normalized company name. Entries stay servable for
+# TTL + STALE_TTL; past TTL they are served while a background refresh runs.
+COMPANY_CACHE = TieredCache(
+    "company_verification",
+    ttl=COMPANY_CACHE_TTL + COMPANY_CACHE_STALE_TTL,
+    memory_size=AI_CACHE_MEMORY_ENTRIES,
+    persistent_size=AI_CACHE_MAX_ENTRIES
+)
+COMPANY_FLIGHTS = SingleFlight("company_verification", lease_ttl=SINGLE_FLIGHT_LEASE)
+_company_refreshes = set()
+_company_refreshes_lock = threading.Lock()
+
+
+LEGAL_SUFFIXES = frozenset([
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "sas", "srl", "spa", "bv", "nv", "lp", "llp", "pvt", "pte", "pty",
+    "kk", "oy", "ab", "as"
+])
+
+
+def normalize_company_name(company_name):
+    """Cache/registry key for a company: lowercase alphanumeric tokens with trailing legal suffixes removed.
+
+    "Google LLC", "google, inc." and "GOOGLE" all normalize to "google".
+    """
+    name = (company_name or "").lower()
+    # Collapse dotted acronyms first so "L.L.C." becomes the single token "llc"
+    name = re.sub(r'\b(?:[a-z]\.){2,}', lambda m: m.group(0).replace('.', ''), name)
+    tokens = re.sub(r'[^a-z0-9&]+', ' ', name).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+class CompanyRegistry:
+    """Known-good companies, indexed for lookups that do not grow with the registry.
+
+    Every registered name is stored under its tuple of normalized tokens. A
+    lookup probes the input's token n-grams, longest first, for n up to the
+    longest registered name, so it costs O(len(input)) hash probes however
+    many companies share a word. "Google Careers" finds "google" but
+    "Metadata Inc" does not find "meta".
+    """
+
+    def __init__(self, companies, version=None, source=None):
+        self.version = version
+        self.source = source
+        self._by_name = {}
+        self.max_tokens = 0
+        for company in companies:
+            for name in [company["name"]] + list(company.get("aliases", [])):
+                tokens = tuple(normalize_company_name(name).split())
+                if not tokens:
+                    continue
+                self._by_name[tokens] = company
+                self.max_tokens = max(self.max_tokens, len(tokens))
+
+    def lookup(self, company_name):
+        """Return the registered profile for ``company_name`` or None.
+
+        The longest registered name found in the input wins; among equally
+        long ones, the earliest in the input.
+        """
+        tokens = tuple(normalize_company_name(company_name).split())
+        for length in range(min(self.max_tokens, len(tokens)), 0, -1):
+            for i in range(len(tokens) - length + 1):
+                company = self._by_name.get(tokens[i:i + length])
+                if company is not None:
+                    return company
+        return None
+
+    def __len__(self):
+        return len(self._by_name)
+
+
+def load_company_registry(path=None):
+    """Build the registry from COMPANY_REGISTRY_FILE (JSON with a "companies" list)."""
+    path = path or COMPANY_REGISTRY_FILE
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return CompanyRegistry(raw["companies"], version=raw.get("version"), source=path)
+
+
+# Built once at import; a lookup is a few hash probes per input token, whatever the registry size
+boot_mark("module_body")
+COMPANY_REGISTRY = load_company_registry()
+boot_mark("company_registry")
+
+
+def fetch_company_profile(company_name):
+    """Ask Gemini for a company profile. Returns verified/risk/company_information; raises on failure."""
+    prompt = COMPANY_VERIFICATION_PROMPT.format(company_name=company_name)
+
+    response = GEMINI_MODELS.call(
+        COMPANY_VERIFICATION_MODEL,
+        prompt,
+        system_instruction=COMPANY_VERIFICATION_SYSTEM_INSTRUCTION,
+        site="verify_company_data"
+    )
+    content = response.text.strip()
+
+    # Robust JSON extraction
+    with span("parse"):
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+        if json_match:
+            content = json_match.group(0)
+
+        data = json.loads(content)
+    if not data: raise Exception("Failed to parse AI response")
+
+    verified = not data.get("is_scam", False)
+    risk = 85 if data.get("is_scam") else 15
+
+    company_information = {
+        "full_name": data.get("full_name", company_name),
+        "industry": data.get("industry", "Unknown Industry"),
+        "headquarters": data.get("headquarters", "Location Unknown"),
+        "location_verified": data.get("location_verified", False),
+        "website": data.get("website"),
+        "linkedin": data.get("linkedin"),
+        "glassdoor": data.get("glassdoor"),
+        "rating": data.get("rating", 0),
+        "employees": data.get("employees", "Unknown"),
+        "history": data.get("history", "No data available."),
+        "past_issues": data.get("past_issues", []),
+        "competitors": data.get("competitors", []),
+        "growth_stats": data.get("growth_stats", [50]*6),
+        "verified": verified,
+        "global_checks": {
+            "bbb_registered": verified and risk < 30,
+            "ftc_reports": "Clear" if risk < 50 else "Potential Warnings Found",
+            "whois_age": "5+ Years" if verified else "Less than 1 Year / Hidden",
+            "dns_sec": verified
+        },
+        "recruitment_integrity": 100 - risk if verified else 15,
+        "data_source": "AI Neural Search (Live)"
+    }
+    logger.info(f"✓ AI Analysis successful for {company_name}")
+    logger.info(f"  - Verified: {verified}, Risk: {risk}%")
+    return {"verified": verified, "risk": risk, "company_information": company_information}
+
+
+def _store_company_profile(key, company_name, refresh=False):
+    """Fetch and cache a profile. Failures are cached as a negative entry with a shorter TTL.
+
+    A failed background ``refresh`` leaves the stale profile in place: it stays
+    servable until the stale window runs out, and the next request past TTL
+    retries the refresh.
+    """
+    try:
+        profile = fetch_company_profile(company_name)
+        COMPANY_CACHE.set(key, {"profile": profile, "fetched_at": time.time()})
+    except GeminiUnavailable as e:
+        # Gemini was not asked, so there is no failed lookup to remember
+        logger.warning(f"✗ AI Lookup skipped for {company_name}: {e}")
+        profile = None
+    except Exception as e:
+        logger.error(f"✗ AI Lookup failed for {company_name}")
+        logger.error(f"  Error: {e}")
+        logger.error(f"  Traceback: {traceback.format_exc()}")
+        profile = None
+        if not refresh:
+            COMPANY_CACHE.set(key, {"profile": None, "fetched_at": time.time()}, ttl=COMPANY_CACHE_NEGATIVE_TTL)
+    return profile
+
+
+def _refresh_company_profile(key, company_name):
+    try:
+        _store_company_profile(key, company_name, refresh=True)
+    finally:
+        with _company_refreshes_lock:
+            _company_refreshes.discard(key)
+
+
+def _cached_company_profile(key):
+    entry = COMPANY_CACHE.get(key)
+    return _MISSING if entry is None else entry["profile"]
+
+
+def company_ai_profile(company_name):
+    """AI profile for a company through the verification cache, or None if the lookup failed.
+
+    A stale positive entry is returned immediately and refreshed on a daemon
+    thread (at most one refresh per company at a time). Concurrent misses for
+    the same company share one Gemini lookup.
+    """
+    key = normalize_company_name(company_name)
+    with span("company_cache"):
+        entry = COMPANY_CACHE.get(key)
+    if entry is None:
+        return COMPANY_FLIGHTS.do(
+            key,
+            lambda: _store_company_profile(key, company_name),
+            lookup=lambda: _cached_company_profile(key)
+        )
+
+    if entry["profile"] and time.time() - entry["fetched_at"] >= COMPANY_CACHE_TTL:
+        with _company_refreshes_lock:
+            start_refresh = key not in _company_refreshes
+            _company_refreshes.add(key)
+        if start_refresh:
+            logger.info(f"Serving stale profile for {company_name}, refreshing in background")
+            threading.Thread(target=_refresh_company_profile, args=(key, company_name), daemon=True).start()
+    return entry["profile"]
+
+
+def verify_company_data(company_name: str, use_ai=True):
     company_name = (company_name or "").strip()
     if not company_name:
         return {"error": "Company name is required"}
@@ -870,227 +3470,52 @@ def verify_company_data(company_name: str):
     # This ensures "One accurate answer and not change when multiple analyzes"
     rng = random.Random(company_lower)
 
-    # Hardcoded verified companies (Cache of Truth)
-    verified_companies = {
-        "google": {
-            "full_name": "Google LLC (Alphabet Inc.)", 
-            "rating": 4.5, 
-            "employees": "190,000+",
-            "industry": "Technology & Internet Services",
-            "headquarters": "1600 Amphitheatre Parkway, Mountain View, California, USA",
-            "location_verified": True,
-            "history": "Founded on September 4, 1998. It began as a research project by Larry Page and Sergey Brin at Stanford University and effectively changed the way the world finds information.", 
-            "issues": ["Antitrust lawsuits in EU and US", "Privacy concerns over data collection"],
-            "website": "https://www.google.com",
-            "linkedin": "https://www.linkedin.com/company/google",
-            "glassdoor": "https://www.glassdoor.com/Overview/Working-at-Google-EI_IE9079.11,17.htm",
-            "competitors": ["Microsoft", "Amazon", "Apple", "Meta"]
-        },
-        "microsoft": {
-            "full_name": "Microsoft Corporation", 
-            "rating": 4.4, 
-            "employees": "221,000+",
-            "industry": "Software & Cloud Computing",
-            "headquarters": "One Microsoft Way, Redmond, Washington, USA",
-            "location_verified": True,
-            "history": "Founded on April 4, 1975, by Bill Gates and Paul Allen. They revolutionized personal computing with the Windows operating system and Office suite.", 
-            "issues": ["Historical antitrust cases", "Cybersecurity vulnerabilities in Exchange"],
-            "website": "https://www.microsoft.com",
-            "linkedin": "https://www.linkedin.com/company/microsoft",
-            "glassdoor": "https://www.glassdoor.com/Overview/Working-at-Microsoft-EI_IE1651.11,20.htm",
-            "competitors": ["Google", "Apple", "Amazon", "IBM"]
-        },
-        "apple": {
-            "full_name": "Apple Inc.", 
-            "rating": 4.3, 
-            "employees": "164,000+",
-            "industry": "Consumer Electronics & Software",
-            "headquarters": "One Apple Park Way, Cupertino, California, USA",
-            "location_verified": True,
-            "history": "Founded on April 1, 1976, by Steve Jobs, Steve Wozniak, and Ronald Wayne. Known for creating the iPhone, iPad, and Mac, defining modern consumer electronics.", 
-            "issues": ["App Store commission controversies", "Supply chain labor concerns"],
-            "website": "https://www.apple.com",
-            "linkedin": "https://www.linkedin.com/company/apple",
-            "glassdoor": "https://www.glassdoor.com/Overview/Working-at-Apple-EI_IE1138.11,16.htm",
-            "competitors": ["Samsung", "Google", "Microsoft", "Dell"]
-        },
-        "amazon": {
-            "full_name": "Amazon.com, Inc.", 
-            "rating": 3.8, 
-            "employees": "1,540,000+",
-            "industry": "E-commerce & Cloud Computing",
-            "headquarters": "410 Terry Avenue North, Seattle, Washington, USA",
-            "location_verified": True,
-            "history": "Founded on July 5, 1994, by Jeff Bezos. What started as an online bookstore in a garage became the world's largest e-commerce and cloud computing platform.", 
-            "issues": ["Warehouse working conditions", "Market dominance concerns"],
-            "website": "https://www.amazon.com",
-            "linkedin": "https://www.linkedin.com/company/amazon",
-            "glassdoor": "https://www.glassdoor.com/Overview/Working-at-Amazon-EI_IE6036.11,17.htm",
-            "competitors": ["Walmart", "Alibaba", "Microsoft", "Google"]
-        },
-        "meta": {
-            "full_name": "Meta Platforms, Inc.", 
-            "rating": 3.6, 
-            "employees": "66,000+",
-            "industry": "Social Media & Technology",
-            "headquarters": "1 Meta Way, Menlo Park, California, USA",
-            "location_verified": True,
-            "history": "Founded on February 4, 2004, as Facebook by Mark Zuckerberg. It pioneered modern social networking and now focuses on connecting people through the metaverse.", 
-            "issues": ["Cambridge Analytica scandal", "Content moderation challenges"],
-            "website": "https://about.meta.com",
-            "linkedin": "https://www.linkedin.com/company/meta",
-            "glassdoor": "https://www.glassdoor.com/Overview/Working-at-Meta-EI_IE40772.11,15.htm",
-            "competitors": ["Google", "Snap", "TikTok", "Microsoft"]
-        },
-        "nvidia": {
-            "full_name": "NVIDIA Corporation", 
-            "rating": 4.7, 
-            "employees": "27,000+", 
-            "industry": "Semiconductors & AI Hardware",
-            "headquarters": "2788 San Tomas Expressway, Santa Clara, California, USA",
-            "location_verified": True,
-            "history": "Founded on April 5, 1993. NVIDIA invented the GPU in 1999, sparking the growth of the PC gaming market and redefining modern computer graphics and AI.", 
-            "issues": ["Crypto mining demand volatility", "Geopolitical export restrictions"],
-            "website": "https://www.nvidia.com",
-            "linkedin": "https://www.linkedin.com/company/nvidia",
-            "glassdoor": "https://www.glassdoor.com/Overview/Working-at-NVIDIA-EI_IE7633.11,17.htm",
-            "competitors": ["AMD", "Intel", "Qualcomm", "TSMC"]
-        },
-    }
 
     # Default values
     verified = False
     risk = 50
     company_information = {}
 
-    # 1. Try AI Analysis FIRST for ALL companies
-    if GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE":
-        try:
-            # Use a system instruction for strict JSON output
-            system_instruction = "You are a professional corporate fraud investigator. Always respond with STRICT JSON. No markdown, no chatter, no backticks."
-            model = genai.GenerativeModel(
-                'gemini-2.0-flash-lite',
-                system_instruction=system_instruction
-            )
-            
-            # Enhanced prompt for comprehensive company analysis
-            prompt = f"""Analyze company: {company_name}. Return JSON:
-            {{
-              "full_name": "Official Legal Name",
-              "industry": "Industry Type",
-              "headquarters": "Full Street Address, City, State, Country",
-              "location_verified": true/false,
-              "website": "URL",
-              "linkedin": "URL",
-              "glassdoor": "URL",
-              "rating": 0.0-5.0,
-              "employees": "Count",
-              "history": "Long description",
-              "past_issues": ["Issue1", "Issue2"],
-              "competitors": ["Comp1", "Comp2"],
-              "growth_stats": [int, int, int, int, int, int],
-              "is_scam": true/false
-            }}
-            
-            Verify the location: is the headquarters real (true) or just a PO Box/virtual office (false)?
-            If company is unknown but seems like a generic business, do NOT mark as scam unless it shows fraud patterns.
-            """
-            
-            import time
-            # Retry logic
-            data = None
-            for attempt in range(2):
-                try:
-                    response = model.generate_content(prompt)
-                    content = response.text.strip()
-                    
-                    # Robust JSON extraction
-                    import re
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    if json_match:
-                        content = json_match.group(0)
-                    
-                    data = json.loads(content)
-                    break
-                except Exception as e:
-                    if "429" in str(e) and attempt == 0:
-                        logger.warning(f"429 Rate Limit hit for {company_name}, retrying in 2s...")
-                        time.sleep(2)
-                        continue
-                    raise e
-            
-            if not data: raise Exception("Failed to parse AI response")
-            
-            verified = not data.get("is_scam", False)
-            risk = 85 if data.get("is_scam") else 15
-            
+    # 1. Try AI Analysis FIRST for ALL companies (served from the verification cache when possible)
+    if use_ai and GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE":
+        profile = company_ai_profile(company_name)
+        if profile:
+            verified = profile["verified"]
+            risk = profile["risk"]
+            company_information = profile["company_information"]
+
+    # 2. Fallback to hardcoded data if AI failed and company is in our verified list
+    if not company_information:
+        # Hardcoded verified companies (Cache of Truth)
+        with span("registry"):
+            data = COMPANY_REGISTRY.lookup(company_name)
+        if data:
+            verified = True
+            risk = 5
             company_information = {
                 "full_name": data.get("full_name", company_name),
-                "industry": data.get("industry", "Unknown Industry"),
-                "headquarters": data.get("headquarters", "Location Unknown"),
-                "location_verified": data.get("location_verified", False),
+                "industry": data.get("industry", "Global Technology"),
+                "headquarters": data.get("headquarters", "Global Presence"),
+                "location_verified": data.get("location_verified", True),
                 "website": data.get("website"),
                 "linkedin": data.get("linkedin"),
                 "glassdoor": data.get("glassdoor"),
-                "rating": data.get("rating", 0),
-                "employees": data.get("employees", "Unknown"),
-                "history": data.get("history", "No data available."),
-                "past_issues": data.get("past_issues", []),
+                "rating": data.get("rating", 4.0),
+                "employees": data.get("employees", "10,000+"),
+                "history": data.get("history", "Established global enterprise."),
+                "past_issues": data.get("issues", []),
                 "competitors": data.get("competitors", []),
-                "growth_stats": data.get("growth_stats", [50]*6),
-                "verified": verified,
+                "growth_stats": [rng.randint(80, 100) for _ in range(6)],
+                "verified": True,
                 "global_checks": {
-                    "bbb_registered": verified and risk < 30,
-                    "ftc_reports": "Clear" if risk < 50 else "Potential Warnings Found",
-                    "whois_age": "5+ Years" if verified else "Less than 1 Year / Hidden",
-                    "dns_sec": verified
+                    "bbb_registered": True,
+                    "ftc_reports": "Clear",
+                    "whois_age": "20+ Years",
+                    "dns_sec": True
                 },
-                "recruitment_integrity": 100 - risk if verified else 15,
-                "data_source": "AI Neural Search (Live)"
+                "recruitment_integrity": 95,
+                "data_source": "Verified Corporate Ledger (Cached)"
             }
-            logger.info(f"✓ AI Analysis successful for {company_name}")
-            logger.info(f"  - Verified: {verified}, Risk: {risk}%")
-        except Exception as e:
-            import traceback
-            logger.error(f"✗ AI Lookup failed for {company_name}")
-            logger.error(f"  Error: {e}")
-            logger.error(f"  Traceback: {traceback.format_exc()}")
-            # If AI fails, fall back to hardcoded data if available
-            pass
-
-    # 2. Fallback to hardcoded data if AI failed and company is in our verified list
-    if not company_information:
-        found_hardcoded = False
-        for key, data in verified_companies.items():
-            if key in company_lower:
-                found_hardcoded = True
-                verified = True
-                risk = 5
-                company_information = {
-                    "full_name": data.get("full_name", company_name),
-                    "industry": data.get("industry", "Global Technology"),
-                    "headquarters": data.get("headquarters", "Global Presence"),
-                    "location_verified": data.get("location_verified", True),
-                    "website": data.get("website"),
-                    "linkedin": data.get("linkedin"),
-                    "glassdoor": data.get("glassdoor"),
-                    "rating": data.get("rating", 4.0),
-                    "employees": data.get("employees", "10,000+"),
-                    "history": data.get("history", "Established global enterprise."),
-                    "past_issues": data.get("issues", []),
-                    "competitors": data.get("competitors", []),
-                    "growth_stats": [rng.randint(80, 100) for _ in range(6)],
-                    "verified": True,
-                    "global_checks": {
-                        "bbb_registered": True,
-                        "ftc_reports": "Clear",
-                        "whois_age": "20+ Years",
-                        "dns_sec": True
-                    },
-                    "recruitment_integrity": 95,
-                    "data_source": "Verified Corporate Ledger (Cached)"
-                }
-                break
 
         # 3. Final fallback if both AI and hardcoded failed (Deterministic via rng)
         if not company_information:
@@ -1152,6 +3577,8 @@ def verify_company_data(company_name: str):
                     "data_source": "Probabilistic Fallback (Unverified)"
                 }
 
+    METRICS.inc("careersafe_company_verification_source_total", source=company_information.get("data_source", "unknown"))
+
     # Construct Response
     warning_signs = []
     if risk > 70: warning_signs.append("High risk characteristics detected")
@@ -1220,95 +3647,89 @@ def resume_text_check(text: str):
     t = (text or "").lower()
     if not t or len(t.strip()) < 10:
         return {"error": "Resume text is empty or too short"}
+    return dict(analyze_resume(t), timestamp=datetime.now().isoformat())
 
-    risk = 10
-    reasons = []
-    warnings = []
-    positives = []
 
-    suspicious_patterns = {
-        "excessive keywords": (len(re.findall(r'\b(?:expert|master|guru|ninja)\b', t)) > 5, 15),
-        "unverifiable experience": ("10+ years" in t or "15+ years" in t, 10),
-        "missing dates": (not re.search(r'\d{4}', t), 5),
-        "certification without proof": ("certified" in t and "certificate" not in t and "certification" not in t, 20),
-        "vague descriptions": (len(re.findall(r'\b(?:various|many|several|multiple)\b', t)) > 3, 8)
-    }
+def _timed_call(fn, value, slot=None):
+    started = time.perf_counter()
+    try:
+        result = fn(value)
+        return result, time.perf_counter() - started
+    finally:
+        if slot is not None:
+            slot.release()
 
-    for pattern, (condition, score) in suspicious_patterns.items():
-        if condition:
-            risk += score
-            reasons.append(f"Potential issue: {pattern.replace('_', ' ').title()}")
-
-    positive_indicators = {
-        "education listed": ("education" in t or "university" in t or "degree" in t, "Has education section"),
-        "work history": (re.search(r'\d{4}.*\d{4}', t), "Has date ranges for experience"),
-        "specific skills": (len(re.findall(r'\b(?:python|javascript|react|node|sql|aws)\b', t)) > 3, "Lists specific technical skills"),
-        "contact info": (re.search(r'[\w\.-]+@[\w\.-]+\.\w+', t), "Has contact information"),
-        "projects": ("project" in t or "portfolio" in t, "Mentions projects or portfolio")
-    }
 
-    for indicator, (condition, message) in positive_indicators.items():
-        if condition:
-            positives.append(message)
+def run_analysis_sections(sections, timeouts=None, slots=None):
+    """Run independent analysis sections, the Gemini-backed ones concurrently against their deadlines.
 
-    risk = min(100, risk)
-    if risk < 30:
-        risk_level = "Low"
-        message = "Resume appears authentic with minor concerns"
-    elif risk < 60:
-        risk_level = "Medium"
-        message = "Resume has some areas that need verification"
-    else:
-        risk_level = "High"
-        message = "Resume has significant authenticity concerns"
+    ``sections`` maps a name to ``(input, fn, fallback)``; sections with an
+    empty input are skipped and return {}. Sections named in ``slots``
+    (SECTION_SLOTS) run on SECTION_EXECUTOR with a deadline
+    (FULL_ANALYSIS_TIMEOUTS, measured from the start of the call); when all
+    of a section's slots are still held it is not started. The others run
+    inline while those wait. A section that misses its deadline, raises or
+    finds no free slot is answered by ``fallback(input)`` when one is given,
+    or by an error object otherwise. Returns ``(results, status)`` where every
+    status entry has ``status`` (ok, skipped, timeout, error or busy),
+    ``fallback`` and ``elapsed_ms``.
+    """
+    timeouts = timeouts or FULL_ANALYSIS_TIMEOUTS
+    slots = SECTION_SLOTS if slots is None else slots
+    started = time.monotonic()
+    results = {}
+    status = {}
 
-    suggestions = []
-    improvement_plan = []
-    if risk < 30:
-        suggestions = [
-            "Tailor your resume for each job application (keywords + relevance)",
-            "Ensure LinkedIn profile matches resume and is up to date",
-            "Apply to roles that match your experience and network with recruiters"
-        ]
-    elif risk < 60:
-        suggestions = [
-            "Add specific achievements and quantify impact (e.g., improved X by Y%)",
-            "Include date ranges for employment and education",
-            "List relevant projects and provide links to code/portfolio",
-            "Add verifiable certifications or details for claimed certifications"
-        ]
-        improvement_plan = [
-            "Step 1: Add dates and contact information",
-            "Step 2: Replace vague words with measurable achievements",
-            "Step 3: Add 1-2 portfolio projects with descriptions and links",
-            "Step 4: Proofread and get peer feedback"
-        ]
-    else:
-        suggestions = [
-            "Review and remove unverifiable claims",
-            "Provide supporting evidence for certifications and roles",
-            "Add clear contact information and project links",
-            "Consider rebuilding resume with a template focused on clarity and verification"
-        ]
-        improvement_plan = [
-            "Step 1: Verify all dates and roles; remove inflated claims",
-            "Step 2: Add project links, GitHub, portfolio or published work",
-            "Step 3: Obtain verifiable certifications or references",
-            "Step 4: Reformat resume for clarity and include measurable outcomes"
-        ]
+    def fall_back(name, value, fallback, outcome):
+        try:
+            results[name] = fallback(value) if fallback else {"error": f"Section {outcome}"}
+        except Exception as e:
+            logger.error(f"Full analysis: {name} fallback failed: {e}")
+            results[name] = {"error": f"Section {outcome}"}
+            fallback = None
+        status[name] = {
+            "status": outcome,
+            "fallback": fallback is not None,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1)
+        }
 
-    return {
-        "risk_percentage": risk,
-        "risk_level": risk_level,
-        "reasons": reasons if reasons else ["No major issues detected"],
-        "warnings": warnings,
-        "positives": positives,
-        "message": message,
-        "suggestions": suggestions,
-        "improvement_plan": improvement_plan,
-        "word_count": len(t.split()),
-        "timestamp": datetime.now().isoformat()
-    }
+    futures = OrderedDict()
+    inline = []
+    for name, (value, fn, fallback) in sections.items():
+        if not value:
+            results[name] = {}
+            status[name] = {"status": "skipped", "fallback": False, "elapsed_ms": 0}
+        elif name not in slots:
+            inline.append((name, value, fn, fallback))
+        elif slots[name].acquire(blocking=False):
+            futures[name] = (SECTION_EXECUTOR.submit(_timed_call, fn, value, slots[name]), value, fallback)
+        else:
+            logger.warning(f"Full analysis: {name} has no free slot, earlier calls are still running")
+            fall_back(name, value, fallback, "busy")
+
+    for name, value, fn, fallback in inline:
+        try:
+            results[name], elapsed = _timed_call(fn, value)
+            status[name] = {"status": "ok", "fallback": False, "elapsed_ms": round(elapsed * 1000, 1)}
+        except Exception as e:
+            logger.error(f"Full analysis: {name} failed: {e}\n{traceback.format_exc()}")
+            fall_back(name, value, fallback, "error")
+
+    for name, (future, value, fallback) in futures.items():
+        remaining = max(0.0, timeouts.get(name, FULL_ANALYSIS_SECTION_TIMEOUT) - (time.monotonic() - started))
+        try:
+            results[name], elapsed = future.result(timeout=remaining)
+            status[name] = {"status": "ok", "fallback": False, "elapsed_ms": round(elapsed * 1000, 1)}
+            continue
+        except FuturesTimeoutError:
+            # The call keeps its slot until it returns
+            logger.warning(f"Full analysis: {name} timed out after {remaining:.1f}s")
+            outcome = "timeout"
+        except Exception as e:
+            logger.error(f"Full analysis: {name} failed: {e}\n{traceback.format_exc()}")
+            outcome = "error"
+        fall_back(name, value, fallback, outcome)
+    return results, {name: status[name] for name in sections}
 
 
 @app.route("/full-analysis", methods=["POST"])
@@ -1320,18 +3741,23 @@ def full_analysis():
     career_goal = data.get("career_goal", "")
     resume_text = data.get("resume_text", "")
 
-    job_result = analyze_text(job_message) if job_message else {}
-    company_result = verify_company_data(company_name) if company_name else {}
     # prefer career_goal, fallback to skills
     career_input = career_goal or skills
-    career_result = career_guidance_data(career_input) if career_input else {}
-    resume_result = resume_text_check(resume_text) if resume_text else {}
+
+    # name -> (input, analysis, fallback used when the analysis times out, fails or has no free slot)
+    results, sections = run_analysis_sections(OrderedDict([
+        ("job_analysis", (job_message, analyze_text, analyze_text_rules)),
+        ("company_verification", (company_name, verify_company_data, lambda name: verify_company_data(name, use_ai=False))),
+        ("career_guidance", (career_input, career_guidance_data, None)),
+        ("resume_check", (resume_text, resume_text_check, None)),
+    ]))
 
     return jsonify({
-        "job_analysis": job_result,
-        "company_verification": company_result,
-        "career_guidance": career_result,
-        "resume_check": resume_result,
+        "job_analysis": results["job_analysis"],
+        "company_verification": results["company_verification"],
+        "career_guidance": results["career_guidance"],
+        "resume_check": results["resume_check"],
+        "sections": sections,
         "timestamp": datetime.now().isoformat()
     })
 
@@ -1373,10 +3799,35 @@ def get_history():
 # =========================
 # BULK ANALYSIS
 # =========================
+def bulk_stream_format():
+    """"ndjson" or "sse" when the client opted into streaming (``?stream=`` or Accept header), else None"""
+    requested = request.args.get("stream", "").lower()
+    if requested in ("ndjson", "sse"):
+        return requested
+    accept = request.headers.get("Accept", "")
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    if "text/event-stream" in accept:
+        return "sse"
+    return None
+
+
+def stream_bulk_results(texts, stream_format):
+    """Serialize iter_bulk_analysis as NDJSON lines or server-sent events, ending with a summary."""
+    total = 0
+    for result in iter_bulk_analysis(texts):
+        total += 1
+        payload = json.dumps(result)
+        yield f"event: result\ndata: {payload}\n\n" if stream_format == "sse" else payload + "\n"
+    summary = json.dumps({"done": True, "total": total, "timestamp": datetime.now().isoformat()})
+    logger.info(f"Bulk analysis (streamed {stream_format}): {total} texts")
+    yield f"event: done\ndata: {summary}\n\n" if stream_format == "sse" else summary + "\n"
+
+
 @app.route("/bulk-analyze", methods=["POST"])
 @rate_limit(limit=5, window=60)
 def bulk_analyze():
-    """Analyze multiple texts at once"""
+    """Analyze multiple texts at once (add ?stream=ndjson or ?stream=sse to receive results as they finish)"""
     try:
         data = request.get_json()
         if not data or "texts" not in data:
@@ -1384,19 +3835,20 @@ def bulk_analyze():
         texts = data.get("texts", [])
         if not texts or len(texts) == 0:
             return jsonify({"error": "No texts provided"}), 400
-        if len(texts) > 50:
-            return jsonify({"error": "Max 50 texts per request"}), 400
-        results = []
-        for idx, text in enumerate(texts):
-            try:
-                if len(text) > MAX_TEXT_LENGTH:
-                    text = text[:MAX_TEXT_LENGTH]
-                result = analyze_text(text)
-                result["index"] = idx
-                results.append(result)
-            except Exception as e:
-                logger.warning(f"Error analyzing text {idx}: {e}")
-                results.append({"index": idx, "error": "Analysis failed", "risk_percentage": 0})
+        if not isinstance(texts, list):
+            return jsonify({"error": "Texts array required"}), 400
+        stream_format = bulk_stream_format()
+        max_texts = MAX_BULK_STREAM_TEXTS if stream_format else MAX_BULK_TEXTS
+        if len(texts) > max_texts:
+            return jsonify({"error": f"Max {max_texts} texts per request"}), 400
+        if stream_format:
+            mimetype = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+            return Response(
+                stream_with_context(stream_bulk_results(texts, stream_format)),
+                mimetype=mimetype,
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        results = bulk_analyze_texts(texts)
         logger.info(f"Bulk analysis: {len(results)} texts")
         return jsonify({"results": results, "total": len(results), "timestamp": datetime.now().isoformat()}), 200
     except Exception as e:
@@ -1428,6 +3880,446 @@ def search():
 
 
 
+# =========================
+# BACKGROUND JOBS
+# =========================
+# Job type -> the route that runs it; a job's body is exactly what that route accepts
+JOB_ROUTES = {
+    "bulk-analyze": "/bulk-analyze",
+    "full-analysis": "/full-analysis",
+    "resume-check": "/resume-check",
+}
+# Submissions for a route without a rate limit of its own are limited to this (requests, seconds)
+JOB_SUBMIT_LIMIT = (20, 60)
+
+
+class JobQueue:
+    """Analysis jobs in a SQLite file, run by background threads of every worker on the host.
+
+    Claiming is one IMMEDIATE transaction, so each job runs once; jobs are
+    taken highest priority first, then oldest first. A claimed job carries a
+    lease that its worker renews while the job runs; a job whose worker died
+    (or restarted) is taken again once the lease runs out, up to
+    ``max_attempts`` times. A claim is identified by its attempt number, and
+    only the current claim may store a result. Results are readable for
+    ``result_ttl`` seconds after the job finishes.
+
+    Request bodies (up to MAX_FILE_SIZE of multipart upload) are written to
+    ``spool_dir`` and the row keeps their path and SHA-256; the file is
+    deleted once the job finishes or is given up.
+    """
+
+    POLL_INTERVAL = 1.0
+    PURGE_EVERY = 64
+
+    def __init__(self, path, result_ttl=3600, lease=300, max_attempts=3, spool_dir=None):
+        self.path = path
+        self.spool_dir = spool_dir or os.path.splitext(path)[0] + "_uploads"
+        self.result_ttl = result_ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._claims = 0
+        self._running = {}
+        self._running_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads = []
+        os.makedirs(self.spool_dir, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, type TEXT NOT NULL, priority INTEGER NOT NULL, status TEXT NOT NULL,"
+            " content_type TEXT, body_path TEXT, body_digest TEXT, result TEXT, result_status INTEGER, error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, started_at REAL,"
+            " finished_at REAL, lease_until REAL, expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at)")
+
+    def _conn(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, job_type, body, content_type, priority=0):
+        """Queue a job whose request body is read from the binary stream ``body`` (in 1 MB blocks)."""
+        job_id = os.urandom(16).hex()
+        path = os.path.join(self.spool_dir, f"{job_id}.body")
+        digest = hashlib.sha256()
+        try:
+            with open(path, "xb") as spooled:
+                for block in iter(lambda: body.read(1024 * 1024), b""):
+                    digest.update(block)
+                    spooled.write(block)
+            self._conn().execute(
+                "INSERT INTO jobs (id, type, priority, status, content_type, body_path, body_digest, created_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, job_type, priority, content_type, path, digest.hexdigest(), time.time())
+            )
+        except BaseException:
+            self._remove_bodies([path])
+            raise
+        self._wake.set()
+        return job_id
+
+    @staticmethod
+    def _remove_bodies(paths):
+        for path in paths:
+            if path is None:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Job upload {path} could not be removed: {e}")
+
+    @staticmethod
+    def open_body(path, digest):
+        """The spooled request body of a claimed job, or None when it is missing or does not match its digest."""
+        if path is None:
+            return None
+        try:
+            body = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            actual = hashlib.sha256()
+            for block in iter(lambda: body.read(1024 * 1024), b""):
+                actual.update(block)
+        except OSError:
+            actual = None
+        if actual is None or actual.hexdigest() != digest:
+            body.close()
+            return None
+        body.seek(0)
+        return body
+
+    def get(self, job_id):
+        """The job as a dict (without its request body), or None when unknown or expired."""
+        row = self._conn().execute(
+            "SELECT id, type, priority, status, result, result_status, error, attempts,"
+            " created_at, started_at, finished_at, expires_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None or (row[11] is not None and row[11] <= time.time()):
+            return None
+        job = dict(zip(("id", "type", "priority", "status", "result", "result_status", "error", "attempts",
+                        "created_at", "started_at", "finished_at"), row))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def claim(self):
+        """Take the next job: ``(id, type, content_type, body_path, created_at, attempt, body_digest)`` or None."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            given_up = [path for path, in conn.execute(
+                "SELECT body_path FROM jobs WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )]
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker stopped while running the job', body_path = NULL,"
+                " finished_at = ?, expires_at = ? WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now + self.result_ttl, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id, type, content_type, body_path, created_at, attempts + 1, body_digest FROM jobs"
+                " WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)"
+                " ORDER BY priority DESC, created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (now, now + self.lease, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._remove_bodies(given_up)
+        self._claims += 1
+        if self._claims % self.PURGE_EVERY == 0:
+            self.purge(now)
+        return row
+
+    def renew(self, claims):
+        """Extend the leases of ``(job id, attempt)`` claims that are still current."""
+        until = time.time() + self.lease
+        self._conn().executemany(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+            [(until, job_id, attempt) for job_id, attempt in claims]
+        )
+
+    def finish(self, job_id, attempt, status, result=None, result_status=None, error=None):
+        """Store a job's outcome. False (and nothing stored) when the claim was lost to a later one."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT body_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, result_status = ?, error = ?, body_path = NULL,"
+            " finished_at = ?, expires_at = ? WHERE id = ? AND attempts = ? AND status = 'running'",
+            (status, None if result is None else json.dumps(result), result_status, error,
+             now, now + self.result_ttl, job_id, attempt)
+        )
+        if cursor.rowcount != 1:
+            return False
+        self._remove_bodies([row[0]])
+        return True
+
+    def purge(self, now=None):
+        """Delete expired jobs, and spooled bodies left without a job (a worker died mid-submit)."""
+        now = now or time.time()
+        conn = self._conn()
+        self._remove_bodies([path for path, in conn.execute(
+            "SELECT body_path FROM jobs WHERE expires_at <= ? AND body_path IS NOT NULL", (now,)
+        )])
+        conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+        try:
+            filenames = os.listdir(self.spool_dir)
+        except OSError:
+            return
+        for filename in filenames:
+            path = os.path.join(self.spool_dir, filename)
+            try:
+                # Younger files may belong to a submission that has not inserted its row yet
+                if os.stat(path).st_mtime > now - self.lease:
+                    continue
+            except OSError:
+                continue
+            if conn.execute("SELECT 1 FROM jobs WHERE body_path = ?", (path,)).fetchone() is None:
+                self._remove_bodies([path])
+
+    def start(self, workers, runner):
+        """Start ``workers`` daemon threads that run claimed jobs with ``runner(type, body, content_type)``.
+
+        ``body`` is the job's spooled request body, open for reading.
+        """
+        self._threads = [
+            threading.Thread(target=self._work, args=(runner,), name=f"job-{number}", daemon=True)
+            for number in range(workers)
+        ] + [threading.Thread(target=self._renew_leases, name="job-leases", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=None):
+        """Stop taking jobs and wait up to ``timeout`` seconds for running ones to finish."""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _renew_leases(self):
+        while not self._stopping.wait(self.lease / 3):
+            with self._running_lock:
+                claims = list(self._running.items())
+            if claims:
+                try:
+                    self.renew(claims)
+                except Exception as e:
+                    logger.warning(f"Job lease renewal failed: {e}")
+
+    def _work(self, runner):
+        while not self._stopping.is_set():
+            try:
+                job = self.claim()
+            except Exception as e:
+                logger.warning(f"Job queue claim failed: {e}")
+                job = None
+            if job is None:
+                # Jobs submitted to this worker wake it at once; others are seen on the next poll
+                self._wake.wait(self.POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            job_id, job_type, content_type, body_path, created_at, attempt, body_digest = job
+            METRICS.observe("careersafe_job_queue_wait_seconds", time.time() - created_at)
+            with self._running_lock:
+                self._running[job_id] = attempt
+            try:
+                status = self._run(runner, job_id, attempt, job_type, body_path, body_digest, content_type)
+            finally:
+                with self._running_lock:
+                    self._running.pop(job_id, None)
+            METRICS.inc("careersafe_jobs_total", type=job_type, status=status)
+
+    def _run(self, runner, job_id, attempt, job_type, body_path, body_digest, content_type):
+        body = self.open_body(body_path, body_digest)
+        if body is None:
+            logger.error(f"✗ Job {job_id[:12]} ({job_type}) failed: upload {body_path} missing or damaged")
+            outcome = {"status": "failed", "error": "Job upload is missing or damaged"}
+        else:
+            try:
+                with body:
+                    result_status, result = runner(job_type, body, content_type)
+                outcome = {"status": "done", "result": result, "result_status": result_status}
+                logger.info(f"✓ Job {job_id[:12]} ({job_type}) done: {result_status}")
+            except Exception as e:
+                logger.error(f"✗ Job {job_id[:12]} ({job_type}) failed: {e}\n{traceback.format_exc()}")
+                outcome = {"status": "failed", "error": str(e)}
+        try:
+            if not self.finish(job_id, attempt, **outcome):
+                logger.warning(f"Job {job_id[:12]} result dropped: its lease expired and it was claimed again")
+                return "dropped"
+        except Exception as e:
+            logger.error(f"Job {job_id[:12]} result could not be stored: {e}")
+        return outcome["status"]
+
+
+def run_job(job_type, body, content_type):
+    """Run a job through its route, as if the binary file ``body`` had been POSTed to it. Returns ``(status, json)``."""
+    with app.test_request_context(
+        JOB_ROUTES[job_type], method="POST", input_stream=body, content_length=os.fstat(body.fileno()).st_size,
+        content_type=content_type, environ_base={"careersafe.job": True}
+    ):
+        response = app.full_dispatch_request()
+        return response.status_code, response.get_json(silent=True)
+
+
+def _make_job_queue():
+    try:
+        return JobQueue(JOB_QUEUE_DB_PATH, JOB_RESULT_TTL, JOB_LEASE, JOB_MAX_ATTEMPTS, JOB_SPOOL_DIR)
+    except Exception as e:
+        logger.error(f"Job queue unavailable ({JOB_QUEUE_DB_PATH}), /jobs disabled: {e}")
+        return None
+
+
+JOB_QUEUE = _make_job_queue()
+
+
+def _job_time(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+def job_route_limit(job_type):
+    """``(key name, limit, window)`` of the route a job type runs."""
+    endpoint, _ = app.url_map.bind("localhost").match(JOB_ROUTES[job_type], method="POST")
+    return getattr(app.view_functions[endpoint], "rate_limit", ("submit_job",) + JOB_SUBMIT_LIMIT)
+
+
+@app.route("/jobs/<job_type>", methods=["POST"])
+def submit_job(job_type):
+    """Queue /bulk-analyze, /full-analysis or /resume-check work (same body as the route); poll GET /jobs/<id>
+
+    A submission counts against the rate limit of the route it will run.
+    Only admins may set a priority other than 0.
+    """
+    if job_type not in JOB_ROUTES:
+        return jsonify({"error": "Unknown job type", "types": sorted(JOB_ROUTES)}), 404
+    if JOB_QUEUE is None:
+        return jsonify({"error": "Job queue unavailable"}), 503
+    if request.content_length is None or request.content_length > MAX_FILE_SIZE:
+        return jsonify({"error": "Request body missing or too large"}), 400
+    try:
+        priority = max(-10, min(10, int(request.args.get("priority", 0))))
+    except ValueError:
+        return jsonify({"error": "priority must be an integer from -10 to 10"}), 400
+    if priority != 0 and not is_admin_request():
+        return jsonify({"error": "Only admin requests may set a job priority"}), 403
+    rejected = rate_limited(*job_route_limit(job_type))
+    if rejected is not None:
+        return rejected
+    job_id = JOB_QUEUE.submit(job_type, request.stream, request.content_type, priority)
+    logger.info(f"Queued job {job_id[:12]} ({job_type}, priority {priority})")
+    response = jsonify({
+        "job_id": job_id,
+        "type": job_type,
+        "status": "queued",
+        "priority": priority,
+        "poll_url": f"/jobs/{job_id}"
+    })
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return response, 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+@rate_limit(limit=120, window=60)
+def get_job(job_id):
+    """Status of a queued job; once done, "result" is the route's response body and "result_status" its HTTP status"""
+    if JOB_QUEUE is None:
+        return jsonify({"error": "Job queue unavailable"}), 503
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired", "job_id": job_id}), 404
+    payload = {
+        "job_id": job["id"],
+        "type": job["type"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "attempts": job["attempts"],
+        "created_at": _job_time(job["created_at"]),
+        "started_at": _job_time(job["started_at"]),
+        "finished_at": _job_time(job["finished_at"]),
+    }
+    if job["status"] == "done":
+        payload["result_status"] = job["result_status"]
+        payload["result"] = job["result"]
+    elif job["status"] == "failed":
+        payload["error"] = job["error"]
+    return jsonify(payload), 200
+
+
+# =========================
+# ADMIN: RULES RELOAD
+# =========================
+def has_bearer_token(token):
+    """True when the request carries ``token`` as a bearer token; never for an empty token."""
+    if not token:
+        return False
+    supplied = request.headers.get("Authorization", "")
+    if supplied.startswith("Bearer "):
+        supplied = supplied[len("Bearer "):]
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def is_admin_request():
+    """True when the request carries ADMIN_TOKEN as a bearer token. Disabled if no token is set."""
+    return has_bearer_token(ADMIN_TOKEN)
+
+
+@app.route("/admin/reload-rules", methods=["POST"])
+@rate_limit(limit=10, window=60)
+def admin_reload_rules():
+    """Recompile rules.json and swap it in without restarting; the other workers follow within RULES_CHECK_INTERVAL"""
+    if not is_admin_request():
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        rules = reload_rules(broadcast=True)
+        return jsonify({
+            "status": "reloaded",
+            "version": rules.version,
+            "source": rules.source,
+            "loaded_at": rules.loaded_at,
+            "keywords": len(rules.matcher.keywords),
+            "other_workers_within_seconds": RULES_CHECK_INTERVAL
+        }), 200
+    except Exception as e:
+        logger.error(f"Rules reload failed, keeping version {RULES.version}: {e}\n{traceback.format_exc()}")
+        return jsonify({"error": "Rules reload failed", "message": str(e), "active_version": RULES.version}), 400
+
+
+@app.route("/admin/profile", methods=["GET"])
+@rate_limit(limit=30, window=60)
+def admin_profile():
+    """Collapsed stacks sampled for ?route=/analyze, summed over every worker (feed to flamegraph.pl)"""
+    if not is_admin_request():
+        return jsonify({"error": "Forbidden"}), 403
+    route = request.args.get("route", "").strip()
+    if not route:
+        return jsonify({"error": "route is required", "routes": sorted(rule.rule for rule in app.url_map.iter_rules())}), 400
+    totals = PROFILER.read(route)
+    if not totals:
+        return jsonify({"error": "No samples for route", "route": route}), 404
+    body = "".join(f"{stack} {count}\n" for stack, count in totals.most_common())
+    return Response(body, content_type="text/plain; charset=utf-8")
+
+
 # =========================
 # HEALTH CHECK
 # =========================
@@ -1435,12 +4327,20 @@ def search():
 def health():
     """Health check endpoint"""
     try:
-        return jsonify({"status": "healthy", "api": bool(GEMINI_API_KEY), "timestamp": datetime.now().isoformat(), "version": "1.0.0"}), 200
+        return jsonify({"status": "healthy", "api": bool(GEMINI_API_KEY), "rules_version": RULES.version, "gemini_breakers": GEMINI_MODELS.breaker_states(), "startup": STARTUP_REPORT, "timestamp": datetime.now().isoformat(), "version": "1.0.0"}), 200
     except Exception as e:
         logger.error(f"Health check error: {e}")
         return jsonify({"status": "degraded", "error": str(e)}), 503
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint (summed over every worker when METRICS_DIR is set); needs METRICS_TOKEN or ADMIN_TOKEN"""
+    if not (has_bearer_token(METRICS_TOKEN) or is_admin_request()):
+        return jsonify({"error": "Forbidden"}), 403
+    return Response(METRICS.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # =========================
 # ERROR HANDLERS
 # =========================
@@ -1465,6 +4365,50 @@ def rate_limit_error(error):
     return jsonify({"error": "Too many requests", "status": 429}), 429
 
 
+# =========================
+# COLD START
+# =========================
+def prewarm_imports():
+    """Load the deferred modules and build the Gemini clients ahead of the first request."""
+    try:
+        PyPDF2.load("prewarm")
+        if GEMINI_API_KEY and GEMINI_API_KEY != "PASTE_YOUR_GEMINI_API_KEY_HERE":
+            genai.load("prewarm")
+            GEMINI_MODELS.get(JOB_ANALYSIS_MODEL, JOB_ANALYSIS_SYSTEM_INSTRUCTION, JOB_ANALYSIS_GENERATION_CONFIG)
+            GEMINI_MODELS.get(CAREER_GUIDANCE_MODEL, CAREER_GUIDANCE_SYSTEM_INSTRUCTION, CAREER_GUIDANCE_GENERATION_CONFIG)
+            GEMINI_MODELS.get(COMPANY_VERIFICATION_MODEL, COMPANY_VERIFICATION_SYSTEM_INSTRUCTION)
+    except Exception as e:
+        logger.warning(f"Prewarm failed, modules will load on first use: {e}")
+
+
+boot_mark("module_body")
+STARTUP_REPORT["total_seconds"] = round(time.perf_counter() - _BOOT_STARTED, 4)
+logger.info(
+    f"✓ Cold start {STARTUP_REPORT['total_seconds'] * 1000:.0f}ms: "
+    + ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in STARTUP_REPORT["phases"].items())
+)
+if PREWARM_IMPORTS:
+    threading.Thread(target=prewarm_imports, name="prewarm", daemon=True).start()
+
+
+_job_workers_started = False
+
+
+def start_job_workers():
+    """Start this process's JOB_WORKERS job threads, once.
+
+    Called by the server entry points (gunicorn's post_worker_init hook and
+    ``python index.py``), never at import, so scripts and tools that import
+    the app do not take jobs off the shared queue.
+    """
+    global _job_workers_started
+    if _job_workers_started or JOB_QUEUE is None or JOB_WORKERS <= 0:
+        return
+    _job_workers_started = True
+    JOB_QUEUE.start(JOB_WORKERS, run_job)
+    logger.info(f"✓ Started {JOB_WORKERS} job threads on {JOB_QUEUE.path}")
+
+
 # =========================
 # APPLICATION STARTUP
 # =========================
@@ -1473,11 +4417,19 @@ if __name__ == "__main__":
     logger.info("Starting CareerSafe Backend Server")
     logger.info("="*60)
     logger.info(f"API Key Configured: {bool(GEMINI_API_KEY)}")
-    logger.info(f"Rate Limiting: {RATE_LIMIT_REQUESTS} requests per {RATE_LIMIT_WINDOW}s")
+    if GEMINI_API_ENDPOINT:
+        logger.info(f"Gemini Endpoint: {GEMINI_API_ENDPOINT} (stand-in)")
+    logger.info(f"Rate Limiting: {RATE_LIMIT_REQUESTS} requests per {RATE_LIMIT_WINDOW}s ({type(RATE_LIMITER.backend).__name__})")
     logger.info(f"Max Text Length: {MAX_TEXT_LENGTH} chars")
     logger.info(f"Max File Size: {MAX_FILE_SIZE / (1024*1024):.0f}MB")
+    logger.info(f"Scam Rules: version {RULES.version} from {RULES.source}")
+    logger.info(f"Company Registry: {len(COMPANY_REGISTRY)} names from {COMPANY_REGISTRY.source}")
+    logger.info(f"PDF Workers: {str(PDF_WORKERS) + ' (started on first upload)' if PDF_WORKERS > 0 else 'in-process'}")
     logger.info("="*60)
     debug_mode = os.getenv('DEBUG', 'False').lower() == 'true'
+    # With the reloader on, only the child process that serves requests runs jobs
+    if not debug_mode or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_job_workers()
     try:
         port = int(os.getenv('PORT', 5000))
         app.run(host='0.0.0.0', port=port, debug=debug_mode, use_reloader=debug_mode)
@@ -0,0 +1,365 @@
+"""Benchmarks for the CareerSafe analysis hot paths.
+
+Runs offline: Gemini is replaced by a deterministic in-process stub, so the
+numbers measure our own code (rules, caches, PDF parsing, Flask routes).
+Inputs come from seeded synthetic corpora at several sizes, and every
+iteration uses a distinct input so the result caches do not turn the
+benchmark into a cache-hit test.
+
+    python benchmark.py                      # full run, saved to bench_results/<commit>.json
+    python benchmark.py --quick --only analyze_text,resume_text_check
+    python benchmark.py --compare bench_results/a1b2c3d.json bench_results/e4f5a6b.json
+"""
+
+import argparse
+import atexit
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Must be set before the app is imported: no persistent caches shared with a
+# running server, and a key so the Gemini code paths are exercised
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("CACHE_DB_PATH", "")
+# Always isolated from a server on the same host, and kept out of the timings: no job
+# threads (they would finish real queued jobs with fake Gemini answers), a private job
+# queue, metrics for this process only (no shared-file flushing), no tracing or profiling
+BENCH_TMP = tempfile.mkdtemp(prefix="careersafe_bench_")
+atexit.register(shutil.rmtree, BENCH_TMP, ignore_errors=True)
+os.environ.update({
+    "JOB_WORKERS": "0",
+    "JOB_QUEUE_DB_PATH": os.path.join(BENCH_TMP, "jobs.sqlite3"),
+    "METRICS_DIR": "",
+    "TRACE_SAMPLE_RATE": "0",
+    "TRACE_LOG_PATH": "",
+    "PROFILE_SAMPLE_RATE": "0",
+})
+
+
+# =========================
+# FAKE GEMINI
+# =========================
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Deterministic stand-in for genai.GenerativeModel: the answer depends only on the prompt."""
+
+    latency = 0.0
+
+    def __init__(self, model_name=None, system_instruction=None, generation_config=None, **kwargs):
+        self.model_name = model_name
+        self.system_instruction = system_instruction or ""
+
+    def generate_content(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        if "Analyze company:" in prompt:
+            scam = seed % 5 == 0
+            return FakeResponse(json.dumps({
+                "full_name": f"Company {seed % 1000}", "industry": "Technology",
+                "headquarters": "1 Main St, Springfield, USA", "location_verified": not scam,
+                "website": "https://example.com", "linkedin": "https://linkedin.com/company/example",
+                "glassdoor": "https://glassdoor.com/example", "rating": round(2 + seed % 30 / 10, 1),
+                "employees": "1,000+", "history": "Synthetic company history.",
+                "past_issues": [], "competitors": ["A", "B"], "growth_stats": [50, 55, 60, 62, 65, 70],
+                "is_scam": scam
+            }))
+        if "career roadmap" in prompt:
+            return FakeResponse(json.dumps({
+                "market_outlook": "Stable growth", "careers": [], "detailed_roadmap": [],
+                "salary_benchmarks": {}, "difficulty_rating": 1 + seed % 10, "improvement_tips": []
+            }))
+        verdicts = ["This looks like a legitimate posting.", "This message is likely a scam.", "This is suspicious; verify the sender."]
+        return FakeResponse(verdicts[seed % len(verdicts)])
+
+
+def load_app(pdf_workers):
+    os.environ["PDF_WORKERS"] = str(pdf_workers)
+    sys.path.insert(0, os.path.join(ROOT, "api"))
+    import index
+    index.genai.GenerativeModel = FakeGenerativeModel
+    index.GEMINI_MODELS.clear()
+    return index
+
+
+# =========================
+# SYNTHETIC CORPORA
+# =========================
+SCAM_PHRASES = [
+    "URGENT hiring!!! no experience needed", "pay a small registration fee", "send your bank details",
+    "work from home and earn $5000 weekly", "click here to verify your account", "wire transfer required",
+    "guaranteed income", "training fee refundable", "contact us on telegram", "limited slots apply now",
+]
+JOB_PHRASES = [
+    "We are looking for a software engineer", "competitive salary and benefits", "responsibilities include",
+    "requirements: bachelor's degree", "apply through our careers page", "interview process has three rounds",
+    "full-time position", "health insurance and 401k", "email hr@example.com", "call 555-123-4567",
+]
+FILLER = "the team role with and for our in of to experience company project customers".split()
+RESUME_PHRASES = [
+    "Senior Python developer", "Experience 2016 - 2023 at Example Corp", "Education: BSc Computer Science, State University",
+    "Skills: python javascript react node sql aws", "Led multiple projects", "certified scrum master",
+    "Portfolio: github.com/example", "email jane@example.com", "various responsibilities", "expert in java and c++",
+]
+
+
+def synthetic_text(rng, phrases, chars, uid):
+    parts = [f"ref {uid}"]
+    length = 0
+    while length < chars:
+        part = rng.choice(phrases) if rng.random() < 0.4 else " ".join(rng.choice(FILLER) for _ in range(6))
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)[:max(chars, 12)]
+
+
+def make_pdf(pages):
+    """Minimal text PDF (one Helvetica text object per page), enough for PyPDF2 extraction."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = [line.replace("(", "").replace(")", "").replace("\\", "") for line in text.split("\n")]
+        stream = ("BT /F1 10 Tf 20 800 Td 12 TL " + " ".join(f"({line}) Tj T*" for line in lines) + " ET").encode("latin-1", "replace")
+        kids.append(len(objects) + 1)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def synthetic_pdf(rng, pages, uid):
+    return make_pdf([
+        "\n".join(synthetic_text(rng, RESUME_PHRASES, 80, f"{uid}-{p}-{line}") for line in range(40))
+        for p in range(pages)
+    ])
+
+
+# =========================
+# BENCHMARKS
+# =========================
+def client_environ(i):
+    # A distinct client address per request keeps the per-IP rate limits out of the way
+    return {"REMOTE_ADDR": f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"}
+
+
+def benchmarks(app, quick):
+    """Yield (name, size label, iterations, make_input(i, rng), run(input, i))."""
+    scale = 0.2 if quick else 1.0
+
+    def n(count):
+        return max(5, int(count * scale))
+
+    client = app.app.test_client()
+
+    for label, chars in (("200c", 200), ("2kc", 2000), ("10kc", 10000)):
+        yield ("analyze_text", label, n(500),
+               lambda i, rng, chars=chars: synthetic_text(rng, SCAM_PHRASES + JOB_PHRASES, chars, i),
+               lambda text, i: app.analyze_text(text))
+
+    yield ("verify_company_data", "ai", n(500),
+           lambda i, rng: f"Synthetic Holdings {i} {rng.randint(0, 10**6)}",
+           lambda name, i: app.verify_company_data(name))
+    with open(app.COMPANY_REGISTRY_FILE) as f:
+        registry = [entry["name"] for entry in json.load(f)["companies"]]
+    yield ("verify_company_data", "registry", n(500),
+           lambda i, rng: rng.choice(registry),
+           lambda name, i: app.verify_company_data(name, use_ai=False))
+
+    for label, chars in (("1kc", 1000), ("10kc", 10000), ("100kc", 100000)):
+        yield ("resume_text_check", label, n(300 if chars < 100000 else 60),
+               lambda i, rng, chars=chars: synthetic_text(rng, RESUME_PHRASES, chars, i),
+               lambda text, i: app.resume_text_check(text))
+
+    for pages in (1, 10, 50):
+        def post_pdf(pdf, i):
+            response = client.post("/resume-check", data={"resume": (io.BytesIO(pdf), "resume.pdf")},
+                                   content_type="multipart/form-data", environ_base=client_environ(i))
+            assert response.status_code == 200, response.get_json()
+        yield ("resume_check_pdf", f"{pages}p", n(100 if pages < 50 else 20),
+               lambda i, rng, pages=pages: synthetic_pdf(rng, pages, i), post_pdf)
+
+    for batch in (10, 50):
+        def post_bulk(texts, i):
+            response = client.post("/bulk-analyze", json={"texts": texts}, environ_base=client_environ(i))
+            assert response.status_code == 200, response.get_json()
+        yield ("bulk_analyze", f"{batch}x", n(60),
+               lambda i, rng, batch=batch: [synthetic_text(rng, SCAM_PHRASES + JOB_PHRASES, 500, f"{i}-{j}") for j in range(batch)],
+               post_bulk)
+
+    def post_full(payload, i):
+        response = client.post("/full-analysis", json=payload, environ_base=client_environ(i))
+        assert response.status_code == 200, response.get_json()
+    yield ("full_analysis", "all", n(150),
+           lambda i, rng: {
+               "job_message": synthetic_text(rng, SCAM_PHRASES + JOB_PHRASES, 800, i),
+               "company_name": f"Synthetic Holdings {i}",
+               "skills": rng.choice(["python", "design", "data science"]),
+               "resume_text": synthetic_text(rng, RESUME_PHRASES, 3000, i),
+           },
+           post_full)
+
+    if app.np.available:
+        yield ("analyze_text_batch", "10kx", n(5),
+               lambda i, rng: [synthetic_text(rng, SCAM_PHRASES + JOB_PHRASES, 300, f"{i}-{j}") for j in range(10000)],
+               lambda texts, i: app.analyze_text_batch(texts))
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_one(name, label, iterations, make_input, run, seed):
+    rng = random.Random(f"{seed}:{name}:{label}")
+    inputs = [make_input(i, rng) for i in range(iterations)]
+    run(make_input(iterations, rng), iterations)  # warm up lazy setup outside the measurement
+
+    latencies = []
+    started = time.perf_counter()
+    for i, item in enumerate(inputs):
+        t0 = time.perf_counter()
+        run(item, i)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    # Peak memory in a separate, shorter pass: tracemalloc slows allocation-heavy code
+    memory_inputs = [make_input(iterations + 1 + i, rng) for i in range(min(20, iterations))]
+    tracemalloc.start()
+    for i, item in enumerate(memory_inputs):
+        run(item, iterations + 1 + i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "size": label,
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(elapsed / iterations * 1000, 3),
+        "ops_per_s": round(iterations / elapsed, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return revision + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results):
+    header = f"{'benchmark':<22} {'size':>8} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'peak KiB':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['name']:<22} {r['size']:>8} {r['iterations']:>5} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+              f"{r['p99_ms']:>9.3f} {r['ops_per_s']:>10.1f} {r['peak_kib']:>10.1f}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    baseline = {(r["name"], r["size"]): r for r in old["results"]}
+    print(f"{old['revision']} -> {new['revision']}  (negative latency change / positive ops change is better)")
+    header = f"{'benchmark':<22} {'size':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>9} {'peak':>9}"
+    print(header)
+    print("-" * len(header))
+
+    def change(before, after):
+        return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+    for r in new["results"]:
+        b = baseline.get((r["name"], r["size"]))
+        if b is None:
+            print(f"{r['name']:<22} {r['size']:>8} {'(new)':>9}")
+            continue
+        print(f"{r['name']:<22} {r['size']:>8} {change(b['p50_ms'], r['p50_ms']):>9} {change(b['p95_ms'], r['p95_ms']):>9} "
+              f"{change(b['p99_ms'], r['p99_ms']):>9} {change(b['ops_per_s'], r['ops_per_s']):>9} {change(b['peak_kib'], r['peak_kib']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CareerSafe analysis hot paths with a fake Gemini backend")
+    parser.add_argument("--quick", action="store_true", help="run a fifth of the iterations")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--seed", type=int, default=1, help="corpus seed (default 1)")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="seconds the fake Gemini sleeps per call")
+    parser.add_argument("--pdf-workers", type=int, default=int(os.getenv("PDF_WORKERS", 2)), help="PDF worker processes (0 = in-process)")
+    parser.add_argument("--output", help="results file (default bench_results/<revision>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    import logging
+    logging.disable(logging.WARNING)  # request logging would dominate the timings
+    FakeGenerativeModel.latency = args.gemini_latency
+    app = load_app(args.pdf_workers)
+    only = set(args.only.split(",")) if args.only else None
+
+    results = []
+    for name, label, iterations, make_input, run in benchmarks(app, args.quick):
+        if only and name not in only:
+            continue
+        result = run_one(name, label, iterations, make_input, run, args.seed)
+        results.append(result)
+        print(f"  {name} [{label}] p50={result['p50_ms']}ms p99={result['p99_ms']}ms {result['ops_per_s']} ops/s", file=sys.stderr)
+
+    revision = git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"quick": args.quick, "seed": args.seed, "gemini_latency": args.gemini_latency, "pdf_workers": args.pdf_workers},
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "bench_results", f"{revision}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_table(results)
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Local stand-in for the Gemini API, for load tests and sandboxes without network.
+
+Speaks the REST ``generateContent`` call that google-generativeai makes, so the
+app needs no code changes: start this server and point the app at it.
+
+    python gemini_standin.py --port 8089 --latency lognormal:0.8,0.5 --rate-429 0.05
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089 GEMINI_API_KEY=local python api/index.py
+
+Responses are canned per call site (job analysis, company verification, career
+guidance), loaded from --responses, or replayed from a recording. Latency,
+429s, 500s, malformed JSON and hung requests are injected at the configured
+rates. The settings can be changed while running:
+
+    curl -X POST localhost:8089/_standin/config -d '{"rate_429": 0.5}'
+
+Record real traffic once, then replay it offline:
+
+    python gemini_standin.py --record calls.jsonl --upstream https://generativelanguage.googleapis.com
+    python gemini_standin.py --replay calls.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+CANNED = {
+    "company": [json.dumps({
+        "full_name": "Example Holdings Inc.", "industry": "Technology",
+        "headquarters": "100 Market St, San Francisco, CA, USA", "location_verified": True,
+        "website": "https://example.com", "linkedin": "https://www.linkedin.com/company/example",
+        "glassdoor": "https://www.glassdoor.com/Overview/example", "rating": 4.1, "employees": "5,000+",
+        "history": "Founded in 2005, Example Holdings builds business software.",
+        "past_issues": [], "competitors": ["Acme Corp", "Globex"], "growth_stats": [55, 60, 63, 68, 72, 75],
+        "is_scam": False
+    })],
+    "career": [json.dumps({
+        "market_outlook": "Strong demand over the next five years",
+        "careers": [{"title": "Backend Developer", "salary": "$90k-$140k", "growth": "High", "skills": ["Python", "SQL"]}],
+        "detailed_roadmap": [{"step": "Foundations", "duration": "3 months", "topics": ["Python", "Git"]}],
+        "salary_benchmarks": {"entry": "$70k", "mid": "$110k", "senior": "$150k"},
+        "difficulty_rating": 6, "improvement_tips": ["Build two portfolio projects"]
+    })],
+    "job": [
+        "This message shows several classic scam signs: an upfront fee and pressure to act fast. It is likely a scam.",
+        "This appears to be a legitimate posting with a clear role description and official contact details.",
+        "Some details are suspicious; verify the recruiter through the company's official website before replying.",
+    ],
+}
+
+DEFAULT_CONFIG = {
+    "latency": "fixed:0",
+    "rate_429": 0.0,
+    "rate_500": 0.0,
+    "malformed_rate": 0.0,
+    "timeout_rate": 0.0,
+    "timeout_seconds": 120.0,
+}
+
+
+def parse_latency(spec):
+    """"fixed:S", "uniform:LO,HI", "normal:MEAN,SD" or "lognormal:MEDIAN,SIGMA" (seconds) -> sampler."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else [0.0]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        import math
+        mu = math.log(values[0]) if values[0] > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def call_site(body):
+    """Which app feature a generateContent request comes from, from its prompt text."""
+    text = json.dumps(body)
+    if "Analyze company:" in text:
+        return "company"
+    if "career roadmap" in text:
+        return "career"
+    return "job"
+
+
+def request_key(path, body):
+    model = urlsplit(path).path
+    return hashlib.sha256((model + "\n" + json.dumps(body, sort_keys=True)).encode("utf-8")).hexdigest()
+
+
+def envelope(text):
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+    }
+
+
+def error_body(code, status, message):
+    return {"error": {"code": code, "message": message, "status": status}}
+
+
+class StandIn:
+    """Server state: injection settings, canned responses and the record/replay store."""
+
+    def __init__(self, config, responses, seed=None, record=None, replay=None, upstream=None):
+        self.config = dict(DEFAULT_CONFIG, **config)
+        self.sample_latency = parse_latency(self.config["latency"])
+        self.responses = responses
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.record_path = record
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.recorded = {}
+        self.stats = {"requests": 0, "429": 0, "500": 0, "malformed": 0, "timeouts": 0, "replayed": 0, "recorded": 0}
+        if replay:
+            with open(replay) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recorded[entry["key"]] = entry
+        self._cursor = {}
+
+    def update(self, changes):
+        with self.lock:
+            unknown = set(changes) - set(DEFAULT_CONFIG)
+            if unknown:
+                raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+            config = dict(self.config, **changes)
+            self.sample_latency = parse_latency(config["latency"])
+            self.config = config
+
+    def draw(self):
+        """Pick this request's fate under the lock so concurrent requests share one seeded stream."""
+        with self.lock:
+            config = self.config
+            latency = self.sample_latency(self.rng)
+            roll = self.rng.random()
+            fate = "ok"
+            for name, rate in (("timeout", config["timeout_rate"]), ("429", config["rate_429"]),
+                               ("500", config["rate_500"]), ("malformed", config["malformed_rate"])):
+                if roll < rate:
+                    fate = name
+                    break
+                roll -= rate
+            self.stats["requests"] += 1
+            if fate != "ok":
+                self.stats[{"timeout": "timeouts"}.get(fate, fate)] += 1
+            return fate, latency, config["timeout_seconds"]
+
+    def canned(self, site):
+        with self.lock:
+            options = self.responses.get(site) or CANNED[site]
+            index = self._cursor.get(site, 0)
+            self._cursor[site] = index + 1
+            return options[index % len(options)]
+
+    def forward(self, path, headers, raw_body):
+        request = urllib.request.Request(self.upstream + path, data=raw_body, method="POST", headers={
+            "Content-Type": "application/json",
+            "x-goog-api-key": headers.get("x-goog-api-key", ""),
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b"{}")
+
+    def save(self, key, site, status, payload):
+        entry = {"key": key, "site": site, "status": status, "response": payload}
+        with self.lock:
+            self.recorded[key] = entry
+            self.stats["recorded"] += 1
+            with open(self.record_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+def make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def do_GET(self):
+            if self.path.startswith("/_standin"):
+                with standin.lock:
+                    return self.send_json(200, {"config": standin.config, "stats": standin.stats})
+            self.send_json(404, error_body(404, "NOT_FOUND", "Only generateContent is simulated"))
+
+        def do_POST(self):
+            raw = self.read_body()
+            if self.path.startswith("/_standin/config"):
+                try:
+                    standin.update(json.loads(raw or b"{}"))
+                except (ValueError, TypeError) as e:
+                    return self.send_json(400, {"error": str(e)})
+                return self.send_json(200, {"config": standin.config})
+            if ":generateContent" not in self.path:
+                return self.send_json(404, error_body(404, "NOT_FOUND", "Only generateContent is simulated"))
+
+            body = json.loads(raw or b"{}")
+            site = call_site(body)
+            fate, latency, timeout_seconds = standin.draw()
+            if fate == "timeout":
+                # Hang like an overloaded backend, then drop the connection without answering
+                time.sleep(timeout_seconds)
+                self.close_connection = True
+                return
+            time.sleep(latency)
+            if fate == "429":
+                return self.send_json(429, error_body(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."))
+            if fate == "500":
+                return self.send_json(500, error_body(500, "INTERNAL", "An internal error has occurred."))
+
+            key = request_key(self.path, body)
+            if standin.upstream:
+                status, payload = standin.forward(self.path, self.headers, raw)
+                if standin.record_path:
+                    standin.save(key, site, status, payload)
+                return self.send_json(status, payload)
+            recorded = standin.recorded.get(key)
+            if recorded is not None:
+                with standin.lock:
+                    standin.stats["replayed"] += 1
+                return self.send_json(recorded["status"], recorded["response"])
+
+            text = standin.canned(site)
+            if fate == "malformed":
+                text = text[:max(1, len(text) // 2)]
+            self.send_json(200, envelope(text))
+
+        def log_message(self, format, *args):
+            pass  # per-request logging would dominate under load; see GET /_standin for counters
+
+    return Handler
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # load tests open hundreds of connections at once
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in with latency and failure injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help='"fixed:S", "uniform:LO,HI", "normal:MEAN,SD" or "lognormal:MEDIAN,SIGMA"')
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of calls answered with 429 RESOURCE_EXHAUSTED")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="fraction of calls answered with 500 INTERNAL")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="fraction of calls whose text is truncated/invalid JSON")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of calls that hang, then drop the connection")
+    parser.add_argument("--timeout-seconds", type=float, default=120.0, help="how long a hung call hangs")
+    parser.add_argument("--responses", help='JSON file {"job": [...], "company": [...], "career": [...]} of response texts')
+    parser.add_argument("--seed", type=int, help="seed for latency and failure draws")
+    parser.add_argument("--record", help="append upstream responses to this JSONL file (needs --upstream)")
+    parser.add_argument("--upstream", help="real API base URL to forward to, e.g. https://generativelanguage.googleapis.com")
+    parser.add_argument("--replay", help="serve responses recorded with --record; unmatched calls get canned responses")
+    args = parser.parse_args()
+
+    if args.record and not args.upstream:
+        parser.error("--record needs --upstream")
+    responses = {}
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    standin = StandIn(
+        {"latency": args.latency, "rate_429": args.rate_429, "rate_500": args.rate_500,
+         "malformed_rate": args.malformed_rate, "timeout_rate": args.timeout_rate,
+         "timeout_seconds": args.timeout_seconds},
+        responses, seed=args.seed, record=args.record, replay=args.replay, upstream=args.upstream
+    )
+    server = StandInServer((args.host, args.port), make_handler(standin))
+    print(f"Gemini stand-in on http://{args.host}:{server.server_address[1]} "
+          f"({'recording via ' + args.upstream if args.upstream else 'replaying ' + args.replay if args.replay else 'canned responses'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
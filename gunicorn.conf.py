@@ -0,0 +1,34 @@
+"""Gunicorn settings for the backend (render.yaml and the Procfile start it with this file).
+
+WEB_WORKER_CLASS picks the serving mode:
+
+    gthread  (default) each worker runs WEB_THREADS requests at once in threads
+    gevent   cooperative: a worker holds up to WORKER_CONNECTIONS requests, and a
+             request waiting on Gemini (or a PDF worker, a retry backoff, a coalesced
+             lookup) yields to the others; rule scoring still runs on the request itself
+    sync     one request per worker, as before (WEB_THREADS is ignored)
+
+The routes behave the same in every mode. gevent is opt-in: the SQLite calls
+(result caches, rate limiter, job queue, single-flight leases) are not
+cooperative and stall every request in the worker while they run, and no
+benchmark has shown it ahead of gthread for this app.
+"""
+
+import os
+
+wsgi_app = "index:app"
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api")
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+worker_class = os.getenv("WEB_WORKER_CLASS", "gthread")
+# gunicorn runs a "sync" worker as gthread whenever threads > 1
+threads = int(os.getenv("WEB_THREADS", 8)) if worker_class != "sync" else 1
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", 1000))
+timeout = int(os.getenv("WEB_TIMEOUT", 120))
+
+
+def post_worker_init(worker):
+    # Background job threads run in serving workers only, not in every process that imports the app
+    from index import start_job_workers
+    start_job_workers()
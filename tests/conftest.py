@@ -0,0 +1,115 @@
+"""Shared setup: import the app offline, isolated from any server on the same host."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Must be set before the app is imported: no Gemini, no files shared with a running
+# server (caches, metrics, job queue), no PDF child processes, no job threads
+TEST_TMP = tempfile.mkdtemp(prefix="careersafe_tests_")
+os.environ.update({
+    "GEMINI_API_KEY": "",
+    "CACHE_DB_PATH": "",
+    "METRICS_DIR": "",
+    "RATE_LIMIT_BACKEND": "memory",
+    "PDF_WORKERS": "0",
+    "JOB_WORKERS": "0",
+    "JOB_QUEUE_DB_PATH": os.path.join(TEST_TMP, "jobs.sqlite3"),
+    "TRACE_SAMPLE_RATE": "0",
+    "TRACE_LOG_PATH": "",
+    "PROFILE_SAMPLE_RATE": "0",
+})
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+import index  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_TMP, ignore_errors=True)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def tmp_db(tmp_path):
+    return str(tmp_path / "test.sqlite3")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes time.time() at ``clock.now`` for the test; advance it by hand."""
+    clock = FakeClock()
+    monkeypatch.setattr(index.time, "time", clock.time)
+    return clock
+
+
+class FakeExplanations:
+    """Stand-in for job_ai_explanation. Texts in ``slow`` wait for ``release`` (at most 5 s)."""
+
+    answer = "This message is clearly a scam: it asks for an upfront fee."
+
+    def __init__(self):
+        self.calls = []
+        self.slow = set()
+        self.release = threading.Event()
+
+    def __call__(self, text):
+        self.calls.append(text)
+        if text in self.slow:
+            self.release.wait(5)
+        return self.answer
+
+
+@pytest.fixture
+def explanations(monkeypatch):
+    """Turns the AI step on with a fake Gemini explanation; slow texts are released at teardown."""
+    fake = FakeExplanations()
+    monkeypatch.setattr(index, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(index, "job_ai_explanation", fake)
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    yield fake
+    fake.release.set()
+
+
+def make_pdf(pages):
+    """A minimal PDF with one line of Helvetica text per entry of ``pages``."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(pages):
+        content = f"BT /F1 10 Tf 20 800 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
@@ -0,0 +1,154 @@
+"""/full-analysis sections: deadlines, fallbacks, per-section slots and the status report."""
+
+import threading
+import time
+
+import pytest
+
+from conftest import index
+
+STATUS_KEYS = {"status", "fallback", "elapsed_ms"}
+
+
+@pytest.fixture
+def hang():
+    """A section fn that blocks until the test ends (or 5 s)."""
+    release = threading.Event()
+
+    def fn(value):
+        release.wait(5)
+        return {"late": value}
+
+    yield fn
+    release.set()
+
+
+def slots(size=4):
+    return {"job_analysis": threading.BoundedSemaphore(size), "company_verification": threading.BoundedSemaphore(size)}
+
+
+def rules_only(value):
+    return {"rules": value}
+
+
+def test_every_outcome_reports_the_same_status_keys(hang):
+    def fail(value):
+        raise RuntimeError("boom")
+
+    results, status = index.run_analysis_sections({
+        "job_analysis": ("message", hang, rules_only),
+        "company_verification": ("Acme", fail, None),
+        "career_guidance": ("python", lambda value: {"careers": [value]}, None),
+        "resume_check": ("", rules_only, None),
+    }, timeouts={"job_analysis": 0.2}, slots=slots())
+    assert {name: entry["status"] for name, entry in status.items()} == {
+        "job_analysis": "timeout", "company_verification": "error", "career_guidance": "ok", "resume_check": "skipped"
+    }
+    assert all(set(entry) == STATUS_KEYS for entry in status.values())
+    assert [entry["fallback"] for entry in status.values()] == [True, False, False, False]
+    assert results == {
+        "job_analysis": {"rules": "message"},
+        "company_verification": {"error": "Section error"},
+        "career_guidance": {"careers": ["python"]},
+        "resume_check": {},
+    }
+
+
+def test_a_late_section_is_answered_at_its_deadline(hang):
+    started = time.monotonic()
+    results, status = index.run_analysis_sections(
+        {"job_analysis": ("message", hang, rules_only)}, timeouts={"job_analysis": 0.2}, slots=slots()
+    )
+    elapsed = time.monotonic() - started
+    assert 0.2 <= elapsed < 1
+    assert results["job_analysis"] == {"rules": "message"}
+    assert status["job_analysis"]["status"] == "timeout"
+    assert 200 <= status["job_analysis"]["elapsed_ms"] < 1000
+
+
+def test_ok_sections_report_their_own_run_time():
+    def slow(value):
+        time.sleep(0.1)
+        return {"done": value}
+
+    _, status = index.run_analysis_sections({"job_analysis": ("message", slow, None)}, slots=slots())
+    assert status["job_analysis"] == {"status": "ok", "fallback": False, "elapsed_ms": status["job_analysis"]["elapsed_ms"]}
+    assert 100 <= status["job_analysis"]["elapsed_ms"] < 1000
+
+
+def test_a_failing_fallback_reports_an_error_object(hang):
+    def broken_fallback(value):
+        raise RuntimeError("fallback down")
+
+    results, status = index.run_analysis_sections(
+        {"job_analysis": ("message", hang, broken_fallback)}, timeouts={"job_analysis": 0.1}, slots=slots()
+    )
+    assert results["job_analysis"] == {"error": "Section timeout"}
+    assert status["job_analysis"]["fallback"] is False
+
+
+def test_hung_calls_use_up_only_their_own_section(hang):
+    section_slots = slots(size=1)
+    index.run_analysis_sections(
+        {"company_verification": ("Acme", hang, None)}, timeouts={"company_verification": 0.1}, slots=section_slots
+    )
+    # The hung company lookup still holds the section's only slot
+    started = time.monotonic()
+    results, status = index.run_analysis_sections({
+        "job_analysis": ("message", lambda value: {"verdict": value}, rules_only),
+        "company_verification": ("Acme", hang, lambda name: {"offline": name}),
+    }, timeouts={"company_verification": 5}, slots=section_slots)
+    assert time.monotonic() - started < 1
+    assert status["company_verification"]["status"] == "busy"
+    assert results["company_verification"] == {"offline": "Acme"}
+    assert status["job_analysis"]["status"] == "ok"
+    assert results["job_analysis"] == {"verdict": "message"}
+
+
+def test_slot_is_returned_when_the_late_call_finishes():
+    section_slots = slots(size=1)
+    release = threading.Event()
+
+    def late(value):
+        release.wait(5)
+        return {"late": value}
+
+    index.run_analysis_sections({"job_analysis": ("one", late, None)}, timeouts={"job_analysis": 0.05}, slots=section_slots)
+    release.set()
+    for _ in range(100):
+        if section_slots["job_analysis"].acquire(blocking=False):
+            section_slots["job_analysis"].release()
+            break
+        time.sleep(0.01)
+    _, status = index.run_analysis_sections({"job_analysis": ("two", late, None)}, slots=section_slots)
+    assert status["job_analysis"]["status"] == "ok"
+
+
+def test_rules_only_sections_run_in_the_request_thread(hang):
+    threads = {}
+
+    def record(value):
+        threads[value] = threading.current_thread()
+        return {}
+
+    index.run_analysis_sections({
+        "job_analysis": ("job", record, None),
+        "career_guidance": ("career", record, None),
+        "resume_check": ("resume", record, None),
+    }, slots=slots())
+    assert threads["career"] is threads["resume"] is threading.current_thread()
+    assert threads["job"] is not threading.current_thread()
+
+
+def test_route_falls_back_to_the_rule_verdict_when_ai_is_late(monkeypatch, hang):
+    message = "Pay the registration fee today to secure this job"
+    monkeypatch.setattr(index, "analyze_text", hang)
+    monkeypatch.setattr(index, "FULL_ANALYSIS_TIMEOUTS", {"job_analysis": 0.2, "company_verification": 1})
+    body = index.app.test_client().post("/full-analysis", json={"job_message": message, "skills": "python"}).get_json()
+    expected = index.analyze_text_rules(message)
+    assert {key: value for key, value in body["job_analysis"].items() if key != "timestamp"} == \
+        {key: value for key, value in expected.items() if key != "timestamp"}
+    assert body["sections"]["job_analysis"]["status"] == "timeout"
+    assert body["sections"]["job_analysis"]["fallback"] is True
+    assert body["sections"]["career_guidance"]["status"] == "ok"
+    assert body["sections"]["company_verification"] == {"status": "skipped", "fallback": False, "elapsed_ms": 0}
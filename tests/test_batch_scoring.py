@@ -0,0 +1,31 @@
+"""Batch scoring returns exactly the scored fields of analyze_text_rules for every message."""
+
+import pytest
+
+from conftest import index, load_fixture
+
+pytest.importorskip("numpy")
+
+TEXTS = [case["text"] for case in load_fixture("baseline_analyze_text.json")] + [
+    "",
+    "short",
+    "URGENT!!!! PAY THE REGISTRATION FEE NOW!!! WhatsApp +1 555-123-4567",
+    "We are hiring a backend engineer. Apply on our careers page; interviews are held at our office.",
+    "Verify your account at http://bit.ly/x to receive your first paycheck via gift card",
+]
+
+
+def test_batch_records_equal_analyze_text_rules():
+    records = index.analyze_text_batch(TEXTS)
+    assert len(records) == len(TEXTS)
+    for text, record in zip(TEXTS, records):
+        expected = index.analyze_text_rules(text)
+        assert record == {field: expected[field] for field in record}, text
+
+
+def test_batch_scorer_follows_a_rules_reload():
+    first = index.analyze_text_batch(TEXTS[:3])
+    scorer = index._batch_scorer
+    index.analyze_text_batch(TEXTS[:3], rules=index.load_rules())
+    assert index._batch_scorer is not scorer
+    assert index.analyze_text_batch(TEXTS[:3], rules=index._batch_scorer.rules) == first
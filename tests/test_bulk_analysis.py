@@ -0,0 +1,74 @@
+"""/bulk-analyze: per-text results in input order, one AI call per distinct text, and the AI deadline."""
+
+import threading
+import time
+
+from conftest import index
+
+SCAM = "Pay the registration fee today to secure this job"
+OFFER = "Work from home and earn guaranteed income, send bitcoin to start"
+LEGIT = "We are hiring a backend engineer, apply through our careers page"
+
+
+def bulk(texts, **kwargs):
+    return index.app.test_client().post("/bulk-analyze", json={"texts": texts}, **kwargs)
+
+
+def without_volatile(result):
+    return {key: value for key, value in result.items() if key not in ("index", "timestamp")}
+
+
+def test_results_match_analyze_text_in_input_order(explanations):
+    texts = [SCAM, OFFER, LEGIT, "hi"]
+    # The first text's AI call finishes last
+    explanations.slow.add(SCAM)
+    threading.Timer(0.2, explanations.release.set).start()
+    response = bulk(texts)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["total"] == 4
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    for text, result in zip(texts, body["results"]):
+        assert without_volatile(result) == without_volatile(index.analyze_text(text))
+
+
+def test_duplicate_texts_share_one_ai_call(explanations):
+    response = bulk([SCAM, LEGIT, SCAM, SCAM])
+    results = response.get_json()["results"]
+    assert sorted(explanations.calls) == sorted([SCAM, LEGIT])
+    assert without_volatile(results[0]) == without_volatile(results[2]) == without_volatile(results[3])
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+
+
+def test_texts_that_differ_only_past_the_length_limit_are_deduped(explanations, monkeypatch):
+    monkeypatch.setattr(index, "MAX_TEXT_LENGTH", len(SCAM))
+    bulk([SCAM + " now", SCAM + " later"])
+    assert explanations.calls == [SCAM]
+
+
+def test_ai_calls_past_the_deadline_keep_their_rule_result(explanations, monkeypatch):
+    monkeypatch.setattr(index, "BULK_AI_DEADLINE", 0.3)
+    explanations.slow.add(OFFER)
+    started = time.monotonic()
+    results = bulk([SCAM, OFFER, "hi"]).get_json()["results"]
+    assert time.monotonic() - started < 2
+
+    assert "ai_deadline_exceeded" not in results[0]
+    assert results[0]["ai_explanation"] == explanations.answer
+    assert results[1]["ai_deadline_exceeded"] is True
+    assert results[1]["ai_explanation"] == ""
+    assert without_volatile(results[1]) == without_volatile(dict(index.analyze_text_rules(OFFER), ai_deadline_exceeded=True))
+    # Too-short texts never wait on the AI step
+    assert "ai_deadline_exceeded" not in results[2]
+
+
+def test_a_failed_item_does_not_fail_the_batch(explanations):
+    results = bulk([SCAM, 42, LEGIT]).get_json()["results"]
+    assert results[1] == {"index": 1, "error": "Analysis failed", "risk_percentage": 0}
+    assert results[0]["risk_level"] and results[2]["risk_level"]
+
+
+def test_batch_size_and_shape_are_validated(explanations):
+    assert bulk([]).status_code == 400
+    assert bulk("not a list").status_code == 400
+    assert bulk(["hello there"] * (index.MAX_BULK_TEXTS + 1)).status_code == 400
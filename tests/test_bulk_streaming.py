@@ -0,0 +1,84 @@
+"""/bulk-analyze streaming: NDJSON and SSE framing, completion order, the summary and error lines."""
+
+import json
+
+from conftest import index
+
+SCAM = "Pay the registration fee today to secure this job"
+LEGIT = "We are hiring a backend engineer, apply through our careers page"
+
+
+def stream(texts, query="?stream=ndjson", **kwargs):
+    return index.app.test_client().post("/bulk-analyze" + query, json={"texts": texts}, **kwargs)
+
+
+def ndjson_lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def sse_events(response):
+    events = []
+    for frame in response.get_data(as_text=True).split("\n\n"):
+        if frame:
+            event, data = frame.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_ndjson_yields_one_line_per_text_then_a_summary(explanations):
+    texts = [SCAM, LEGIT, SCAM, "hi"]
+    response = stream(texts)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Cache-Control"] == "no-cache"
+    *results, summary = ndjson_lines(response)
+    assert sorted(result["index"] for result in results) == [0, 1, 2, 3]
+    for result in results:
+        expected = index.analyze_text(texts[result["index"]])
+        assert result["risk_percentage"] == expected["risk_percentage"]
+    assert summary["done"] is True and summary["total"] == 4
+
+
+def test_sse_frames_results_and_a_done_event(explanations):
+    response = stream([SCAM, LEGIT], query="", headers={"Accept": "text/event-stream"})
+    assert response.mimetype == "text/event-stream"
+    events = sse_events(response)
+    assert [event for event, _ in events] == ["result", "result", "done"]
+    assert sorted(data["index"] for _, data in events[:2]) == [0, 1]
+    assert events[-1][1]["total"] == 2
+
+
+def test_results_are_sent_as_they_finish(explanations):
+    explanations.slow.add(SCAM)
+    response = stream([SCAM, LEGIT, "hi"])
+    chunks = response.response
+    # Rule-only and fast items arrive while the slow AI call is still held
+    first = [json.loads(next(chunks)) for _ in range(2)]
+    assert sorted(result["index"] for result in first) == [1, 2]
+    explanations.release.set()
+    last = json.loads(next(chunks))
+    assert last["index"] == 0 and last["ai_explanation"] == explanations.answer
+    assert json.loads(next(chunks))["done"] is True
+
+
+def test_late_items_are_flagged_in_the_stream(explanations, monkeypatch):
+    monkeypatch.setattr(index, "BULK_AI_DEADLINE", 0.2)
+    explanations.slow.add(SCAM)
+    *results, summary = ndjson_lines(stream([SCAM, LEGIT]))
+    late = next(result for result in results if result["index"] == 0)
+    assert late["ai_deadline_exceeded"] is True
+    assert summary["total"] == 2
+
+
+def test_a_failed_item_streams_an_error_line(explanations):
+    *results, summary = ndjson_lines(stream([SCAM, None, LEGIT]))
+    assert {"index": 1, "error": "Analysis failed", "risk_percentage": 0} in results
+    assert summary["total"] == 3
+
+
+def test_streaming_accepts_larger_batches(explanations):
+    texts = ["hello there"] * (index.MAX_BULK_TEXTS + 1)
+    assert stream(texts, query="").status_code == 400
+    response = stream(texts)
+    assert response.status_code == 200
+    assert ndjson_lines(response)[-1]["total"] == len(texts)
@@ -0,0 +1,178 @@
+"""Gemini retries and the per-model circuit breaker."""
+
+import pytest
+
+from conftest import index
+
+
+class Transient(Exception):
+    def __str__(self):
+        return "503 The service is currently unavailable."
+
+
+class Rejected(Exception):
+    def __str__(self):
+        return "400 Request contains an invalid argument."
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(index, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(index, "GEMINI_BREAKER_FAILURES", 5)
+    pool = index.GenerativeModelPool()
+    pool.attempts = 0
+    pool.errors = []
+
+    def generate_content(model_name, prompt, system_instruction=None, generation_config=None):
+        pool.attempts += 1
+        error = pool.errors.pop(0) if pool.errors else None
+        if error is not None:
+            raise error
+        return "response"
+
+    pool.generate_content = generate_content
+    return pool
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = index.CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = index.CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = index.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = index.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.snapshot()["retry_in"] == 30
+    assert breaker.trips == 2
+
+
+def test_transient_errors_are_retried(pool):
+    pool.errors = [Transient(), Transient()]
+    assert pool.call("model", "prompt", retries=2) == "response"
+    assert pool.attempts == 3
+    assert pool.breaker("model").failures == 0
+
+
+def test_a_failed_call_counts_once_however_many_retries(pool):
+    for _ in range(4):
+        pool.errors = [Transient()] * 3
+        with pytest.raises(Transient):
+            pool.call("model", "prompt", retries=2)
+    assert pool.attempts == 12
+    assert pool.breaker("model").failures == 4
+    assert pool.breaker("model").state == "closed"
+
+
+def test_rejected_requests_do_not_count_and_are_not_retried(pool):
+    for _ in range(10):
+        pool.errors = [Rejected()]
+        with pytest.raises(Rejected):
+            pool.call("model", "prompt", retries=2)
+    assert pool.attempts == 10
+    assert pool.breaker("model").state == "closed"
+    assert pool.breaker("model").failures == 0
+
+
+def test_connection_errors_are_transient(pool):
+    pool.errors = [ConnectionResetError("connection reset"), TimeoutError("read timed out")]
+    assert pool.call("model", "prompt", retries=2) == "response"
+
+
+def test_open_breaker_skips_gemini(pool):
+    for _ in range(5):
+        pool.errors = [Transient()] * 3
+        with pytest.raises(Transient):
+            pool.call("model", "prompt", retries=2)
+    attempts = pool.attempts
+    with pytest.raises(index.GeminiUnavailable):
+        pool.call("model", "prompt", retries=2)
+    assert pool.attempts == attempts
+
+
+def test_retries_stop_once_other_calls_open_the_breaker(pool):
+    breaker = pool.breaker("model")
+
+    def trip_then_fail(*args, **kwargs):
+        pool.attempts += 1
+        breaker.state, breaker.opened_at = "open", index.time.time()
+        raise Transient()
+
+    pool.generate_content = trip_then_fail
+    with pytest.raises(Transient):
+        pool.call("model", "prompt", retries=2)
+    assert pool.attempts == 1
+
+
+def test_breakers_are_per_model(pool):
+    for _ in range(5):
+        pool.errors = [Transient()] * 3
+        with pytest.raises(Transient):
+            pool.call("model-a", "prompt", retries=2)
+    assert pool.call("model-b", "prompt") == "response"
+
+
+@pytest.mark.parametrize("message", [
+    "503 The service is currently unavailable.",
+    "429 Resource has been exhausted (e.g. check quota).",
+    "HTTP 504 Gateway Timeout",
+    "Upstream returned status code: 500",
+])
+def test_status_codes_in_messages_are_transient(message):
+    assert index.is_transient_gemini_error(RuntimeError(message))
+
+
+@pytest.mark.parametrize("message", [
+    "400 max_output_tokens 500 is above the model limit",
+    "Request 1504 failed validation",
+    "Invalid value 429 for top_k",
+    "Candidate was blocked due to SAFETY",
+])
+def test_numbers_that_are_not_the_status_are_not_transient(message):
+    assert not index.is_transient_gemini_error(RuntimeError(message))
+
+
+def test_api_errors_are_classified_by_their_status_code():
+    exceptions = pytest.importorskip("google.api_core.exceptions")
+    assert index.is_transient_gemini_error(exceptions.ServiceUnavailable("overloaded"))
+    assert index.is_transient_gemini_error(exceptions.TooManyRequests("slow down"))
+    assert index.is_transient_gemini_error(exceptions.InternalServerError("boom"))
+    assert not index.is_transient_gemini_error(exceptions.InvalidArgument("temperature must be below 500"))
+    assert not index.is_transient_gemini_error(exceptions.PermissionDenied("API key 503 revoked"))
+
+
+def test_bad_requests_mentioning_a_5xx_number_are_not_retried(pool):
+    pool.errors = [RuntimeError("400 max_output_tokens 500 is above the model limit")]
+    with pytest.raises(RuntimeError):
+        pool.call("model", "prompt", retries=2)
+    assert pool.attempts == 1
+    assert pool.breaker("model").failures == 0
@@ -0,0 +1,114 @@
+"""Company verification cache: fresh hits, stale-while-revalidate, negative entries and Gemini outages."""
+
+import threading
+import time
+
+import pytest
+
+from conftest import index
+
+TTL = 100
+STALE_TTL = 1000
+NEGATIVE_TTL = 10
+
+
+class Calls(list):
+    error = None
+    gate = None
+
+
+@pytest.fixture
+def lookups(monkeypatch, tmp_db, clock):
+    """Stand-in for fetch_company_profile; set ``lookups.error`` or ``lookups.gate`` to steer it."""
+    monkeypatch.setattr(index, "COMPANY_CACHE_TTL", TTL)
+    monkeypatch.setattr(index, "COMPANY_CACHE_NEGATIVE_TTL", NEGATIVE_TTL)
+    monkeypatch.setattr(index, "COMPANY_CACHE", index.TieredCache("company_verification", ttl=TTL + STALE_TTL, path=tmp_db))
+    monkeypatch.setattr(index, "COMPANY_FLIGHTS", index.SingleFlight("company_verification", path=tmp_db))
+    monkeypatch.setattr(index, "_company_refreshes", set())
+    calls = Calls()
+
+    def fetch(company_name):
+        calls.append(company_name)
+        if calls.gate is not None:
+            calls.gate.wait(5)
+        if calls.error is not None:
+            raise calls.error
+        return {"verified": True, "risk": 15, "company_information": {"lookup": len(calls)}}
+
+    monkeypatch.setattr(index, "fetch_company_profile", fetch)
+    return calls
+
+
+def lookup_number(profile):
+    return profile["company_information"]["lookup"]
+
+
+def wait_for_refreshes():
+    # A refresh leaves the set only after it has stored its result
+    for _ in range(100):
+        if not index._company_refreshes:
+            return
+        time.sleep(0.05)
+    raise AssertionError("background refresh did not finish")
+
+
+def test_fresh_entries_are_served_without_a_lookup(lookups, clock):
+    assert lookup_number(index.company_ai_profile("Acme Widgets")) == 1
+    clock.now += TTL - 1
+    # Normalized names share one entry
+    assert lookup_number(index.company_ai_profile("ACME Widgets, Inc.")) == 1
+    assert len(lookups) == 1
+
+
+def test_stale_entry_is_served_while_one_background_refresh_runs(lookups, clock):
+    index.company_ai_profile("Acme Widgets")
+    clock.now += TTL
+    lookups.gate = threading.Event()
+    try:
+        # Both requests get the stale profile at once; only one refresh starts
+        assert lookup_number(index.company_ai_profile("Acme Widgets")) == 1
+        assert lookup_number(index.company_ai_profile("Acme Widgets")) == 1
+        assert index._company_refreshes == {"acme widgets"}
+    finally:
+        lookups.gate.set()
+    wait_for_refreshes()
+    assert len(lookups) == 2
+    assert not index._company_refreshes
+    assert lookup_number(index.company_ai_profile("Acme Widgets")) == 2
+
+
+def test_failed_refresh_keeps_serving_the_stale_profile(lookups, clock):
+    index.company_ai_profile("Acme Widgets")
+    clock.now += TTL
+    lookups.error = RuntimeError("500 Internal error")
+    assert lookup_number(index.company_ai_profile("Acme Widgets")) == 1
+    wait_for_refreshes()
+    # No negative entry replaced it; the next request retries the refresh
+    assert lookup_number(index.company_ai_profile("Acme Widgets")) == 1
+    wait_for_refreshes()
+    assert len(lookups) == 3
+
+
+def test_entries_past_the_stale_window_are_fetched_again(lookups, clock):
+    index.company_ai_profile("Acme Widgets")
+    clock.now += TTL + STALE_TTL
+    assert lookup_number(index.company_ai_profile("Acme Widgets")) == 2
+    assert not index._company_refreshes
+
+
+def test_failed_lookups_are_cached_for_the_negative_ttl(lookups, clock):
+    lookups.error = RuntimeError("500 Internal error")
+    assert index.company_ai_profile("Shady Corp") is None
+    clock.now += NEGATIVE_TTL - 1
+    assert index.company_ai_profile("Shady Corp") is None
+    assert len(lookups) == 1
+    clock.now += 1
+    lookups.error = None
+    assert lookup_number(index.company_ai_profile("Shady Corp")) == 2
+
+
+def test_skipped_lookups_are_not_cached(lookups):
+    lookups.error = index.GeminiUnavailable("circuit open")
+    assert index.company_ai_profile("Acme Widgets") is None
+    lookups.error = None
+    assert lookup_number(index.company_ai_profile("Acme Widgets")) == 2
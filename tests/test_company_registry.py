@@ -0,0 +1,78 @@
+"""Company name normalization and the verified-company registry index."""
+
+import pytest
+
+from conftest import index
+
+
+@pytest.mark.parametrize("name", ["Google", "GOOGLE", "Google LLC", "google, inc.", "Google L.L.C.", "  google   Inc  "])
+def test_legal_suffixes_and_case_normalize_away(name):
+    assert index.normalize_company_name(name) == "google"
+
+
+def test_normalization_keeps_a_name_that_is_only_a_suffix():
+    assert index.normalize_company_name("Company") == "company"
+    assert index.normalize_company_name("Johnson & Johnson Ltd") == "johnson & johnson"
+
+
+def company(name, **fields):
+    return dict(fields, name=name)
+
+
+@pytest.fixture
+def registry():
+    return index.CompanyRegistry([
+        company("Meta"),
+        company("Bank of America", aliases=["BofA"]),
+        company("America"),
+        company("Tata Consultancy Services", aliases=["TCS"]),
+        company("Tata"),
+    ])
+
+
+def test_exact_names_match_whatever_their_suffix(registry):
+    assert registry.lookup("Meta Inc")["name"] == "Meta"
+    assert registry.lookup("META, Inc.")["name"] == "Meta"
+
+
+def test_matching_is_per_token_not_per_substring(registry):
+    assert registry.lookup("Metadata Inc") is None
+    assert registry.lookup("Metamask") is None
+    assert registry.lookup("") is None
+
+
+def test_aliases_find_their_company(registry):
+    assert registry.lookup("bofa")["name"] == "Bank of America"
+    assert registry.lookup("TCS careers")["name"] == "Tata Consultancy Services"
+
+
+def test_longest_registered_name_wins(registry):
+    assert registry.lookup("Bank of America Careers")["name"] == "Bank of America"
+    assert registry.lookup("Tata Consultancy Services Ltd")["name"] == "Tata Consultancy Services"
+    assert registry.lookup("Tata Motors")["name"] == "Tata"
+    # Equally long names: the one earlier in the input
+    assert registry.lookup("Meta and Tata")["name"] == "Meta"
+
+
+class CountingDict(dict):
+    probes = 0
+
+    def get(self, key, default=None):
+        CountingDict.probes += 1
+        return super().get(key, default)
+
+
+@pytest.mark.parametrize("size", [10, 10000])
+def test_lookup_cost_does_not_grow_with_names_sharing_a_word(size):
+    registry = index.CompanyRegistry([company(f"Global Widgets {i}") for i in range(size)])
+    registry._by_name = CountingDict(registry._by_name)
+    CountingDict.probes = 0
+    assert registry.lookup("Global Logistics Partners") is None
+    # Three tokens, names of up to three tokens: 3 + 2 + 1 probes
+    assert CountingDict.probes == 6
+
+
+def test_shipped_registry_loads():
+    registry = index.load_company_registry()
+    assert len(registry) > 0
+    assert registry.lookup("Google Careers")["name"] == "Google"
@@ -0,0 +1,59 @@
+"""Gemini receives exactly the model, system instruction, prompt and generation config of the original code.
+
+tests/fixtures/baseline_gemini_prompts.json was recorded from the pre-refactor
+app with genai.GenerativeModel replaced by a recorder.
+"""
+
+import pytest
+
+from conftest import index, load_fixture
+
+BASELINE = load_fixture("baseline_gemini_prompts.json")
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    calls = []
+
+    def call(model_name, prompt, system_instruction=None, generation_config=None, retries=None, site=None):
+        calls.append({
+            "model": model_name,
+            "system_instruction": system_instruction,
+            "prompt": prompt,
+            "generation_config": dict(generation_config) if generation_config else None,
+        })
+        return Response('{"is_scam": false}')
+
+    monkeypatch.setattr(index.GEMINI_MODELS, "call", call)
+    monkeypatch.setattr(index, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(index, "JOB_EXPLANATION_CACHE", index.TieredCache("job_explanation", path=""))
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    return calls
+
+
+def expected(site):
+    return {key: value for key, value in BASELINE[site].items() if key != "input"}
+
+
+def test_job_analysis_prompt(sent):
+    index.job_ai_explanation(BASELINE["analyze_text"]["input"])
+    assert sent == [expected("analyze_text")]
+
+
+def test_career_guidance_prompt(sent):
+    index.app.test_client().post("/career-guidance", json={"skill": BASELINE["career_guidance"]["input"]})
+    assert sent == [expected("career_guidance")]
+
+
+def test_company_verification_prompt(sent):
+    index.fetch_company_profile(BASELINE["verify_company_data"]["input"])
+    assert sent == [expected("verify_company_data")]
+
+
+def test_inline_literal_indents_every_line_after_the_first():
+    assert index.inline_literal("a\n\n  b\n", indent=4) == "a\n    \n      b\n    "
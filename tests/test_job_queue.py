@@ -0,0 +1,256 @@
+"""Background job queue: ordering, leases, claim ownership, expiry and the /jobs endpoints."""
+
+import hashlib
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import index, make_pdf
+
+ADMIN = {"Authorization": "Bearer test-admin-token"}
+
+
+@pytest.fixture
+def queue(tmp_db):
+    return index.JobQueue(tmp_db, result_ttl=60, lease=10, max_attempts=2)
+
+
+def submit(queue, priority=0, body=b'{"texts": ["hello"]}'):
+    return queue.submit("bulk-analyze", io.BytesIO(body), "application/json", priority)
+
+
+def spooled(queue):
+    return sorted(os.listdir(queue.spool_dir))
+
+
+def test_claims_highest_priority_then_oldest(queue, clock):
+    low = submit(queue, priority=-1)
+    clock.now += 1
+    first = submit(queue)
+    clock.now += 1
+    second = submit(queue)
+    clock.now += 1
+    urgent = submit(queue, priority=5)
+    assert [queue.claim()[0] for _ in range(4)] == [urgent, first, second, low]
+    assert queue.claim() is None
+
+
+def test_a_claimed_job_is_not_claimed_again_within_its_lease(queue, clock):
+    job_id = submit(queue)
+    assert queue.claim()[0] == job_id
+    clock.now += 9
+    assert queue.claim() is None
+
+
+def test_expired_lease_is_retaken_as_a_new_attempt(queue, clock):
+    job_id = submit(queue)
+    assert queue.claim()[5] == 1
+    clock.now += 11
+    retaken = queue.claim()
+    assert (retaken[0], retaken[5]) == (job_id, 2)
+    assert queue.get(job_id)["attempts"] == 2
+
+
+def test_job_fails_once_its_attempts_are_used_up(queue, clock):
+    job_id = submit(queue)
+    queue.claim()
+    clock.now += 11
+    queue.claim()
+    clock.now += 11
+    assert queue.claim() is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Worker stopped while running the job"
+
+
+def test_renewed_lease_keeps_the_claim(queue, clock):
+    job_id = submit(queue)
+    attempt = queue.claim()[5]
+    for _ in range(3):
+        clock.now += 8
+        queue.renew([(job_id, attempt)])
+        assert queue.claim() is None
+    assert queue.finish(job_id, attempt, "done", {"ok": True}, 200)
+
+
+def test_only_the_current_claim_may_store_a_result(queue, clock):
+    job_id = submit(queue)
+    stale = queue.claim()[5]
+    clock.now += 11
+    current = queue.claim()[5]
+    assert not queue.finish(job_id, stale, "done", {"from": "stale"}, 200)
+    assert queue.finish(job_id, current, "done", {"from": "current"}, 200)
+    assert not queue.finish(job_id, current, "failed", error="late duplicate")
+    job = queue.get(job_id)
+    assert (job["status"], job["result"], job["result_status"]) == ("done", {"from": "current"}, 200)
+
+
+def test_results_expire_after_their_ttl(queue, clock):
+    job_id = submit(queue)
+    queue.finish(job_id, queue.claim()[5], "done", {"ok": True}, 200)
+    clock.now += 59
+    assert queue.get(job_id)["status"] == "done"
+    clock.now += 2
+    assert queue.get(job_id) is None
+    queue.purge()
+    assert queue._conn().execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+
+
+def test_queued_jobs_survive_a_restart(tmp_db):
+    job_id = submit(index.JobQueue(tmp_db))
+    restarted = index.JobQueue(tmp_db)
+    assert restarted.claim()[0] == job_id
+
+
+def test_workers_run_jobs_and_renew_long_ones(tmp_db):
+    queue = index.JobQueue(tmp_db, lease=0.3)
+    # The idle worker polls often enough to retake the job if its lease lapsed
+    queue.POLL_INTERVAL = 0.05
+    runs = []
+    done = threading.Event()
+
+    def runner(job_type, body, content_type):
+        runs.append(job_type)
+        time.sleep(0.8)
+        done.set()
+        return 200, {"ok": True}
+
+    job_id = submit(queue)
+    queue.start(2, runner)
+    try:
+        assert done.wait(5)
+        for _ in range(50):
+            if queue.get(job_id)["status"] == "done":
+                break
+            time.sleep(0.05)
+    finally:
+        queue.stop(timeout=5)
+    assert not [thread for thread in queue._threads if thread.is_alive()]
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"], job["result"]) == ("done", 1, {"ok": True})
+    assert runs == ["bulk-analyze"]
+
+
+def test_bodies_are_spooled_to_files_not_the_database(queue):
+    body = b'{"texts": ["%s"]}' % (b"x" * (3 * 1024 * 1024))
+    job_id = submit(queue, body=body)
+    path, digest = queue._conn().execute("SELECT body_path, body_digest FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    assert os.path.dirname(path) == queue.spool_dir
+    with open(path, "rb") as f:
+        assert f.read() == body
+    assert digest == hashlib.sha256(body).hexdigest()
+    claimed = queue.claim()
+    assert (claimed[3], claimed[6]) == (path, digest)
+
+
+def test_finishing_deletes_the_body_but_a_stale_claim_does_not(queue, clock):
+    job_id = submit(queue)
+    stale = queue.claim()[5]
+    clock.now += 11
+    current = queue.claim()[5]
+    assert not queue.finish(job_id, stale, "done", {}, 200)
+    assert len(spooled(queue)) == 1
+    assert queue.finish(job_id, current, "done", {}, 200)
+    assert spooled(queue) == []
+
+
+def test_a_given_up_job_deletes_its_body(queue, clock):
+    submit(queue)
+    for _ in range(2):
+        queue.claim()
+        clock.now += 11
+    assert queue.claim() is None
+    assert spooled(queue) == []
+
+
+def test_a_damaged_body_fails_the_job_without_running_it(queue):
+    job_id = submit(queue)
+    claimed = queue.claim()
+    with open(claimed[3], "ab") as f:
+        f.write(b"tampered")
+    runs = []
+    status = queue._run(lambda *args: runs.append(args), job_id, claimed[5], claimed[1], claimed[3], claimed[6], claimed[2])
+    assert status == "failed" and runs == []
+    assert queue.get(job_id)["error"] == "Job upload is missing or damaged"
+    assert spooled(queue) == []
+
+
+def test_purge_removes_bodies_left_without_a_job(queue):
+    kept = submit(queue)
+    orphan = os.path.join(queue.spool_dir, "0" * 32 + ".body")
+    recent = os.path.join(queue.spool_dir, "1" * 32 + ".body")
+    for path in (orphan, recent):
+        with open(path, "wb") as f:
+            f.write(b"partial upload")
+    os.utime(orphan, (time.time() - 60, time.time() - 60))
+    os.utime(os.path.join(queue.spool_dir, f"{kept}.body"), (time.time() - 60, time.time() - 60))
+    queue.purge()
+    assert spooled(queue) == sorted([f"{kept}.body", os.path.basename(recent)])
+
+
+def test_importing_the_app_starts_no_job_threads():
+    assert not index._job_workers_started
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("job-")]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_db):
+    monkeypatch.setattr(index, "JOB_QUEUE", index.JobQueue(tmp_db))
+    monkeypatch.setattr(index, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    return index.app.test_client()
+
+
+def test_submit_then_poll_returns_the_route_result(client):
+    response = client.post("/jobs/bulk-analyze", json={"texts": ["Pay the registration fee today"]})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+    assert client.get(f"/jobs/{job_id}").get_json()["status"] == "queued"
+
+    claimed = index.JOB_QUEUE.claim()
+    with index.JOB_QUEUE.open_body(claimed[3], claimed[6]) as body:
+        result_status, result = index.run_job(claimed[1], body, claimed[2])
+    index.JOB_QUEUE.finish(job_id, claimed[5], "done", result, result_status)
+    job = client.get(f"/jobs/{job_id}").get_json()
+    assert job["status"] == "done"
+    assert job["result_status"] == 200
+    assert job["result"]["results"][0]["risk_level"] == index.analyze_text_rules("Pay the registration fee today")["risk_level"]
+
+
+def test_uploads_run_from_the_spooled_body(client):
+    pdf = make_pdf(["Software engineer with 5 years of Python and SQL experience at Acme"])
+    response = client.post("/jobs/resume-check", data={"resume": (io.BytesIO(pdf), "resume.pdf")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 202
+    claimed = index.JOB_QUEUE.claim()
+    with index.JOB_QUEUE.open_body(claimed[3], claimed[6]) as body:
+        result_status, result = index.run_job(claimed[1], body, claimed[2])
+    direct = client.post("/resume-check", data={"resume": (io.BytesIO(pdf), "resume.pdf")},
+                         content_type="multipart/form-data").get_json()
+    assert result_status == 200
+    assert result["risk_percentage"] == direct["risk_percentage"]
+
+
+def test_submissions_count_against_the_route_rate_limit(client):
+    environ = {"REMOTE_ADDR": "203.0.113.9"}
+    statuses = [client.post("/jobs/bulk-analyze", json={"texts": ["x"]}, environ_base=environ).status_code
+                for _ in range(6)]
+    assert statuses == [202] * 5 + [429]
+    # The synchronous route shares the same budget
+    assert client.post("/bulk-analyze", json={"texts": ["hello there"]}, environ_base=environ).status_code == 429
+
+
+def test_priority_is_admin_only(client):
+    assert client.post("/jobs/full-analysis?priority=5", json={}).status_code == 403
+    response = client.post("/jobs/full-analysis?priority=5", json={}, headers=ADMIN)
+    assert response.status_code == 202
+    assert response.get_json()["priority"] == 5
+
+
+def test_unknown_job_type_and_id(client):
+    assert client.post("/jobs/delete-everything", json={}).status_code == 404
+    assert client.get("/jobs/0123456789abcdef").status_code == 404
@@ -0,0 +1,88 @@
+"""Lazy imports: heavy modules load on first attribute access, and the cold start report."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from conftest import ROOT, index
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    """A module named ``lazy_probe`` that counts how often it is imported."""
+    (tmp_path / "lazy_probe.py").write_text(
+        "import sys\n"
+        "sys.lazy_probe_imports = getattr(sys, 'lazy_probe_imports', 0) + 1\n"
+        "value = 42\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "lazy_probe_imports", 0, raising=False)
+    yield "lazy_probe"
+    sys.modules.pop("lazy_probe", None)
+    index.STARTUP_REPORT["lazy_imports"].pop("lazy_probe", None)
+
+
+def test_module_is_imported_on_first_attribute_access(probe):
+    loaded = []
+    module = index.LazyModule(probe, on_load=loaded.append)
+    assert probe not in sys.modules and sys.lazy_probe_imports == 0
+    assert module.value == 42
+    assert module.value == 42
+    assert sys.lazy_probe_imports == 1
+    assert loaded == [sys.modules[probe]]
+    report = index.STARTUP_REPORT["lazy_imports"][probe]
+    assert report["trigger"] == "first use" and report["seconds"] >= 0
+
+
+def test_attributes_are_set_on_the_real_module(probe):
+    module = index.LazyModule(probe)
+    module.value = 7
+    assert sys.modules[probe].value == 7
+
+
+def test_concurrent_first_uses_import_once(probe):
+    loaded = []
+    module = index.LazyModule(probe, on_load=loaded.append)
+    start = threading.Barrier(8)
+
+    def use():
+        start.wait(5)
+        module.load()
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert sys.lazy_probe_imports == 1 and len(loaded) == 1
+
+
+def test_available_is_false_for_a_missing_module():
+    assert index.LazyModule("careersafe_no_such_module").available is False
+
+
+def test_app_import_leaves_heavy_modules_unloaded():
+    script = (
+        "import json, sys\n"
+        f"sys.path.insert(0, {os.path.join(ROOT, 'api')!r})\n"
+        "import index\n"
+        "heavy = ['google.generativeai', 'PyPDF2', 'numpy']\n"
+        "print(json.dumps({'loaded': [name for name in heavy if name in sys.modules], 'report': index.STARTUP_REPORT}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60, check=True)
+    result = json.loads(output.stdout.splitlines()[-1])
+    assert result["loaded"] == []
+    report = result["report"]
+    assert report["lazy_imports"] == {}
+    assert {"imports", "module_body", "rules"} <= set(report["phases"])
+    assert report["total_seconds"] >= sum(report["phases"].values()) - 0.01
+
+
+def test_health_reports_the_cold_start():
+    body = index.app.test_client().get("/health").get_json()
+    assert body["startup"]["total_seconds"] == index.STARTUP_REPORT["total_seconds"]
+    assert "phases" in body["startup"] and "lazy_imports" in body["startup"]
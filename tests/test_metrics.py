@@ -0,0 +1,117 @@
+"""/metrics: scrape access and Prometheus counters summed across threads and workers."""
+
+import json
+import os
+import threading
+
+import pytest
+
+from conftest import index
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    monkeypatch.setattr(index, "METRICS_TOKEN", "scrape-token")
+    monkeypatch.setattr(index, "ADMIN_TOKEN", "admin-token")
+
+
+def scrape(token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token is not None else {}
+    return index.app.test_client().get("/metrics", headers=headers)
+
+
+def test_scrapes_need_the_metrics_token(tokens):
+    assert scrape().status_code == 403
+    assert scrape("wrong").status_code == 403
+    response = scrape("scrape-token")
+    assert response.status_code == 200
+    assert "# TYPE careersafe_http_requests_total counter" in response.get_data(as_text=True)
+
+
+def test_the_admin_token_can_scrape(tokens):
+    assert scrape("admin-token").status_code == 200
+
+
+def test_scrapes_are_refused_while_no_token_is_set(monkeypatch):
+    monkeypatch.setattr(index, "METRICS_TOKEN", "")
+    monkeypatch.setattr(index, "ADMIN_TOKEN", "")
+    assert scrape("").status_code == 403
+    assert scrape().status_code == 403
+
+
+def metrics(directory=None):
+    registry = index.Metrics(directory)
+    registry.define("requests_total", "counter", "Requests.")
+    registry.define("in_flight", "gauge", "In flight.")
+    registry.define("latency_seconds", "histogram", "Latency.", buckets=(0.1, 1.0))
+    return registry
+
+
+def worker_file(directory, pid, entries, master=None):
+    path = directory / f"{master or os.getppid()}-{pid}.json"
+    path.write_text(json.dumps(entries))
+    return path
+
+
+def test_counts_from_every_thread_are_summed():
+    registry = metrics()
+    recorded, finish = threading.Barrier(9), threading.Event()
+
+    def record():
+        for _ in range(1000):
+            registry.inc("requests_total", route="/analyze")
+        registry.observe("latency_seconds", 0.5, route="/analyze")
+        recorded.wait(5)
+        finish.wait(5)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    recorded.wait(5)
+    key = ("requests_total", (("route", "/analyze"),))
+    assert registry.snapshot()[key] == 8000
+    finish.set()
+    for thread in threads:
+        thread.join(5)
+    # Shards of exited threads are folded in, not lost
+    totals = registry.snapshot()
+    assert totals[key] == 8000
+    assert totals[("latency_seconds", (("route", "/analyze"),))] == [0, 8, 0, 4.0]
+    assert registry.snapshot()[key] == 8000
+
+
+def test_scrape_sums_the_files_of_every_worker(tmp_path):
+    registry = metrics(str(tmp_path))
+    registry.inc("requests_total", 3, route="/analyze")
+    registry.inc("in_flight", 1)
+    exited = 2 ** 30
+    worker_file(tmp_path, exited, [
+        ["requests_total", [["route", "/analyze"]], 4],
+        ["in_flight", [], 5],
+        ["latency_seconds", [], [1, 0, 0, 0.05]],
+    ])
+    totals = registry.collect()
+    assert totals[("requests_total", (("route", "/analyze"),))] == 7
+    assert totals[("latency_seconds", ())] == [1, 0, 0, 0.05]
+    # Gauges only count live workers
+    assert totals[("in_flight", ())] == 1
+    assert (tmp_path / f"{os.getppid()}-{os.getpid()}.json").exists()
+
+
+def test_files_of_a_previous_master_are_ignored_and_removed(tmp_path):
+    registry = metrics(str(tmp_path))
+    stale = worker_file(tmp_path, 12345, [["requests_total", [], 100]], master=2 ** 30)
+    assert ("requests_total", ()) not in registry.collect()
+    assert not stale.exists()
+
+
+def test_render_writes_prometheus_text():
+    registry = metrics()
+    registry.inc("requests_total", route="/analyze")
+    registry.observe("latency_seconds", 0.5)
+    lines = registry.render().splitlines()
+    assert 'requests_total{route="/analyze"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 0' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in lines
+    assert "latency_seconds_count 1" in lines
@@ -0,0 +1,80 @@
+"""Resume PDF ingestion: page, text, time and byte limits, and the memory-mapped path."""
+
+import io
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from conftest import index, make_pdf
+
+PAGE = "Software engineer with 5 years of Python and SQL experience at Acme"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(index, "RESUME_RESULT_CACHE", index.LRUCache(16, 60))
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    return index.app.test_client()
+
+
+def upload(client, pdf, filename="resume.pdf"):
+    return client.post("/resume-check", data={"resume": (io.BytesIO(pdf), filename)}, content_type="multipart/form-data")
+
+
+def test_text_of_every_page_is_read_within_the_limits():
+    text, stats = index.extract_pdf_text(io.BytesIO(make_pdf([PAGE, "Second page"])))
+    assert text == (PAGE + "Second page").lower()
+    assert stats["pages"] == stats["pages_read"] == 2
+    assert stats["stopped"] is None
+
+
+def test_page_limit_stops_reading():
+    text, stats = index.extract_pdf_text(io.BytesIO(make_pdf([f"page {n}" for n in range(10)])), max_pages=3)
+    assert text == "page 0page 1page 2"
+    assert (stats["pages"], stats["pages_read"], stats["stopped"]) == (10, 3, "page_limit")
+
+
+def test_text_limit_stops_reading():
+    _, stats = index.extract_pdf_text(io.BytesIO(make_pdf([PAGE] * 10)), max_chars=len(PAGE) * 2)
+    assert (stats["pages_read"], stats["stopped"]) == (2, "text_limit")
+
+
+def test_text_limit_on_the_last_page_is_not_an_early_stop():
+    _, stats = index.extract_pdf_text(io.BytesIO(make_pdf([PAGE] * 2)), max_chars=len(PAGE) * 2)
+    assert (stats["pages_read"], stats["stopped"]) == (2, None)
+
+
+def test_time_budget_stops_reading():
+    _, stats = index.extract_pdf_text(io.BytesIO(make_pdf([PAGE] * 5)), budget=-1)
+    assert (stats["pages_read"], stats["stopped"]) == (0, "time_budget")
+
+
+def test_large_uploads_are_memory_mapped(monkeypatch):
+    monkeypatch.setattr(index, "RESUME_MMAP_THRESHOLD", 0)
+    file_storage = FileStorage(index.DigestingSpooledFile())
+    file_storage.stream.write(make_pdf([PAGE]))
+    stream, mapping = index.open_upload(file_storage, 1)
+    try:
+        assert mapping is stream and isinstance(mapping, index.mmap.mmap)
+        assert index.extract_pdf_text(stream)[0] == PAGE.lower()
+    finally:
+        mapping.close()
+
+
+def test_route_scores_the_pages_inside_the_limit(client, monkeypatch):
+    monkeypatch.setattr(index, "RESUME_MAX_PAGES", 1)
+    full = upload(client, make_pdf([PAGE])).get_json()
+    limited = upload(client, make_pdf([PAGE, "guru ninja rockstar " * 20])).get_json()
+    assert limited["risk_percentage"] == full["risk_percentage"]
+
+
+def test_route_rejects_uploads_over_the_byte_limit(client, monkeypatch):
+    pdf = make_pdf([PAGE])
+    monkeypatch.setattr(index, "MAX_FILE_SIZE", len(pdf) - 1)
+    response = upload(client, pdf)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "File size exceeds limit"
+
+
+def test_route_rejects_other_file_types(client):
+    assert upload(client, make_pdf([PAGE]), filename="resume.docx").status_code == 400
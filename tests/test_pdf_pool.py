@@ -0,0 +1,102 @@
+"""PDF worker pool: results match in-process parsing, and stuck or dead children are replaced."""
+
+import multiprocessing
+import os
+import signal
+
+import pytest
+
+from conftest import index, make_pdf
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+
+PAGES = [f"page {n} of the resume" for n in range(25)]
+
+
+@pytest.fixture
+def pool():
+    pool = index.PDFExtractionPool(1)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf(PAGES))
+    return str(path)
+
+
+def child(pool):
+    return pool._idle.queue[0][0]
+
+
+def test_pool_extracts_the_same_text_as_the_request_thread(pool, pdf_path):
+    with open(pdf_path, "rb") as f:
+        expected, expected_stats = index.extract_pdf_text(f, max_pages=22)
+    text, stats = pool.extract_text(pdf_path, max_pages=22)
+    assert text == expected
+    assert {key: stats[key] for key in ("pages", "pages_read", "stopped")} == \
+        {key: expected_stats[key] for key in ("pages", "pages_read", "stopped")}
+
+
+def test_a_stuck_child_is_killed_and_replaced(pool, pdf_path):
+    stuck = child(pool)
+    os.kill(stuck.pid, signal.SIGSTOP)
+    with pytest.raises(index.PDFExtractionError, match="timed out"):
+        pool.run(("count", pdf_path, ()), 0.3)
+    assert not stuck.is_alive()
+    assert pool.replaced == 1
+    assert child(pool) is not stuck
+    assert pool.run(("count", pdf_path, ()), 5) == len(PAGES)
+
+
+def test_a_dead_child_is_replaced_before_the_next_job(pool, pdf_path):
+    dead = child(pool)
+    os.kill(dead.pid, signal.SIGKILL)
+    dead.join(5)
+    assert pool.run(("count", pdf_path, ()), 5) == len(PAGES)
+    assert pool.replaced == 1
+
+
+def test_parse_errors_come_back_without_replacing_the_child(pool, tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    worker = child(pool)
+    with pytest.raises(index.PDFExtractionError):
+        pool.run(("count", str(broken), ()), 5)
+    assert child(pool) is worker and pool.replaced == 0
+
+
+def test_a_failed_restart_keeps_the_slot(pool, pdf_path, monkeypatch):
+    dead = child(pool)
+    os.kill(dead.pid, signal.SIGKILL)
+    dead.join(5)
+    spawn = pool._spawn
+
+    def no_fork():
+        raise OSError("fork failed")
+
+    monkeypatch.setattr(pool, "_spawn", no_fork)
+    with pytest.raises(index.PDFExtractionError, match="no PDF worker"):
+        pool.run(("count", pdf_path, ()), 5)
+    assert pool._idle.qsize() == 1
+    # Once forking works again the same slot is refilled
+    monkeypatch.setattr(pool, "_spawn", spawn)
+    assert pool.run(("count", pdf_path, ()), 5) == len(PAGES)
+    assert pool.replaced == 1
+
+
+def test_replies_are_awaited_cooperatively_under_gevent(monkeypatch):
+    gevent = pytest.importorskip("gevent")
+    monkeypatch.setattr(index, "cooperative_io", lambda: True)
+    parent_conn, child_conn = multiprocessing.Pipe()
+    try:
+        assert index._wait_reply(parent_conn, 0.05) is False
+        # The reply is sent by another greenlet, which only runs if the wait yields
+        gevent.spawn_later(0.05, child_conn.send, ("ok", 1))
+        assert index._wait_reply(parent_conn, 5) is True
+        assert parent_conn.recv() == ("ok", 1)
+    finally:
+        parent_conn.close()
+        child_conn.close()
@@ -0,0 +1,63 @@
+"""Sampling profiler: collapsed stacks per route, summed across processes, and admin-only opt-in."""
+
+import os
+import sys
+import time
+
+import pytest
+
+from conftest import index
+
+ADMIN = {"Authorization": "Bearer test-admin-token"}
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    profiler = index.SamplingProfiler(str(tmp_path), interval=0.001)
+    monkeypatch.setattr(index, "PROFILER", profiler)
+    return profiler
+
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_stacks_are_collapsed_root_first():
+    stack = index.SamplingProfiler.collapse(sys._getframe())
+    assert stack.endswith(";test_profiler.py:test_stacks_are_collapsed_root_first")
+
+
+def test_profiled_thread_stacks_are_sampled_per_route(profiler, tmp_path):
+    profiler.start()
+    spin(0.2)
+    samples = profiler.stop("/analyze")
+    assert samples > 0
+    stacks = profiler.read("/analyze")
+    assert sum(stacks.values()) == samples
+    assert any(stack.endswith("test_profiler.py:spin") for stack in stacks)
+    assert [path.name for path in tmp_path.iterdir()] == [f"analyze.{os.getpid()}.collapsed"]
+
+
+def test_read_sums_every_process_file(profiler, tmp_path):
+    (tmp_path / "analyze.101.collapsed").write_text("a.py:main;b.py:work 3\n")
+    (tmp_path / "analyze.102.collapsed").write_text("a.py:main;b.py:work 4\na.py:main 1\n")
+    (tmp_path / "analyze.102.collapsed.tmp").write_text("a.py:main 100\n")
+    (tmp_path / "analyze_other.103.collapsed").write_text("a.py:main 100\n")
+    assert profiler.read("/analyze") == {"a.py:main;b.py:work": 7, "a.py:main": 1}
+
+
+def test_stop_without_start_records_nothing(profiler, tmp_path):
+    assert profiler.stop("/analyze") == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_admins_can_ask_for_a_profile(profiler, monkeypatch):
+    monkeypatch.setattr(index, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    client = index.app.test_client()
+    response = client.get("/health", headers=dict(ADMIN, **{index.PROFILE_HEADER: "1"}))
+    assert response.headers[index.PROFILE_HEADER].endswith(" samples")
+    # Without the admin token the header is ignored
+    assert index.PROFILE_HEADER not in client.get("/health", headers={index.PROFILE_HEADER: "1"}).headers
@@ -0,0 +1,71 @@
+"""Sliding-window rate limiting: counts, window carry-over, bounded memory and the shared backend."""
+
+import pytest
+
+from conftest import index
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_db):
+    if request.param == "memory":
+        return index.MemoryRateLimitBackend()
+    return index.SQLiteRateLimitBackend(tmp_db)
+
+
+def hits(backend, key, count, now, limit=10, window=60):
+    return [backend.hit(key, limit, window, now) for _ in range(count)]
+
+
+def test_allows_up_to_the_limit_within_a_window(backend):
+    assert hits(backend, "a", 12, now=6000.0) == [True] * 10 + [False] * 2
+
+
+def test_keys_are_limited_separately(backend):
+    hits(backend, "a", 10, now=6000.0)
+    assert backend.hit("b", 10, 60, 6000.0)
+
+
+def test_previous_window_is_weighted_by_its_remaining_overlap(backend):
+    hits(backend, "a", 10, now=6000.0)
+    # Start of the next window: the full previous count still applies
+    assert not backend.hit("a", 10, 60, 6060.0)
+    # Halfway through it only half of the previous window counts
+    assert hits(backend, "a", 6, now=6090.0) == [True] * 5 + [False]
+
+
+def test_counts_reset_after_two_idle_windows(backend):
+    hits(backend, "a", 10, now=6000.0)
+    assert hits(backend, "a", 10, now=6120.0) == [True] * 10
+
+
+def test_memory_backend_evicts_least_recently_seen_clients():
+    backend = index.MemoryRateLimitBackend(max_keys=3)
+    for key in ("a", "b", "c", "d", "e"):
+        backend.hit(key, 10, 60, 6000.0)
+    assert list(backend._state) == ["c", "d", "e"]
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_db):
+    first = index.SQLiteRateLimitBackend(tmp_db)
+    second = index.SQLiteRateLimitBackend(tmp_db)
+    hits(first, "a", 6, now=6000.0)
+    assert hits(second, "a", 5, now=6000.0) == [True] * 4 + [False]
+
+
+def test_limiter_lets_traffic_through_when_its_backend_fails():
+    class Broken:
+        def hit(self, *args):
+            raise OSError("database is locked")
+
+    assert index.RateLimiter(Broken()).allow("a", 1, 60)
+
+
+def test_route_answers_429_past_its_limit(monkeypatch):
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    client = index.app.test_client()
+    environ = {"REMOTE_ADDR": "198.51.100.7"}
+    statuses = [client.post("/bulk-analyze", json={"texts": ["hello there"]}, environ_base=environ).status_code
+                for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+    other = client.post("/bulk-analyze", json={"texts": ["hello there"]}, environ_base={"REMOTE_ADDR": "198.51.100.8"})
+    assert other.status_code == 200
@@ -0,0 +1,141 @@
+"""Result caches: LRU eviction, expiry across the memory and SQLite tiers, and the job explanation cache."""
+
+import pytest
+
+from conftest import index
+
+
+def test_lru_evicts_the_least_recently_used_entry(clock):
+    cache = index.LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_lru_entries_expire_after_their_ttl(clock):
+    cache = index.LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+    clock.now += 10
+    assert cache.get("b") is None
+    clock.now += 49
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_memory_miss_is_filled_from_the_sqlite_tier(tmp_db, clock):
+    writer = index.TieredCache("test", ttl=60, path=tmp_db)
+    writer.set("key", {"answer": 42})
+    # A second worker on the same host has an empty memory tier
+    reader = index.TieredCache("test", ttl=60, path=tmp_db)
+    assert len(reader.memory) == 0
+    assert reader.get("key") == {"answer": 42}
+    assert len(reader.memory) == 1
+
+
+def test_promoted_entries_keep_their_original_expiry(tmp_db, clock):
+    index.TieredCache("test", ttl=60, path=tmp_db).set("key", "value")
+    clock.now += 50
+    reader = index.TieredCache("test", ttl=60, path=tmp_db)
+    assert reader.get("key") == "value"
+    clock.now += 10
+    # Neither the promoted memory entry nor the SQLite row outlives the first write's TTL
+    assert reader.memory.get("key") is None
+    assert reader.get("key") is None
+    assert index.TieredCache("test", ttl=60, path=tmp_db).get("key") is None
+
+
+def test_per_entry_ttl_applies_to_both_tiers(tmp_db, clock):
+    cache = index.TieredCache("test", ttl=60, path=tmp_db)
+    cache.set("short", "value", ttl=5)
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.persistent.get_entry("short") is None
+
+
+def test_namespaces_share_the_file_but_not_keys(tmp_db):
+    index.TieredCache("first", path=tmp_db).set("key", "first")
+    assert index.TieredCache("second", path=tmp_db).get("key") is None
+
+
+def test_sqlite_tier_evicts_expired_then_least_recently_read_rows(tmp_db, clock):
+    tier = index.SQLiteCache(tmp_db, "test", ttl=60, max_entries=2)
+    tier.set("expired", 0, ttl=1)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        tier.set(key, key)
+    clock.now += 1
+    tier.get_entry("a")
+    tier.evict()
+    keys = {row[0] for row in tier._conn().execute("SELECT key FROM cache")}
+    assert keys == {"a", "c"}
+
+
+def test_sqlite_errors_degrade_to_a_miss(tmp_db):
+    class Broken:
+        def get_entry(self, key):
+            raise index.sqlite3.OperationalError("database is locked")
+
+        set = delete = get_entry
+
+    cache = index.TieredCache("test", path=tmp_db)
+    cache.persistent = Broken()
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    cache.memory.clear()
+    assert cache.get("key", "miss") == "miss"
+
+
+def test_unusable_path_disables_the_sqlite_tier(tmp_path):
+    cache = index.TieredCache("test", path=str(tmp_path))
+    assert cache.persistent is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+
+@pytest.fixture
+def gemini(monkeypatch, tmp_db):
+    monkeypatch.setattr(index, "JOB_EXPLANATION_CACHE", index.TieredCache("job_explanation", ttl=60, path=tmp_db))
+    monkeypatch.setattr(index, "JOB_EXPLANATION_FLIGHTS", index.SingleFlight("job_explanation", path=tmp_db))
+    calls = []
+
+    class Response:
+        text = "Looks like an advance-fee scam."
+
+    def call(model_name, prompt, **kwargs):
+        calls.append(prompt)
+        return Response()
+
+    monkeypatch.setattr(index.GEMINI_MODELS, "call", call)
+    return calls
+
+
+def test_explanations_are_keyed_on_normalized_content(gemini):
+    first = index.job_ai_explanation("Pay the  registration fee\nTODAY")
+    second = index.job_ai_explanation("pay the registration fee today")
+    assert first == second == "Looks like an advance-fee scam."
+    assert len(gemini) == 1
+    index.job_ai_explanation("pay the processing fee today")
+    assert len(gemini) == 2
+
+
+def test_cache_key_changes_with_the_model_and_prompt_version(monkeypatch):
+    key = index.job_explanation_cache_key("same text")
+    monkeypatch.setattr(index, "JOB_ANALYSIS_PROMPT_VERSION", index.JOB_ANALYSIS_PROMPT_VERSION + "-next")
+    assert index.job_explanation_cache_key("same text") != key
+
+
+def test_failed_explanations_are_not_cached(gemini, monkeypatch):
+    def fail(model_name, prompt, **kwargs):
+        gemini.append(prompt)
+        raise RuntimeError("500 Internal error")
+
+    monkeypatch.setattr(index.GEMINI_MODELS, "call", fail)
+    assert index.job_ai_explanation("send bitcoin") == ""
+    assert index.job_ai_explanation("send bitcoin") == ""
+    assert len(gemini) == 2
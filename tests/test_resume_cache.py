@@ -0,0 +1,84 @@
+"""Resume result cache: the upload digest, repeat uploads and re-scoring after a rules reload."""
+
+import hashlib
+import io
+import json
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from conftest import index, make_pdf
+
+RESUME = make_pdf(["Software engineer with 5 years of Python and SQL experience at Acme", "Guru ninja rockstar"])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(index, "RESUME_RESULT_CACHE", index.LRUCache(16, 60))
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    return index.app.test_client()
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    real = index.resume_pdf_text
+
+    def resume_pdf_text(file_storage, size):
+        calls.append(size)
+        return real(file_storage, size)
+
+    monkeypatch.setattr(index, "resume_pdf_text", resume_pdf_text)
+    return calls
+
+
+def upload(client, pdf=RESUME, filename="resume.pdf"):
+    return client.post("/resume-check", data={"resume": (io.BytesIO(pdf), filename)}, content_type="multipart/form-data")
+
+
+def without_timestamp(body):
+    return {key: value for key, value in body.items() if key != "timestamp"}
+
+
+def test_spooled_upload_digest_is_the_sha256_of_its_bytes():
+    spooled = index.DigestingSpooledFile()
+    for start in range(0, len(RESUME), 100):
+        spooled.write(RESUME[start:start + 100])
+    assert spooled.sha256.hexdigest() == hashlib.sha256(RESUME).hexdigest()
+
+
+def test_digest_of_other_streams_is_computed_from_the_bytes():
+    file_storage = FileStorage(io.BytesIO(RESUME))
+    assert index.upload_digest(file_storage) == hashlib.sha256(RESUME).hexdigest()
+    assert file_storage.stream.tell() == 0
+
+
+def test_a_repeat_upload_is_answered_without_parsing_the_pdf(client, extractions):
+    first = upload(client)
+    second = upload(client, filename="copy.pdf")
+    assert first.status_code == second.status_code == 200
+    assert extractions == [len(RESUME)]
+    assert without_timestamp(second.get_json()) == without_timestamp(first.get_json())
+    assert index.RESUME_RESULT_CACHE.get(hashlib.sha256(RESUME).hexdigest())["result"] is not None
+
+
+def test_a_different_pdf_is_parsed(client, extractions):
+    upload(client)
+    upload(client, make_pdf(["Data analyst with SQL and Tableau experience at Initech"]))
+    assert len(extractions) == 2
+
+
+def test_a_rules_reload_rescores_the_cached_text(client, extractions, tmp_path, monkeypatch):
+    first = upload(client).get_json()
+    with open(index.RULES_FILE, encoding="utf-8") as f:
+        raw = json.load(f)
+    raw["version"] = "test.2"
+    raw["resume"]["base_risk"] += 5
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    monkeypatch.setattr(index, "RULES", index.load_rules(str(path)))
+
+    second = upload(client).get_json()
+    assert extractions == [len(RESUME)]
+    assert second["risk_percentage"] == first["risk_percentage"] + 5
+    assert index.RESUME_RESULT_CACHE.get(hashlib.sha256(RESUME).hexdigest())["rules_version"] == "test.2"
@@ -0,0 +1,60 @@
+"""The single-pass resume engine gives the same verdicts as evaluating each rule on its own.
+
+fixtures/baseline_resume_text_check.json was recorded from resume_text_check as it
+was before the engine (the baseline commit): for each text, the scoring fields and a
+SHA-256 of the whole response (timestamp removed).
+"""
+
+import json
+import random
+
+import pytest
+
+from conftest import index, load_fixture
+from test_rules_engine import response_digest
+
+RESUME_CASES = load_fixture("baseline_resume_text_check.json")
+RESUME_RULES = index.RULES.resume_engine
+
+
+@pytest.mark.parametrize("case", RESUME_CASES, ids=range(len(RESUME_CASES)))
+def test_resume_text_check_matches_baseline(case):
+    result = index.resume_text_check(case["text"])
+    result.pop("timestamp", None)
+    assert {field: result.get(field) for field in case["scores"]} == case["scores"]
+    assert response_digest(result) == case["digest"]
+
+
+def rule_by_rule(text):
+    """The reference: every rules.json resume rule evaluated on its own with condition_holds."""
+    with open(index.RULES.source, encoding="utf-8") as f:
+        resume = json.load(f)["resume"]
+    suspicious = [(spec["name"], spec["score"]) for spec in resume["suspicious_patterns"]
+                  if index.condition_holds(index._compile_condition(spec), text)]
+    positive = [(spec["name"], spec["message"]) for spec in resume["positive_indicators"]
+                if index.condition_holds(index._compile_condition(spec), text)]
+    return suspicious, positive
+
+
+def resume_corpus(size=500, seed=16):
+    words = ["expert", "experts", "master", "masters", "guru", "ninja", "expertise", "10+ years", "15+ years",
+             "2019", "2021 - 2023", "certified", "certification", "python", "javascript", "java", "c++",
+             "various", "several", "multiple", "education", "university", "degree", "react", "sql", "aws",
+             "a@b.com", "project", "portfolio", "github.com/x", "lorem", "expert,guru", "ninja.", "\n"]
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 60))) for _ in range(size)]
+
+
+@pytest.mark.parametrize("text", resume_corpus())
+def test_engine_matches_rule_by_rule_evaluation(text):
+    assert RESUME_RULES.evaluate(text) == rule_by_rule(text)
+
+
+def test_full_analysis_resume_section_matches_resume_check():
+    text = "Senior python expert and guru, master ninja expert expert guru. Education: university degree, projects on github."
+    response = index.app.test_client().post("/full-analysis", json={"resume_text": text}).get_json()
+    expected = index.resume_text_check(text)
+    section = response["resume_check"]
+    section.pop("timestamp", None)
+    expected.pop("timestamp", None)
+    assert section == expected
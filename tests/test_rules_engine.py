@@ -0,0 +1,40 @@
+"""The compiled keyword engine scores messages exactly like the original keyword loops.
+
+fixtures/baseline_analyze_text.json was recorded from analyze_text as it was before
+the rules engine (the baseline commit), with AI off: for each message, the scoring
+fields and a SHA-256 of the whole response (timestamp removed).
+"""
+
+import hashlib
+import json
+
+import pytest
+
+from conftest import index, load_fixture
+
+JOB_CASES = load_fixture("baseline_analyze_text.json")
+
+
+def response_digest(result):
+    return hashlib.sha256(json.dumps(result, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("case", JOB_CASES, ids=range(len(JOB_CASES)))
+def test_analyze_text_matches_baseline(case):
+    result = index.analyze_text(case["text"])
+    result.pop("timestamp")
+    assert {field: result.get(field) for field in case["scores"]} == case["scores"]
+    assert response_digest(result) == case["digest"]
+
+
+def test_matcher_finds_every_keyword_substring():
+    matcher = index.RULES.matcher
+    keywords = sorted(matcher.keywords)
+    text = " and ".join(keywords[::7])
+    expected = {keyword: text.find(keyword) for keyword in keywords if keyword in text}
+    assert matcher.find(text) == expected
+
+
+def test_matcher_reports_overlapping_keywords():
+    matcher = index.KeywordMatcher(["pay", "payment", "ment"])
+    assert set(matcher.find("advance payment")) == {"pay", "payment", "ment"}
@@ -0,0 +1,130 @@
+"""Hot reload of rules.json: admin reload, the per-worker file check, SIGHUP and broken files."""
+
+import json
+import os
+import shutil
+import signal
+
+import pytest
+
+from conftest import index
+
+ADMIN = {"Authorization": "Bearer test-admin-token"}
+TEXT = "Send bitcoin to unlock the job"
+
+
+@pytest.fixture
+def rules_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "rules.json")
+    shutil.copy(index.RULES_FILE, path)
+    monkeypatch.setattr(index, "RULES_FILE", path)
+    monkeypatch.setattr(index, "RULES", index.load_rules(path))
+    monkeypatch.setattr(index, "_rules_signature", index.rules_file_signature(path))
+    monkeypatch.setattr(index, "_rules_checked_at", index.time.monotonic())
+    monkeypatch.setattr(index, "_rules_reload_requested", False)
+    monkeypatch.setattr(index, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    return path
+
+
+@pytest.fixture
+def client():
+    return index.app.test_client()
+
+
+def edit_rules(path, version, bitcoin=None):
+    """Rewrite the file the way an operator would, with a later mtime than before."""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    raw["version"] = version
+    if bitcoin is not None:
+        raw["job_analysis"]["high_risk_keywords"]["bitcoin"] = bitcoin
+    write_rules(path, json.dumps(raw))
+
+
+def write_rules(path, body):
+    before = os.stat(path).st_mtime_ns
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(body)
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+def test_reload_swaps_in_the_edited_rules(rules_path):
+    old_rules = index.RULES
+    before = index.analyze_text_rules(TEXT)["risk_percentage"]
+    edit_rules(rules_path, "test.2", bitcoin=60)
+    rules = index.reload_rules()
+    assert index.RULES is rules and rules.version == "test.2"
+    assert index.analyze_text_rules(TEXT)["risk_percentage"] == before + 30
+    # A request already holding the old RuleSet keeps scoring with it
+    assert index.analyze_text_rules(TEXT, rules=old_rules)["risk_percentage"] == before
+
+
+def test_admin_reload_reports_the_new_version(rules_path, client):
+    edit_rules(rules_path, "test.2")
+    assert client.post("/admin/reload-rules").status_code == 403
+    response = client.post("/admin/reload-rules", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.get_json()["version"] == "test.2"
+    assert client.get("/health").get_json()["rules_version"] == "test.2"
+
+
+def test_admin_reload_touches_the_file_for_other_workers(rules_path, client):
+    signature = index.rules_file_signature(rules_path)
+    client.post("/admin/reload-rules", headers=ADMIN)
+    assert index.rules_file_signature(rules_path) != signature
+    assert index._rules_signature == index.rules_file_signature(rules_path)
+
+
+def test_worker_picks_up_a_changed_file_after_the_check_interval(rules_path, client, monkeypatch):
+    monkeypatch.setattr(index, "RULES_CHECK_INTERVAL", 60)
+    # Another worker reloaded and touched the file
+    edit_rules(rules_path, "test.2")
+    assert client.get("/health").get_json()["rules_version"] != "test.2"
+    monkeypatch.setattr(index, "_rules_checked_at", index.time.monotonic() - 61)
+    assert client.get("/health").get_json()["rules_version"] == "test.2"
+
+
+def test_sighup_reloads_on_the_next_request(rules_path, client):
+    if not hasattr(signal, "SIGHUP"):
+        pytest.skip("no SIGHUP on this platform")
+    assert signal.getsignal(signal.SIGHUP) is index._handle_reload_signal
+    edit_rules(rules_path, "test.2")
+    signature = index.rules_file_signature(rules_path)
+    os.kill(os.getpid(), signal.SIGHUP)
+    # The handler only sets a flag; the reload happens in the request
+    assert index._rules_reload_requested and index.RULES.version != "test.2"
+    assert client.get("/health").get_json()["rules_version"] == "test.2"
+    assert index.rules_file_signature(rules_path) != signature
+
+
+def test_malformed_file_keeps_the_previous_rules(rules_path, client):
+    rules = index.RULES
+    write_rules(rules_path, '{"version": "broken", "job_analysis": ')
+    with pytest.raises(ValueError):
+        index.reload_rules()
+    assert index.RULES is rules
+
+    response = client.post("/admin/reload-rules", headers=ADMIN)
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["error"] == "Rules reload failed"
+    assert body["message"] and body["active_version"] == rules.version
+
+
+def test_malformed_file_seen_by_the_check_is_logged_once(rules_path, client, monkeypatch, caplog):
+    monkeypatch.setattr(index, "RULES_CHECK_INTERVAL", 0)
+    rules = index.RULES
+    with open(rules_path, encoding="utf-8") as f:
+        good = f.read()
+    write_rules(rules_path, json.dumps({"version": "incomplete"}))
+    with caplog.at_level("ERROR", logger=index.logger.name):
+        for _ in range(3):
+            assert client.get("/health").get_json()["rules_version"] == rules.version
+    assert index.RULES is rules
+    assert len([r for r in caplog.records if "Rules reload failed" in r.getMessage()]) == 1
+
+    # The next edit that fixes the file is picked up
+    write_rules(rules_path, good)
+    edit_rules(rules_path, "fixed")
+    assert client.get("/health").get_json()["rules_version"] == "fixed"
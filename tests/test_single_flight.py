@@ -0,0 +1,177 @@
+"""Single-flight coalescing: in-process waiters and the cross-worker SQLite lease."""
+
+import threading
+
+import pytest
+
+from conftest import index
+
+
+def flight(tmp_db, lease_ttl=10.0):
+    """One worker's SingleFlight on the shared file; polls without sleeping."""
+    flights = index.SingleFlight("test", path=tmp_db, lease_ttl=lease_ttl)
+    flights.POLL_INTERVAL = 0
+    return flights
+
+
+def lease_owner(flights, key):
+    row = flights._conn().execute("SELECT owner FROM inflight WHERE namespace = 'test' AND key = ?", (key,)).fetchone()
+    return row and row[0]
+
+
+class Published:
+    """A result cache lookup that advances the fake clock on every poll."""
+
+    def __init__(self, clock, step=1.0, value=index._MISSING, after=None):
+        self.clock, self.step, self.value, self.after = clock, step, value, after
+        self.polls = 0
+
+    def __call__(self):
+        self.polls += 1
+        self.clock.now += self.step
+        if self.after is not None and self.polls >= self.after:
+            return self.value
+        return index._MISSING
+
+
+@pytest.fixture
+def waiting(monkeypatch):
+    """Counts callers that started waiting on another caller's flight."""
+    waiters = threading.Semaphore(0)
+    real_span = index.span
+
+    def span(name):
+        if name == "coalesce_wait":
+            waiters.release()
+        return real_span(name)
+
+    monkeypatch.setattr(index, "span", span)
+    return waiters
+
+
+def test_concurrent_callers_in_a_worker_share_one_call(tmp_db, waiting):
+    flights = flight(tmp_db)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("key", fn))) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    for _ in threads[1:]:
+        assert waiting.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ["result"] * 5
+    assert lease_owner(flights, "key") is None
+
+
+def test_waiters_share_the_leaders_exception(tmp_db, waiting):
+    flights = flight(tmp_db)
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("gemini down")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("key", fn)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    assert waiting.acquire(timeout=5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+def test_follower_in_another_worker_reads_the_leaders_result(tmp_db, clock):
+    leader, follower = flight(tmp_db), flight(tmp_db)
+    owner = leader._acquire("key")
+    lookup = Published(clock, step=0.5, value="from leader", after=3)
+    calls = []
+    assert follower.do("key", lambda: calls.append(1) or "own call", lookup=lookup) == "from leader"
+    assert calls == []
+    assert lease_owner(leader, "key") == owner
+
+
+def test_crashed_leaders_lease_is_taken_over_after_it_expires(tmp_db, clock):
+    crashed, follower = flight(tmp_db), flight(tmp_db)
+    crashed_owner = crashed._acquire("key")
+    expires_at = clock.now + 10
+    clock.now += 5
+    seen = {}
+
+    def fn():
+        seen["now"] = clock.now
+        seen["owner"] = lease_owner(follower, "key")
+        return "retaken"
+
+    assert follower.do("key", fn, lookup=Published(clock)) == "retaken"
+    # Taken over through the expired lease, before the follower's own wait ran out
+    assert expires_at <= seen["now"] < expires_at + 5
+    assert seen["owner"] not in (None, crashed_owner)
+    assert lease_owner(follower, "key") is None
+
+
+def test_follower_calls_directly_when_its_wait_runs_out(tmp_db, clock):
+    leader, follower = flight(tmp_db, lease_ttl=60), flight(tmp_db, lease_ttl=10)
+    owner = leader._acquire("key")
+    started = clock.now
+    seen = {}
+
+    def fn():
+        seen["now"] = clock.now
+        return "own call"
+
+    assert follower.do("key", fn, lookup=Published(clock)) == "own call"
+    assert started + 10 <= seen["now"] < started + 60
+    # The live leader keeps its lease
+    assert lease_owner(leader, "key") == owner
+
+
+def test_lease_holder_uses_a_result_published_meanwhile(tmp_db):
+    flights = flight(tmp_db)
+    calls = []
+    assert flights.do("key", lambda: calls.append(1), lookup=lambda: "cached") == "cached"
+    assert calls == []
+
+
+def test_finished_leader_releases_its_lease(tmp_db):
+    first, second = flight(tmp_db), flight(tmp_db)
+    assert first.do("key", lambda: "one") == "one"
+    assert lease_owner(first, "key") is None
+    assert second._acquire("key") is not None
+
+
+def test_unusable_lease_file_falls_back_to_in_process_coalescing(tmp_path):
+    flights = index.SingleFlight("test", path=str(tmp_path), lease_ttl=10)
+    assert flights.path is None
+    assert flights.do("key", lambda: "direct") == "direct"
+
+
+def test_leases_are_per_namespace(tmp_db):
+    first = index.SingleFlight("first", path=tmp_db)
+    second = index.SingleFlight("second", path=tmp_db)
+    assert first._acquire("key") is not None
+    assert second._acquire("key") is not None
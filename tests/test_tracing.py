@@ -0,0 +1,71 @@
+"""Request tracing: Server-Timing for admins only, and the sampled trace log."""
+
+import json
+import logging
+
+import pytest
+
+from conftest import index
+
+ADMIN = {"Authorization": "Bearer test-admin-token"}
+MESSAGE = "Pay the registration fee today to secure this job"
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    """Every request sampled into a captured trace log."""
+    records = Records()
+    monkeypatch.setattr(index, "ADMIN_TOKEN", "test-admin-token")
+    monkeypatch.setattr(index, "TRACE_LOG_PATH", "trace.log")
+    monkeypatch.setattr(index, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(index, "RATE_LIMITER", index.RateLimiter(index.MemoryRateLimitBackend()))
+    monkeypatch.setattr(index.TRACE_LOGGER, "level", logging.INFO)
+    index.TRACE_LOGGER.addHandler(records)
+    yield records.records
+    index.TRACE_LOGGER.removeHandler(records)
+
+
+def analyze(headers=None):
+    return index.app.test_client().post("/analyze", json={"text": MESSAGE}, headers=headers or {})
+
+
+def test_sampled_requests_are_logged_without_a_server_timing_header(traced):
+    response = analyze()
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    [record] = traced
+    assert record["route"] == "/analyze" and record["status"] == 200
+    assert "serialize" in [span["name"] for span in record["spans"]]
+
+
+def test_admin_requests_get_server_timing(traced):
+    response = analyze(ADMIN)
+    entries = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert entries[0] == "total" and "serialize" in entries
+    assert len(traced) == 1
+
+
+def test_a_wrong_token_gets_no_server_timing(traced):
+    assert "Server-Timing" not in analyze({"Authorization": "Bearer guess"}).headers
+
+
+def test_unsampled_requests_are_not_traced(traced, monkeypatch):
+    monkeypatch.setattr(index, "TRACE_SAMPLE_RATE", 0)
+    response = analyze()
+    assert "Server-Timing" not in response.headers
+    assert traced == []
+
+
+def test_repeated_stages_are_summed_in_server_timing():
+    trace = index.Trace(expose=True)
+    trace.spans = [("gemini", 0.0, 0.1), ("rules", 0.1, 0.15), ("gemini", 0.2, 0.5)]
+    assert trace.server_timing(0.6) == 'total;dur=600.0, gemini;dur=400.0;desc="2x", rules;dur=50.0'